@@ -1,6 +1,7 @@
 import math
 import random
-import string
+
+import ps3
 
 VOWELS = 'aeiou'
 CONSONANTS = 'bcdfghjklmnpqrstvwxyz'
@@ -121,7 +122,15 @@ def update_hand(hand, word):
 # new_hand = update_hand({'j':2, 'o':1, 'l':1, 'w':1, 'n':2}, 'jolly')
 # display_hand(new_hand)
 
-word_list = load_words()
+def __getattr__(name):
+    """
+    Makes MyTestFunction.word_list an alias for ps3.get_word_list(), the
+    word list shared by the whole process, so importing this module does
+    not read words.txt.
+    """
+    if name == 'word_list':
+        return ps3.get_word_list()
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 def is_valid_word(word, hand, word_list):
     """
@@ -0,0 +1,391 @@
+# 6.0001 Problem Set 3
+#
+# Benchmark suite for the hot functions of ps3.py: loading the word list,
+# valid, invalid and wildcard lookups in is_valid_word, get_word_score at
+# several hand lengths and from the score table of the dictionary,
+# update_hand, one turn of hand bookkeeping (update, length, display) on
+# a dictionary and on a HandState, best_word, the first five and all of
+# the words of top_words, and simulated play_hand turns.
+#
+# Dictionary-dependent benchmarks run once per dictionary size: 1 is
+# words.txt itself, and k > 1 is a synthetic list k times as large, made
+# of the words of words.txt with k different suffixes.
+#
+# Results are printed as a table and can be written as JSON. They can
+# also be compared with a stored baseline (benchmark_baseline.json), in
+# which case any benchmark more than --threshold slower is reported as a
+# regression and the exit status is 1.
+#
+# Run with, for example:
+#     python benchmarks.py --sizes 1,10 --json results.json
+#     python benchmarks.py --sizes 1,10,100 --save-baseline
+#     python benchmarks.py --imports
+#     python benchmarks.py --worker-memory 4
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+import ps3
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILENAME = os.path.join(HERE, 'benchmark_baseline.json')
+
+_IMPORT_SNIPPET = '''
+import time
+start = time.perf_counter()
+import %s
+print(time.perf_counter() - start)
+'''
+
+
+def bench_import(module, repeat=7):
+    """
+    Returns the median time (in seconds) taken to import module in a
+    fresh interpreter, measured repeat times.
+
+    module: string
+    repeat: int > 0
+    returns: float
+    """
+    times = []
+    for i in range(repeat):
+        output = subprocess.check_output(
+            [sys.executable, '-c', _IMPORT_SNIPPET % module], cwd=HERE)
+        times.append(float(output.decode().split()[-1]))
+    return statistics.median(times)
+
+
+def report_import_times():
+    """
+    Prints how long it takes to import the game modules, next to the time
+    it takes to load the word list, which importing must no longer pay.
+    """
+    load_time = bench_import('ps3; ps3.get_word_list()')
+    print('Import times (median of 7 fresh interpreters):')
+    for module in ('ps3', 'MyTestFunction'):
+        print('  %-24s %8.2f ms' % ('import ' + module,
+                                    bench_import(module) * 1000))
+    print('  %-24s %8.2f ms' % ('import + load word list', load_time * 1000))
+
+
+def read_memory():
+    """
+    Returns the resident (RSS) and proportional (PSS, shared pages divided
+    among the processes sharing them) memory of this process in bytes,
+    from /proc/self/smaps_rollup. PSS is None where that file is missing,
+    and RSS is then the peak resident size from getrusage.
+
+    returns: tuple (int, int or None)
+    """
+    try:
+        with open('/proc/self/smaps_rollup') as inFile:
+            fields = dict(line.split(':', 1) for line in inFile
+                          if line.startswith(('Rss:', 'Pss:')))
+        return (int(fields['Rss'].split()[0]) * 1024,
+                int(fields['Pss'].split()[0]) * 1024)
+    except (OSError, KeyError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024, None
+
+
+def _memory_worker(method, shared_files, barrier, results):
+    """
+    Gets a word list ready the way method says ('load_words' or 'shared'),
+    plays one best_word (which builds or touches the signature index),
+    waits for the other workers, and puts its timings and memory in
+    results.
+    """
+    import sharedwords
+    start = time.perf_counter()
+    if method == 'shared':
+        word_list = sharedwords.attach(*shared_files)
+    else:
+        word_list = ps3.load_words(verbose=False)
+    attached = time.perf_counter() - start
+    ps3.best_word({'a': 1, 'e': 1, 'r': 1, 's': 1, 't': 1, 'n': 1, '*': 1},
+                  ps3.HAND_SIZE, word_list)
+    ready = time.perf_counter() - start
+    # measure while every worker is alive, so shared pages are divided
+    barrier.wait()
+    results.put((attached, ready) + read_memory())
+    barrier.wait()
+
+
+def report_worker_memory(workers):
+    """
+    Starts workers fresh processes that each load words.txt, then workers
+    that attach to the shared memory-mapped word list of sharedwords.py,
+    and prints their median start-up times and memory.
+    """
+    import multiprocessing
+    import sharedwords
+    shared_files = sharedwords.prepare()
+    context = multiprocessing.get_context('spawn')
+    print('Per-worker cost with %d workers (median):' % workers)
+    print('  %-12s %12s %12s %10s %10s' % ('method', 'attach ms',
+                                           'ready ms', 'RSS MB', 'PSS MB'))
+    for method in ('load_words', 'shared'):
+        barrier = context.Barrier(workers)
+        results = context.Queue()
+        processes = [context.Process(target=_memory_worker,
+                                     args=(method, shared_files, barrier,
+                                           results))
+                     for i in range(workers)]
+        for process in processes:
+            process.start()
+        rows = [results.get() for process in processes]
+        for process in processes:
+            process.join()
+        attached, ready, rss, pss = [statistics.median(
+            0 if value is None else value for value in column)
+            for column in zip(*rows)]
+        print('  %-12s %12.2f %12.2f %10.1f %10s'
+              % (method, attached * 1000, ready * 1000, rss / 2 ** 20,
+                 '%.1f' % (pss / 2 ** 20) if pss else '-'))
+
+
+def time_call(func, repeat=5, min_time=0.2):
+    """
+    Returns (seconds per call, calls per run) for func: the number of
+    calls per run is chosen so that a run lasts at least min_time, and
+    the best of repeat runs is kept.
+
+    func: function taking no arguments
+    returns: tuple (float, int)
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    best = min([elapsed] + timer.repeat(repeat - 1, number))
+    return best / number, number
+
+
+def write_synthetic_words(words, scale, filename):
+    """
+    Writes a word list scale times as large as words to filename: every
+    word followed by each of scale different suffixes ('', 'a', 'b', ...,
+    'aa', ...). Words stay lowercase letters only.
+    """
+    suffixes = ['']
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    queue = list(letters)
+    while len(suffixes) < scale:
+        suffix = queue.pop(0)
+        suffixes.append(suffix)
+        queue.extend(suffix + letter for letter in letters)
+    with open(filename, 'w') as outFile:
+        for suffix in suffixes:
+            outFile.write(''.join(word + suffix + '\n' for word in words))
+
+
+def play_hand_benchmark(word_list, hands):
+    """
+    Returns (function, turns): a function that plays each of hands through
+    play_hand with a greedy player answering input(), and output
+    discarded, and the number of words entered in all.
+    """
+    scripts = []
+    for hand in hands:
+        script = []
+        remaining = hand
+        while ps3.calculate_handlen(remaining) > 0:
+            word = ps3.best_word(remaining, ps3.calculate_handlen(remaining),
+                                 word_list)
+            if word is None:
+                break
+            script.append(word)
+            remaining = ps3.update_hand(remaining, word)
+        script.append('!!')
+        scripts.append(script)
+
+    devnull = open(os.devnull, 'w')
+
+    def run():
+        stdout = sys.stdout
+        sys.stdout = devnull
+        try:
+            for hand, script in zip(hands, scripts):
+                answers = iter(script)
+                ps3.input = lambda prompt='': next(answers)
+                ps3.play_hand(hand, word_list)
+        finally:
+            sys.stdout = stdout
+            del ps3.input
+    return run, sum(len(script) for script in scripts)
+
+
+def run_benchmarks(sizes=(1, 10), seed=0):
+    """
+    Runs every benchmark and returns a dictionary mapping benchmark names
+    to their results, each a dictionary with the seconds per operation
+    ('seconds') and the number of operations timed per run ('number').
+    Benchmarks that depend on the dictionary are named 'name[size=k]'.
+
+    sizes: iterable of ints >= 1
+    seed: int, for the random hands and words
+    returns: dictionary (string -> dictionary)
+    """
+    results = {}
+
+    def record(name, func, per=1, **options):
+        # per: operations done by one call of func
+        seconds, number = time_call(func, **options)
+        seconds /= per
+        results[name] = {'seconds': seconds, 'number': number * per}
+        print('  %-40s %12.3f us' % (name, seconds * 1e6))
+
+    base_words = list(ps3.load_words(verbose=False))
+    random.seed(seed)
+    hands = [ps3.deal_hand(ps3.HAND_SIZE) for i in range(50)]
+
+    for n in (3, 7, 12):
+        record('get_word_score[n=%d]' % n,
+               lambda n=n: ps3.get_word_score('Waybill', n))
+    record('update_hand[dict]',
+           lambda: ps3.update_hand({'a': 1, 'q': 1, 'l': 2, 'm': 1, 'u': 1,
+                                    'i': 1}, 'quail'))
+    record('update_hand[Hand]',
+           lambda hand=ps3.Hand('aqllmui'): ps3.update_hand(hand, 'quail'))
+
+    for n in (ps3.HAND_SIZE, 20):
+        hand = ps3.deal_hand(n)
+        word = ''.join(list(hand)[:3])
+        for kind, start in (('dict', hand), ('HandState', ps3.HandState(hand))):
+            def turn(start=start):
+                new_hand = ps3.update_hand(start, word)
+                ps3.calculate_handlen(new_hand)
+                ps3.calculate_handlen(new_hand)
+                ps3.format_hand(new_hand)
+            record('hand_turn[%s, n=%d]' % (kind, n), turn)
+
+    directory = tempfile.mkdtemp()
+    for size in sizes:
+        tag = '[size=%d]' % size
+        filename = os.path.join(directory, 'words%d.txt' % size)
+        write_synthetic_words(base_words, size, filename)
+        record('load_words' + tag,
+               lambda: ps3.load_words(verbose=False, filename=filename),
+               repeat=3, min_time=0)
+        word_list = ps3.load_words(verbose=False, filename=filename)
+        word_list.wildcard_vowels('*')
+        word_list.words_with_signature('')
+        word_list.signature_bounds('', 'a')
+
+        hand = {'n': 1, 'h': 1, '*': 1, 'y': 1, 'd': 1, 'w': 1, 'e': 2}
+        word_list.word_score('', 0)
+        record('word_score[table]' + tag,
+               lambda: word_list.word_score('waybill', 7))
+        record('is_valid_word[valid]' + tag,
+               lambda: ps3.is_valid_word('honey', hand, word_list))
+        record('is_valid_word[invalid]' + tag,
+               lambda: ps3.is_valid_word('honeyx', hand, word_list))
+        record('is_valid_word[wildcard]' + tag,
+               lambda: ps3.is_valid_word('h*ney', hand, word_list))
+        record('best_word[10 hands]' + tag,
+               lambda: [ps3.best_word(h, ps3.HAND_SIZE, word_list)
+                        for h in hands[:10]])
+        record('top_words[first 5, 10 hands]' + tag,
+               lambda: [list(itertools.islice(
+                   ps3.top_words(h, ps3.HAND_SIZE, word_list), 5))
+                        for h in hands[:10]])
+        record('top_words[all, 10 hands]' + tag,
+               lambda: [list(ps3.top_words(h, ps3.HAND_SIZE, word_list))
+                        for h in hands[:10]])
+        run, turns = play_hand_benchmark(word_list, hands[:10])
+        record('play_hand[per turn]' + tag, run, per=turns)
+        del word_list
+        os.remove(filename)
+
+    filename = os.path.join(directory, 'words.txt')
+    write_synthetic_words(base_words, 1, filename)
+    ps3.load_words(compact=True, verbose=False, filename=filename)
+    record('load_words[compact, cached]',
+           lambda: ps3.load_words(compact=True, verbose=False,
+                                  filename=filename))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns the list of (name, ratio) for benchmarks that are more than
+    threshold (e.g. 0.25 for 25%) slower than in baseline.
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name in baseline:
+            ratio = result['seconds'] / baseline[name]['seconds']
+            if ratio > 1 + threshold:
+                regressions.append((name, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ps3.py.')
+    parser.add_argument('--sizes', default='1,10',
+                        help='comma-separated dictionary size multipliers')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline', default=BASELINE_FILENAME)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.25)
+    parser.add_argument('--imports', action='store_true',
+                        help='only report import times')
+    parser.add_argument('--worker-memory', type=int, metavar='WORKERS',
+                        help='only report the start-up time and memory of '
+                             'WORKERS processes loading or sharing the '
+                             'word list')
+    args = parser.parse_args()
+
+    if args.imports:
+        report_import_times()
+        return 0
+    if args.worker_memory:
+        report_worker_memory(args.worker_memory)
+        return 0
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    print('Seconds per operation (best of several runs):')
+    results = run_benchmarks(sizes, args.seed)
+    report = {'python': platform.python_version(),
+              'platform': platform.platform(),
+              'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+              'results': results}
+    if args.json:
+        with open(args.json, 'w') as outFile:
+            json.dump(report, outFile, indent=2, sort_keys=True)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as outFile:
+            json.dump(report, outFile, indent=2, sort_keys=True)
+        print('Baseline saved to', args.baseline)
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as inFile:
+            baseline = json.load(inFile)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for name, ratio in regressions:
+            print('REGRESSION: %s is %.0f%% slower than the baseline'
+                  % (name, (ratio - 1) * 100))
+        if regressions:
+            return 1
+        print('No regressions against', args.baseline)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
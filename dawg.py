@@ -0,0 +1,267 @@
+# 6.0001 Problem Set 3
+#
+# Compact word dictionary stored as a minimized DAWG (directed acyclic word
+# graph) packed into flat arrays. Words that share a prefix or a suffix
+# share nodes, so the whole of words.txt fits in a few hundred KB instead
+# of one Python string object per word.
+
+import sys
+from array import array
+
+from ps3 import VOWELS
+
+# _BYTES: list of one-byte strings, used to search the labels buffer
+_BYTES = [bytes([i]) for i in range(256)]
+
+
+class _Node(object):
+    """
+    A node of the DAWG while it is being built.
+    """
+    __slots__ = ('edges', 'final', 'number')
+
+    def __init__(self):
+        self.edges = {}
+        self.final = False
+        self.number = -1
+
+    def signature(self):
+        return (self.final,
+                tuple((letter, child.number)
+                      for letter, child in sorted(self.edges.items())))
+
+
+def build_dawg(words):
+    """
+    Builds a minimized DAWG for the given words using the incremental
+    algorithm of Daciuk et al. Returns the root node. Duplicates are
+    ignored.
+
+    words: iterable of lowercase strings
+    returns: _Node
+    """
+    root = _Node()
+    register = {}
+    # unchecked: list of (parent, letter, child) not yet minimized
+    unchecked = []
+    previous = ''
+
+    def minimize(down_to):
+        while len(unchecked) > down_to:
+            parent, letter, child = unchecked.pop()
+            key = child.signature()
+            if key in register:
+                parent.edges[letter] = register[key]
+            else:
+                child.number = len(register)
+                register[key] = child
+
+    for word in sorted(set(words)):
+        common = 0
+        for a, b in zip(word, previous):
+            if a != b:
+                break
+            common += 1
+        minimize(common)
+        node = unchecked[-1][2] if unchecked else root
+        for letter in word[common:]:
+            child = _Node()
+            node.edges[letter] = child
+            unchecked.append((node, letter, child))
+            node = child
+        node.final = True
+        previous = word
+    minimize(0)
+
+    return root
+
+
+class CompactDictionary(object):
+    """
+    A read-only collection of valid words stored as a DAWG in flat arrays:
+
+        offsets: the edges of node i are offsets[i] to offsets[i+1] - 1
+        labels: the letter (as a byte) of every edge, sorted per node
+        targets: the node every edge leads to
+        terminal: 1 for nodes that end a word, 0 otherwise
+
+    Node 0 is the root. Supports 'in', iteration (in sorted order), len(),
+    prefix queries and wildcard matching, so it can be passed as word_list
+    to is_valid_word.
+
+    The arrays can be any buffers that support indexing, and labels any
+    buffer with a find() method (bytes or mmap). If labels is a larger
+    buffer, label_base is the position of the first label in it; this lets
+    the dictionary be queried in place from a memory-mapped file.
+    """
+
+    def __init__(self, offsets, labels, targets, terminal, size, label_base=0):
+        self._offsets = offsets
+        self._labels = labels
+        self._targets = targets
+        self._terminal = terminal
+        self._size = size
+        self._base = label_base
+
+    @classmethod
+    def from_words(cls, words):
+        """
+        Builds a CompactDictionary from an iterable of lowercase words.
+        """
+        words = sorted(set(words))
+        root = build_dawg(words)
+        offsets = array('I', [0])
+        labels = bytearray()
+        targets = array('I')
+        terminal = bytearray()
+        # number the nodes in breadth-first order, root first
+        numbers = {id(root): 0}
+        queue = [root]
+        for node in queue:
+            terminal.append(node.final)
+            for letter, child in sorted(node.edges.items()):
+                if id(child) not in numbers:
+                    numbers[id(child)] = len(queue)
+                    queue.append(child)
+                labels.append(ord(letter))
+                targets.append(numbers[id(child)])
+            offsets.append(len(labels))
+        return cls(offsets, bytes(labels), targets, bytes(terminal), len(words))
+
+    def _step(self, node, letter):
+        """
+        Returns the node reached from node by the edge labelled letter,
+        or -1 if there is no such edge.
+        """
+        if len(letter) != 1 or letter > '\x7f':
+            return -1
+        base = self._base
+        pos = self._labels.find(_BYTES[ord(letter)],
+                                base + self._offsets[node],
+                                base + self._offsets[node + 1])
+        if pos == -1:
+            return -1
+        return self._targets[pos - base]
+
+    def _walk(self, prefix, node=0):
+        for letter in prefix:
+            node = self._step(node, letter)
+            if node == -1:
+                break
+        return node
+
+    def __contains__(self, word):
+        if not isinstance(word, str):
+            return False
+        node = self._walk(word)
+        return node != -1 and self._terminal[node] == 1
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return self._iter_from(0, '')
+
+    def __repr__(self):
+        return '<CompactDictionary: %d words, %d nodes>' % (
+            self._size, len(self._terminal))
+
+    def _iter_from(self, node, prefix):
+        # stack: list of (node, prefix), visited in sorted order
+        stack = [(node, prefix)]
+        while stack:
+            node, prefix = stack.pop()
+            if self._terminal[node]:
+                yield prefix
+            for pos in range(self._offsets[node + 1] - 1,
+                             self._offsets[node] - 1, -1):
+                stack.append((self._targets[pos],
+                              prefix + chr(self._labels[self._base + pos])))
+
+    def has_prefix(self, prefix):
+        """
+        Returns True if at least one word starts with prefix.
+
+        prefix: string
+        returns: boolean
+        """
+        return self._walk(prefix) != -1
+
+    def words_with_prefix(self, prefix):
+        """
+        Yields every word that starts with prefix, in sorted order.
+
+        prefix: string
+        returns: iterator of strings
+        """
+        node = self._walk(prefix)
+        if node == -1:
+            return iter(())
+        return self._iter_from(node, prefix)
+
+    def wildcard_vowels(self, word):
+        """
+        Returns the vowels that the first '*' in word can stand for so
+        that the result is a valid word, or '' if there are none.
+
+        word: lowercase string containing a '*'
+        returns: string
+        """
+        wild_pos = word.find('*')
+        node = self._walk(word[:wild_pos])
+        if node == -1:
+            return ''
+        suffix = word[wild_pos + 1:]
+        vowels = ''
+        for v in VOWELS:
+            end = self._step(node, v)
+            if end != -1:
+                end = self._walk(suffix, end)
+                if end != -1 and self._terminal[end] == 1:
+                    vowels += v
+        return vowels
+
+    def nbytes(self):
+        """
+        Returns the number of bytes used by the arrays of the dictionary.
+        """
+        edges = len(self._targets)
+        return (len(self._offsets) * self._offsets.itemsize
+                + edges * self._targets.itemsize + edges
+                + len(self._terminal))
+
+    def arrays(self):
+        """
+        Returns the (offsets, labels, targets, terminal) arrays, with labels
+        trimmed to the edges of this dictionary.
+        """
+        edges = len(self._targets)
+        labels = self._labels[self._base:self._base + edges]
+        return self._offsets, labels, self._targets, self._terminal
+
+
+def footprint(word_list):
+    """
+    Returns an estimate of the memory (in bytes) held by word_list,
+    including the string objects of a list or WordDictionary.
+
+    word_list: list, WordDictionary or CompactDictionary
+    returns: int
+    """
+    if isinstance(word_list, CompactDictionary):
+        return sys.getsizeof(word_list) + word_list.nbytes()
+    container = getattr(word_list, '_words', word_list)
+    return (sys.getsizeof(container)
+            + sum(sys.getsizeof(word) for word in word_list))
+
+
+if __name__ == '__main__':
+    from ps3 import load_words
+
+    words = load_words()
+    compact = CompactDictionary.from_words(words)
+    print('Memory footprint of', len(words), 'words:')
+    for name, word_list in (('list', list(words)),
+                            ('WordDictionary', words),
+                            ('CompactDictionary', compact)):
+        print('  %-18s %10d bytes' % (name, footprint(word_list)))
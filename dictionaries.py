@@ -0,0 +1,180 @@
+# 6.0001 Problem Set 3
+#
+# A registry of named word lists. Word lists are registered by name with
+# the file they are read from, loaded the first time they are asked for,
+# and then shared: every game and session that asks for the same name
+# gets the same dictionary object, which is never modified afterwards
+# (WordDictionary and CompactDictionary have no methods that change their
+# words), so it can be shared freely between threads.
+#
+# With a memory cap, the least recently used dictionaries are dropped
+# from the registry once the loaded ones together take more than the cap
+# (estimated with dawg.footprint). A dropped dictionary that is still in
+# use somewhere is not loaded again: the registry keeps a weak reference
+# to it and hands out the same object until it is no longer used.
+
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import ps3
+from dawg import footprint
+
+DEFAULT_NAME = 'words'
+
+
+class DictionaryRegistry(object):
+    """
+    Named word lists, loaded on demand and shared.
+
+    max_bytes: int, the memory the loaded dictionaries may take before the
+        least recently used ones are dropped, or None for no limit
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        # sources: dictionary (string -> tuple (string, boolean)), name ->
+        # (filename, compact)
+        self._sources = {}
+        # loaded: OrderedDict (string -> tuple (dictionary, int)), name ->
+        # (dictionary, estimated bytes), least recently used first
+        self._loaded = OrderedDict()
+        # dropped: name -> dictionary, for dropped dictionaries still in use
+        self._dropped = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        # load_locks: dictionary (string -> Lock), so each name loads once
+        self._load_locks = {}
+        self.loads = 0
+
+    def register(self, name, filename, compact=False):
+        """
+        Makes the word list in filename (one word per line) available as
+        name. If compact is True it is loaded as a CompactDictionary from
+        its cache file (see wordcache.py). Registering a name again with a
+        different file drops the dictionary loaded for it.
+
+        name: string
+        filename: string
+        compact: boolean
+        """
+        with self._lock:
+            if self._sources.get(name) != (filename, compact):
+                self._loaded.pop(name, None)
+                self._dropped.pop(name, None)
+            self._sources[name] = (filename, compact)
+            self._load_locks.setdefault(name, threading.Lock())
+
+    def register_directory(self, directory, compact=False):
+        """
+        Registers every .txt file in directory under its name without the
+        extension, and returns the names registered.
+        """
+        names = []
+        for entry in sorted(os.listdir(directory)):
+            name, extension = os.path.splitext(entry)
+            if extension == '.txt':
+                self.register(name, os.path.join(directory, entry), compact)
+                names.append(name)
+        return names
+
+    def names(self):
+        """Returns the registered names, sorted."""
+        with self._lock:
+            return sorted(self._sources)
+
+    def loaded(self):
+        """Returns the names of the dictionaries now held in memory by the
+        registry, least recently used first."""
+        with self._lock:
+            return list(self._loaded)
+
+    def __contains__(self, name):
+        return name in self._sources
+
+    def get(self, name=DEFAULT_NAME):
+        """
+        Returns the dictionary registered as name, loading it if it is not
+        loaded yet. Raises KeyError if no word list is registered as name.
+
+        name: string
+        returns: WordDictionary or CompactDictionary
+        """
+        word_list = self._lookup(name)
+        if word_list is not None:
+            return word_list
+        if name not in self._sources:
+            raise KeyError('no dictionary registered as %r' % (name,))
+        with self._load_locks[name]:
+            # another thread may have loaded it while we waited
+            word_list = self._lookup(name)
+            if word_list is not None:
+                return word_list
+            filename, compact = self._sources[name]
+            word_list = ps3.load_words(compact=compact, verbose=False,
+                                       filename=filename)
+            size = footprint(word_list)
+            with self._lock:
+                if self._sources.get(name) == (filename, compact):
+                    self._loaded[name] = (word_list, size)
+                    self.loads += 1
+                    self._evict(keep=name)
+            return word_list
+
+    def _lookup(self, name):
+        with self._lock:
+            entry = self._loaded.get(name)
+            if entry is not None:
+                self._loaded.move_to_end(name)
+                return entry[0]
+            word_list = self._dropped.get(name)
+            if word_list is not None:
+                # still in use: take it back rather than loading it again
+                del self._dropped[name]
+                self._loaded[name] = (word_list, footprint(word_list))
+                self._evict(keep=name)
+            return word_list
+
+    def _evict(self, keep):
+        """
+        Drops the least recently used dictionaries, except keep, while the
+        loaded ones take more than max_bytes. Called with the lock held.
+        """
+        if self.max_bytes is None:
+            return
+        total = sum(size for word_list, size in self._loaded.values())
+        for name in list(self._loaded):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            word_list, size = self._loaded.pop(name)
+            self._dropped[name] = word_list
+            total -= size
+
+    def nbytes(self):
+        """Returns the estimated memory taken by the loaded dictionaries."""
+        with self._lock:
+            return sum(size for word_list, size in self._loaded.values())
+
+
+# _registry: the process-wide DictionaryRegistry, made by get_registry
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """
+    Returns the registry shared by the whole process, in which words.txt
+    is registered as 'words'.
+
+    returns: DictionaryRegistry
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry = DictionaryRegistry()
+                registry.register(DEFAULT_NAME, ps3.WORDLIST_FILENAME)
+                _registry = registry
+    return _registry
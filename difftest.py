@@ -0,0 +1,758 @@
+# 6.0001 Problem Set 3
+#
+# Differential testing of the fast paths of ps3.py against the reference
+# ones. Every (word, hand, n) case is answered by the original
+# implementations kept in reference.py (get_word_score, and is_valid_word
+# and update_hand on a hand dictionary and a plain set of words) and by
+# every faster way of answering it that the tree offers: the functions of
+# ps3.py themselves, the score table of WordDictionary, Hand and HandState
+# hands, the wildcard indexes of WordDictionary and
+# CompactDictionary, the shared word list of sharedwords.py, PlayCache and
+# the checker of batch.py. Any difference in result, or in the exception
+# raised, is reported with the case that shows it.
+#
+# Cases are either random (dealt hands, dictionary words with and without
+# wildcards, the letters of the word added to the hand or not, random
+# strings, capital letters, and hands already played from, which may hold
+# counts of 0 or less) or exhaustive: every word of the dictionary, in
+# capitals, with each of its letters replaced by '*', and against a hand
+# one letter short, scored at every hand length the score table holds.
+# deal_hand is checked separately, since HandGenerator deals from other
+# random streams: every hand must have the shape deal_hand gives it, and
+# the letters of all hands must be drawn with the same frequencies.
+#
+# Cases are split into chunks spread over a pool of worker processes,
+# each loading the word lists once. Random chunk i always draws from a
+# generator seeded with (seed, i), so a run can be repeated exactly.
+#
+# Cases are checked a chunk at a time, and every fast path is called
+# once for each distinct input it reads in the chunk (see Checker), with
+# the reference scores of the whole chunk computed by one ScoreMatrix.
+# Each random case makes about 14 comparisons, and one worker gets
+# through about 6,000 random cases (80,000 comparisons) a second; the
+# exhaustive cases share their words, and one worker checks all 1.5
+# million of them at about 11,000 a second, in a little over two
+# minutes. That is close to the cost of the fast paths themselves: on
+# one core PlayCache alone answers about 50,000 new hands a second, and
+# the score functions about 85,000 words. Beyond that, the time divides
+# by the number of workers, as chunks are independent. For
+# quick runs, check fewer word lists or checks (--word-lists dict
+# --checks valid,cache).
+#
+# Run with, for example:
+#     python difftest.py --cases 2000000 --workers 4
+#     python difftest.py --exhaustive
+# The exit status is 1 if any divergence was found.
+
+import argparse
+import gc
+import itertools
+import math
+import operator
+import os
+import random
+import string
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import batch
+import handgen
+import ps3
+import reference
+import scoring
+import sharedwords
+
+# WORD_LISTS: dictionary (string -> function), the fast word lists to
+# check, each loaded from the file name of a word list
+WORD_LISTS = {
+    'dict': lambda filename: ps3.load_words(verbose=False, filename=filename),
+    'compact': lambda filename: ps3.load_words(compact=True, verbose=False,
+                                               filename=filename),
+    'shared': lambda filename: sharedwords.attach(
+        *sharedwords.prepare(filename)),
+}
+
+
+def _as_hand(hand):
+    """
+    Returns hand as a Hand. Hand keeps no count below 0, so letters used
+    up (count 0 or less) are left out.
+    """
+    return ps3.Hand({letter: count for letter, count in hand.items()
+                     if count > 0})
+
+
+# HAND_TYPES: dictionary (string -> function), the hand types to check,
+# each made from a hand dictionary
+HAND_TYPES = {
+    'dict': dict,
+    'Hand': _as_hand,
+    'HandState': ps3.HandState,
+}
+
+CHECKS = ('score', 'valid', 'cache', 'update', 'deal')
+
+# DEAL_SIZES: the hand lengths dealt by the 'deal' check
+DEAL_SIZES = (0, 1, 2, 3, 4, 7, 8, 12)
+
+# Divergence: a case on which a fast path and the reference disagree
+Divergence = namedtuple('Divergence', 'check variant word hand n expected got')
+
+
+class DiffReport(object):
+    """
+    The outcome of a differential test run, which can be merged with
+    others. Counts every divergence, and keeps the first max_reports of
+    them as examples.
+
+    max_reports: int >= 0
+    """
+
+    def __init__(self, max_reports=20):
+        self.max_reports = max_reports
+        self.cases = 0
+        # comparisons: dictionary (string -> int), check -> comparisons made
+        self.comparisons = dict.fromkeys(CHECKS, 0)
+        self.divergences = 0
+        self.examples = []
+        # letters: dictionary (string -> list of ints), how often every
+        # letter of HAND_LETTERS was dealt, by deal_hand ('reference') and
+        # by each HandGenerator backend
+        self.letters = {}
+
+    def compare(self, check, variant, word, hand, n, expected, got):
+        """
+        Records one comparison of a fast result got against the reference
+        result expected, and returns True if they are the same.
+        """
+        self.comparisons[check] += 1
+        if expected == got:
+            return True
+        self._diverge(Divergence(check, variant, word, hand, n, expected, got))
+        return False
+
+    def compare_all(self, check, variants, cases, expected, got):
+        """
+        Records the comparisons of the fast results got against the
+        reference results expected, one for each case (word, hand, n) of
+        cases.
+
+        variants: string, or list of strings, the variant of each result
+        cases, expected, got: lists of the same length
+        """
+        self.comparisons[check] += len(cases)
+        for i in itertools.compress(itertools.count(),
+                                    map(operator.ne, expected, got)):
+            variant = variants if isinstance(variants, str) else variants[i]
+            self._diverge(Divergence(check, variant, *cases[i], expected[i],
+                                     got[i]))
+
+    def _diverge(self, divergence):
+        self.divergences += 1
+        if len(self.examples) < self.max_reports:
+            self.examples.append(divergence)
+
+    def tally(self, source, hand):
+        counts = self.letters.setdefault(source, [0] * len(ps3.HAND_LETTERS))
+        for letter, count in hand.items():
+            counts[ps3.HAND_LETTERS.index(letter)] += count
+
+    def merge(self, other):
+        self.cases += other.cases
+        for check, count in other.comparisons.items():
+            self.comparisons[check] += count
+        self.divergences += other.divergences
+        room = self.max_reports - len(self.examples)
+        self.examples.extend(other.examples[:max(room, 0)])
+        for source, counts in other.letters.items():
+            mine = self.letters.setdefault(source, [0] * len(counts))
+            for i, count in enumerate(counts):
+                mine[i] += count
+
+    def check_letter_frequencies(self, limit=6.0):
+        """
+        Compares how often every letter was dealt by each HandGenerator
+        backend with how often deal_hand dealt it, among the vowels or
+        the consonants, and records a divergence for every letter whose
+        frequencies differ by more than limit standard deviations.
+        """
+        reference = self.letters.get('reference')
+        if reference is None:
+            return
+        for source, counts in sorted(self.letters.items()):
+            if source == 'reference':
+                continue
+            for group in (ps3.VOWELS, ps3.CONSONANTS):
+                slots = [ps3.HAND_LETTERS.index(letter) for letter in group]
+                total = sum(counts[i] for i in slots)
+                total_ref = sum(reference[i] for i in slots)
+                if not total or not total_ref:
+                    continue
+                for letter, i in zip(group, slots):
+                    share, share_ref = counts[i] / total, reference[i] / total_ref
+                    pooled = (counts[i] + reference[i]) / (total + total_ref)
+                    spread = math.sqrt(pooled * (1 - pooled)
+                                       * (1 / total + 1 / total_ref))
+                    if spread and abs(share - share_ref) > limit * spread:
+                        self.compare('deal', source, letter, None, None,
+                                     round(share_ref, 4), round(share, 4))
+                    else:
+                        self.comparisons['deal'] += 1
+
+
+def _outcome(func, *args):
+    """
+    Returns func(*args), or the name of the exception it raised, so that
+    fast paths must also fail the way the reference does.
+    """
+    try:
+        return func(*args)
+    except Exception as error:
+        return 'raises ' + type(error).__name__
+
+
+def _outcomes(func, args):
+    """
+    Returns [_outcome(func, *a) for a in args], without a try block for
+    every call unless one of them raises.
+
+    args: sequence of tuples
+    """
+    try:
+        return list(itertools.starmap(func, args))
+    except Exception:
+        return [_outcome(func, *a) for a in args]
+
+
+def _hand_letters(hand):
+    """
+    Returns the letters of hand as the string batch.py reads, or None if
+    it has counts below 0, which such a string cannot hold.
+    """
+    if any(count < 0 for count in hand.values()):
+        return None
+    return ''.join(letter * count for letter, count in sorted(hand.items()))
+
+
+def _nonzero(hand):
+    """
+    Returns the counts of hand other than 0, as a dictionary: a count of 0
+    plays the same as a letter that is not in the hand.
+    """
+    return {letter: count for letter, count in hand.items() if count}
+
+
+def _floored(hand):
+    """
+    Returns the letters of hand that can still be played, as a dictionary.
+    """
+    return {letter: count for letter, count in hand.items() if count > 0}
+
+
+def _played(hand, handlen):
+    """
+    Returns (the counts of hand other than 0, handlen(hand)) for a hand
+    returned by update_hand, or hand itself if it is the exception the
+    update raised (see _outcome).
+    """
+    if isinstance(hand, str):
+        return hand
+    return _nonzero(hand), _outcome(handlen, hand)
+
+
+def _hand_types(hand):
+    """
+    Returns hand as every type of HAND_TYPES, as a dictionary (string ->
+    hand). The hand dictionary is hand itself, so that a fast path that
+    changes it is seen.
+    """
+    return {name: hand if make is dict else make(hand)
+            for name, make in HAND_TYPES.items()}
+
+
+# HAND_REFERENCES: dictionary (string -> function), for the hand types
+# that cannot hold every hand dictionary, the hand dictionary each one is
+# checked against instead
+HAND_REFERENCES = {
+    'Hand': _floored,
+}
+
+
+# _PLAIN: the characters of the words that a ScoreMatrix can score
+_PLAIN = frozenset(scoring.LETTERS + '*')
+
+class Checker(object):
+    """
+    Runs the checks of one process: holds the reference word list, the
+    fast word lists, and a PlayCache and a batch.py checker for the first
+    of them, and records the results in a DiffReport.
+
+    Cases are checked a chunk at a time, and every fast path is called
+    once for each distinct input it reads among them: the word lists
+    once per word, the hand types once per word and hand, the scores
+    once per word and hand length, and the caches once per case.
+
+    words: iterable of lowercase strings, the reference word list
+    word_lists: dictionary (string -> word list), the fast word lists
+    checks: sequence of names from CHECKS
+    """
+
+    def __init__(self, words, word_lists, checks=CHECKS):
+        self.reference = frozenset(words)
+        self.word_lists = word_lists
+        self.checks = checks
+        self.scored = [(name, word_list) for name, word_list
+                       in word_lists.items() if hasattr(word_list, 'word_score')]
+        # the hands are checked with the first fast word list, and the
+        # caches answer from it; they are small so that the check also
+        # sees entries evicted
+        self.word_list = self.cache = self.batch_check = None
+        for word_list in word_lists.values():
+            self.word_list = word_list
+            self.cache = ps3.PlayCache(word_list, maxsize=1024)
+            self.batch_check = batch.make_checker(word_list, 1024)
+            break
+
+    def check_cases(self, report, cases):
+        """
+        Runs every check on the cases (word, hand, n) and records the
+        results in report.
+
+        cases: list of tuples (string, dictionary (string -> int), int)
+        """
+        report.cases += len(cases)
+        checks = self.checks
+        # hands: dictionary (int -> tuple), the first case of every hand
+        # by id; plays: the same for every word and hand
+        hands = {}
+        plays = {}
+        for case in cases:
+            hands.setdefault(id(case[1]), case)
+            plays.setdefault((case[0], id(case[1])), case)
+        before = {key: dict(case[1]) for key, case in hands.items()}
+        scores = self._reference_scores(cases)
+
+        if 'score' in checks:
+            self._check_scores(report, cases, scores)
+        if 'valid' in checks:
+            self._check_word_lists(report, cases)
+        if self.word_list is not None and (
+                'valid' in checks or 'cache' in checks or 'update' in checks):
+            typed = {key: _hand_types(case[1]) for key, case in hands.items()}
+            index = {play: i for i, play in enumerate(plays)}
+            plays = list(plays.values())
+            if 'valid' in checks or 'cache' in checks:
+                valid = self._check_hands(report, plays, typed)
+                if 'cache' in checks:
+                    self._check_caches(report, cases, typed, index, valid,
+                                       scores)
+            if 'update' in checks:
+                self._check_updates(report, plays, typed)
+
+        for key, (word, hand, n) in hands.items():
+            if hand != before[key]:
+                report.compare('update', 'unchanged hand', word, before[key],
+                               n, before[key], hand)
+
+    def _reference_scores(self, cases):
+        """
+        Returns the reference score of every (word, n) of cases, as a
+        dictionary ((string, int) -> int or string) in the order of
+        cases. The letter sums of all the words are computed at once with
+        a ScoreMatrix; words with other characters than letters and '*'
+        are scored one by one.
+        """
+        scores = dict.fromkeys((word, n) for word, hand, n in cases)
+        lowered = {word: word.lower() for word, n in scores}
+        plain = [word for word in dict.fromkeys(lowered.values())
+                 if _PLAIN.issuperset(word)]
+        matrix = scoring.ScoreMatrix([word.replace('*', '') for word in plain])
+        sums = dict(zip(plain, matrix.letter_sums.tolist()))
+        for word, n in scores:
+            total = sums.get(lowered[word])
+            if total is None:
+                scores[word, n] = _outcome(reference.get_word_score, word, n)
+            else:
+                length = len(lowered[word])
+                scores[word, n] = total * max(7 * length - 3 * (n - length), 1)
+        return scores
+
+    def _check_scores(self, report, cases, scores):
+        """
+        Checks get_word_score, and the score table of every fast word
+        list that has one, on every (word, n) of cases.
+        """
+        firsts = {}
+        for case in cases:
+            firsts.setdefault((case[0], case[2]), case)
+        keys = list(scores)
+        expected = list(scores.values())
+        firsts = [firsts[key] for key in keys]
+        # word lists without a score table are scored by get_word_score
+        scorers = [('get_word_score', ps3.get_word_score)] + [
+            (name, word_list.word_score) for name, word_list in self.scored]
+        for variant, score in scorers:
+            report.compare_all('score', variant, firsts, expected,
+                               _outcomes(score, keys))
+
+    def _check_word_lists(self, report, cases):
+        """
+        Checks every fast word list on every word of cases, with the
+        letters of the word itself as the hand, so that only the word
+        list decides: a CompactDictionary is walked once per word.
+        """
+        words = list(dict.fromkeys(word.lower() for word, hand, n in cases))
+        hands = [ps3.get_frequency_dict(word) for word in words]
+        expected = _outcomes(reference.is_valid_word, [
+            (word, hand, self.reference) for word, hand in zip(words, hands)])
+        words = [(word, hand, None) for word, hand in zip(words, hands)]
+        for name, word_list in self.word_lists.items():
+            report.compare_all('valid', name + ' list', words, expected,
+                               _outcomes(ps3.is_valid_word, [
+                                   (word, hand, word_list)
+                                   for word, hand, n in words]))
+
+    def _check_hands(self, report, plays, typed):
+        """
+        Checks is_valid_word with every hand type on every play (a case
+        with a word and hand of its own) of plays, with the first fast
+        word list, and returns the reference results, as a dictionary
+        (string -> list), hand type -> result of each play.
+        """
+        valid = {}
+        # expected: dictionary (function -> list), the results for the
+        # hand dictionaries the hand types are checked against
+        expected = {}
+        for hand_type in HAND_TYPES:
+            make = HAND_REFERENCES.get(hand_type, dict)
+            if make not in expected:
+                expected[make] = _outcomes(reference.is_valid_word, [
+                    (word, make(hand), self.reference)
+                    for word, hand, n in plays])
+            valid[hand_type] = expected[make]
+            if 'valid' in self.checks:
+                report.compare_all('valid', hand_type, plays, valid[hand_type],
+                                   _outcomes(ps3.is_valid_word, [
+                                       (word, typed[id(hand)][hand_type],
+                                        self.word_list)
+                                       for word, hand, n in plays]))
+        return valid
+
+    def _check_caches(self, report, cases, typed, index, valid, scores):
+        """
+        Checks the PlayCache with every hand type of every case, and the
+        batch.py checker with the letters of its hand.
+        """
+        # every hand type of the same hand shares one entry: the first
+        # misses the cache, and the others hit it
+        variants = []
+        checked = []
+        expected = []
+        args = []
+        letters = {key: _hand_letters(typed_hands['dict'])
+                   for key, typed_hands in typed.items()}
+        batch_cases = []
+        batch_expected = []
+        batch_args = []
+        for case in cases:
+            word, hand, n = case
+            key = id(hand)
+            play = index[word, key]
+            score = scores[word, n]
+            for hand_type, typed_hand in typed[key].items():
+                result = valid[hand_type][play]
+                variants.append(hand_type)
+                checked.append(case)
+                expected.append((result, score if result is True else 0))
+                args.append((word, typed_hand, n))
+            if letters[key] is not None:
+                result = valid['dict'][play]
+                batch_cases.append(case)
+                batch_expected.append((result, score if result is True else 0))
+                batch_args.append((word, letters[key], n))
+        report.compare_all('cache', variants, checked, expected,
+                           _outcomes(self.cache.check, args))
+        report.compare_all('cache', 'batch', batch_cases, batch_expected,
+                           _outcomes(self.batch_check, batch_args))
+
+    def _check_updates(self, report, plays, typed):
+        """
+        Checks update_hand and calculate_handlen with every hand type on
+        every play of plays.
+        """
+        updated = _outcomes(reference.update_hand,
+                            [(hand, word) for word, hand, n in plays])
+        # expected: dictionary (function -> list), the results for the
+        # hand dictionaries the hand types are checked against
+        expected = {}
+        for hand_type in HAND_TYPES:
+            make = HAND_REFERENCES.get(hand_type)
+            if make not in expected:
+                # Hand floors counts at 0, so its length only counts the
+                # letters that can still be played
+                expected[make] = [_played(
+                    make(hand) if make and isinstance(hand, dict) else hand,
+                    reference.calculate_handlen) for hand in updated]
+            got = _outcomes(ps3.update_hand, [
+                (typed[id(hand)][hand_type], word) for word, hand, n in plays])
+            report.compare_all('update', hand_type, plays, expected[make],
+                               [_played(hand, ps3.calculate_handlen)
+                                for hand in got])
+
+    def check_deals(self, report, rng, count):
+        """
+        Deals count hands of every length in DEAL_SIZES with deal_hand and
+        with each HandGenerator backend, checks the shape of every hand
+        and tallies their letters in report.
+
+        rng: random.Random
+        count: int >= 0
+        """
+        backends = [False] + ([True] if handgen.np is not None else [])
+        for n in DEAL_SIZES:
+            vowels, consonants = handgen.hand_shape(n)
+            shape = {'*': 1, 'vowels': vowels, 'consonants': consonants}
+            sources = [('reference', [ps3.deal_hand(n, rng)
+                                      for i in range(count)])]
+            for use_numpy in backends:
+                generator = handgen.HandGenerator(rng.getrandbits(64),
+                                                  use_numpy)
+                sources.append(('numpy' if use_numpy else 'random',
+                                generator.deal_batch(count, n)))
+            for source, hands in sources:
+                for hand in hands:
+                    report.tally(source, hand)
+                    report.compare('deal', source, '', ps3.Hand(hand).to_dict(),
+                                   n, shape, {
+                        '*': hand.get('*', 0),
+                        'vowels': sum(hand.get(v, 0) for v in ps3.VOWELS),
+                        'consonants': sum(hand.get(c, 0)
+                                          for c in ps3.CONSONANTS)})
+
+
+# CASE_LETTERS: the characters of the random strings of random cases
+CASE_LETTERS = string.ascii_lowercase + '*'
+
+
+def random_case(rng, words):
+    """
+    Returns a random case (word, hand, n). The hand is dealt with the
+    shape deal_hand gives it, its letters drawn in two calls to rng.
+
+    rng: random.Random
+    words: sequence of lowercase strings to draw words from
+    returns: tuple (string, dictionary (string -> int), int)
+    """
+    vowels, consonants = handgen.hand_shape(rng.randint(1, 2 * ps3.HAND_SIZE))
+    hand = {'*': 1}
+    for char in (rng.choices(ps3.VOWELS, k=vowels)
+                 + rng.choices(ps3.CONSONANTS, k=consonants)):
+        hand[char] = hand.get(char, 0) + 1
+    kind = rng.random()
+    if kind < 0.6:
+        word = rng.choice(words)
+        if kind < 0.3:
+            pos = rng.randrange(len(word))
+            word = word[:pos] + '*' + word[pos + 1:]
+        # usually a play the hand can make, sometimes one letter short
+        letters = word if rng.random() < 0.8 else word[1:]
+        for char in letters:
+            hand[char] = hand.get(char, 0) + 1
+        if kind > 0.5:
+            capitals = rng.getrandbits(len(word))
+            word = ''.join(char.upper() if capitals >> i & 1 else char
+                           for i, char in enumerate(word))
+    else:
+        word = ''.join(rng.choices(CASE_LETTERS, k=rng.randint(0, 4)))
+    if rng.random() < 0.2:
+        # a hand already played from, which may hold counts of 0 or less
+        hand = ps3.update_hand(hand, rng.choice(words))
+    if rng.random() < 0.5:
+        n = ps3.calculate_handlen(hand)
+    else:
+        n = rng.randint(0, 2 * ps3.HAND_SIZE)
+    return word, hand, n
+
+
+def exhaustive_cases(words, max_hand_size=ps3.HAND_SIZE):
+    """
+    Yields the exhaustive cases (word, hand, n) of every word in words:
+    the word against its own letters at every hand length from 0 to
+    max_hand_size + 1, in capitals, against a hand one letter short, and
+    with each of its letters replaced by '*' (in the hand as well).
+
+    words: iterable of lowercase strings
+    max_hand_size: int, the largest hand length of the score table
+    returns: iterator of tuples (string, dictionary (string -> int), int)
+    """
+    lengths = range(max_hand_size + 2)
+    for word in words:
+        hand = ps3.get_frequency_dict(word)
+        for n in lengths:
+            yield word, hand, n
+        yield word.upper(), hand, len(word)
+        yield word, ps3.get_frequency_dict(word[1:]), len(word)
+        for pos in range(len(word)):
+            pattern = word[:pos] + '*' + word[pos + 1:]
+            yield pattern, ps3.get_frequency_dict(pattern), len(word)
+
+
+# _worker_state: (list of words, Checker) in each worker
+_worker_state = None
+
+
+def _init_worker(filename, names, checks):
+    """
+    Loads the word lists of a worker: the reference words from filename
+    and the fast word lists names.
+    """
+    global _worker_state
+    word_lists = {name: WORD_LISTS[name](filename) for name in names}
+    if 'dict' in word_lists:
+        words = list(word_lists['dict'])
+    else:
+        words = list(ps3.load_words(verbose=False, filename=filename))
+    _worker_state = (words, Checker(words, word_lists, checks))
+    # the word lists live as long as the worker: the garbage collector
+    # need not walk them again after every chunk
+    gc.freeze()
+
+
+def _run_chunk(mode, index, count, seed, max_reports):
+    """
+    Runs chunk index of a run in the current process and returns its
+    DiffReport: count random cases drawn with seed, or the exhaustive
+    cases of count dictionary words from word index * count on.
+    """
+    words, checker = _worker_state
+    report = DiffReport(max_reports)
+    if mode == 'exhaustive':
+        start = index * count
+        checker.check_cases(report, list(exhaustive_cases(
+            words[start:start + count])))
+        return report
+    rng = random.Random(repr((seed, index)))
+    checker.check_cases(report, [random_case(rng, words)
+                                 for i in range(count)])
+    if 'deal' in checker.checks:
+        checker.check_deals(report, rng, max(count // 100, 1))
+    return report
+
+
+def run(cases=100000, exhaustive=False, seed=0, workers=None,
+        chunk_size=None, checks=CHECKS, word_lists=tuple(WORD_LISTS),
+        max_reports=20, filename=ps3.WORDLIST_FILENAME):
+    """
+    Runs a differential test and returns (DiffReport, elapsed seconds).
+
+    Runs cases random cases, or if exhaustive is True the exhaustive
+    cases of every word of the word list in filename, in chunks of
+    chunk_size cases (or words) spread over a pool of worker processes.
+    With workers=1 the chunks run in this process.
+
+    cases: int >= 0
+    exhaustive: boolean
+    seed: int
+    workers: int, or None for os.cpu_count()
+    chunk_size: int > 0, or None for 20000 cases or 2000 words
+    checks: sequence of names from CHECKS
+    word_lists: sequence of names from WORD_LISTS
+    max_reports: int >= 0, the number of divergences kept as examples
+    filename: string
+    returns: tuple (DiffReport, float)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if 'shared' in word_lists:
+        # once, before the workers attach to it
+        sharedwords.prepare(filename)
+    if exhaustive:
+        mode = 'exhaustive'
+        chunk_size = chunk_size or 2000
+        total = len(ps3.load_words(verbose=False, filename=filename))
+    else:
+        mode = 'random'
+        chunk_size = chunk_size or 20000
+        total = cases
+    # exhaustive chunk i starts at word i * chunk_size, so only random
+    # chunks are cut short at the end
+    chunks = [(mode, i, chunk_size if exhaustive
+               else min(chunk_size, total - start), seed, max_reports)
+              for i, start in enumerate(range(0, total, chunk_size))]
+    report = DiffReport(max_reports)
+
+    start = time.perf_counter()
+    initargs = (filename, tuple(word_lists), tuple(checks))
+    if workers == 1:
+        _init_worker(*initargs)
+        for chunk in chunks:
+            report.merge(_run_chunk(*chunk))
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=initargs) as pool:
+            for result in pool.map(_run_chunk, *zip(*chunks)):
+                report.merge(result)
+    report.check_letter_frequencies()
+    return report, time.perf_counter() - start
+
+
+def format_report(report, elapsed=None):
+    """
+    Returns report as text: the number of cases and comparisons by check,
+    then the divergences kept as examples.
+
+    report: DiffReport
+    elapsed: float or None, the seconds the run took
+    returns: string
+    """
+    lines = ['Cases:        %d' % report.cases]
+    comparisons = sum(report.comparisons.values())
+    if elapsed:
+        lines[0] += ' (%.0f per second, %.0f comparisons per second)' % (
+            report.cases / elapsed, comparisons / elapsed)
+    lines.append('Comparisons:  %d: ' % comparisons + ', '.join(
+        '%s %d' % item for item in report.comparisons.items() if item[1]))
+    lines.append('Divergences:  %d' % report.divergences)
+    for example in report.examples:
+        lines.append('%s[%s]: word=%r hand=%r n=%r: expected %r, got %r'
+                     % example)
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Check the fast paths of ps3 against the reference ones.')
+    parser.add_argument('--cases', type=int, default=1000000)
+    parser.add_argument('--exhaustive', action='store_true',
+                        help='run the exhaustive cases of every dictionary '
+                             'word instead of random cases')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=None)
+    parser.add_argument('--checks', default=','.join(CHECKS),
+                        help='comma-separated checks to run (default: %(default)s)')
+    parser.add_argument('--word-lists', default=','.join(WORD_LISTS),
+                        help='comma-separated fast word lists to check '
+                             '(default: %(default)s)')
+    parser.add_argument('--max-reports', type=int, default=20)
+    args = parser.parse_args()
+
+    checks = args.checks.split(',')
+    word_lists = args.word_lists.split(',')
+    for name in checks:
+        if name not in CHECKS:
+            parser.error('unknown check %r' % name)
+    for name in word_lists:
+        if name not in WORD_LISTS:
+            parser.error('unknown word list %r' % name)
+    report, elapsed = run(args.cases, args.exhaustive, args.seed,
+                          args.workers, args.chunk_size, checks, word_lists,
+                          args.max_reports)
+    print(format_report(report, elapsed))
+    return 1 if report.divergences else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+# 6.0001 Problem Set 3
+#
+# Seeded generation of hands in bulk, for simulations and tournaments.
+# A HandGenerator deals hands by the rules of deal_hand (one wildcard,
+# ceil((n-1)/3) vowels and consonants for the rest) from its own random
+# stream, so a seed always reproduces the same hands, and spawn() splits
+# it into independent streams, one per worker.
+#
+# With NumPy installed, deal_batch draws the letters of a whole batch in
+# two calls and counts them with one bincount. Without it, the letters of
+# each hand are drawn with random.Random.choices. The two give different
+# hands for the same seed, so a seed reproduces the same hands only with
+# the same choice of use_numpy.
+
+import math
+import random
+
+import ps3
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_VOWEL_SLOTS = [ps3.HAND_LETTERS.index(letter) for letter in ps3.VOWELS]
+_CONSONANT_SLOTS = [ps3.HAND_LETTERS.index(letter)
+                    for letter in ps3.CONSONANTS]
+_WILDCARD_SLOT = ps3.HAND_LETTERS.index('*')
+
+
+def hand_shape(n):
+    """
+    Returns (vowels, consonants): how many of each deal_hand(n) deals
+    besides the wildcard.
+
+    n: int >= 0
+    returns: tuple (int, int)
+    """
+    num_vowels = int(math.ceil((n - 1) / 3))
+    return num_vowels, max(n - 1 - num_vowels, 0)
+
+
+class HandGenerator(object):
+    """
+    A reproducible source of random hands.
+
+    Can also be passed as the rng of deal_hand, substitute_hand and
+    GameEngine, which only use its choice method.
+
+    seed: int, tuple of ints, or None for a fresh random seed
+    use_numpy: boolean, or None to use NumPy whenever it is installed
+    """
+
+    def __init__(self, seed=None, use_numpy=None):
+        if use_numpy is None:
+            use_numpy = np is not None
+        if use_numpy and np is None:
+            raise ImportError('use_numpy needs NumPy to be installed')
+        self.use_numpy = use_numpy
+        if use_numpy:
+            if not isinstance(seed, np.random.SeedSequence):
+                seed = np.random.SeedSequence(seed)
+            self._seed = seed
+            self._rng = np.random.default_rng(seed)
+        else:
+            if seed is None:
+                seed = random.SystemRandom().getrandbits(128)
+            self._seed = seed
+            self._spawned = 0
+            self._rng = random.Random(repr(seed))
+
+    def spawn(self, count):
+        """
+        Returns count new HandGenerators whose streams are independent of
+        each other and of this one, for example one per worker process.
+        Spawning again returns further, different generators.
+
+        count: int >= 0
+        returns: list of HandGenerator
+        """
+        if self.use_numpy:
+            return [HandGenerator(child, True)
+                    for child in self._seed.spawn(count)]
+        start = self._spawned
+        self._spawned += count
+        return [HandGenerator((self._seed, 'spawn', i), False)
+                for i in range(start, start + count)]
+
+    def choice(self, seq):
+        """
+        Returns a random element of the non-empty sequence seq, like
+        random.choice.
+        """
+        if self.use_numpy:
+            return seq[int(self._rng.integers(len(seq)))]
+        return self._rng.choice(seq)
+
+    def deal_batch(self, count, n=ps3.HAND_SIZE):
+        """
+        Returns a list of count random hands of n letters each, dealt by
+        the rules of deal_hand.
+
+        count: int >= 0
+        n: int >= 0
+        returns: list of Hand
+        """
+        num_vowels, num_consonants = hand_shape(n)
+        length = num_vowels + num_consonants + 1
+        width = len(ps3.HAND_LETTERS)
+        if self.use_numpy:
+            vowels = np.array(_VOWEL_SLOTS)[
+                self._rng.integers(len(_VOWEL_SLOTS),
+                                   size=(count, num_vowels))]
+            consonants = np.array(_CONSONANT_SLOTS)[
+                self._rng.integers(len(_CONSONANT_SLOTS),
+                                   size=(count, num_consonants))]
+            slots = np.concatenate((vowels, consonants), axis=1)
+            slots += (np.arange(count) * width)[:, None]
+            counts = np.bincount(slots.ravel(), minlength=count * width)
+            counts = counts.reshape(count, width)
+            counts[:, _WILDCARD_SLOT] += 1
+            data = counts.astype(np.uint8).tobytes()
+            return [ps3.Hand._from_counts(data[i:i + width], length)
+                    for i in range(0, count * width, width)]
+
+        choices = self._rng.choices
+        hands = []
+        for i in range(count):
+            counts = bytearray(width)
+            counts[_WILDCARD_SLOT] = 1
+            for slot in choices(_VOWEL_SLOTS, k=num_vowels):
+                counts[slot] += 1
+            for slot in choices(_CONSONANT_SLOTS, k=num_consonants):
+                counts[slot] += 1
+            hands.append(ps3.Hand._from_counts(bytes(counts), length))
+        return hands
+
+    def deal(self, n=ps3.HAND_SIZE):
+        """
+        Returns one random hand of n letters, like deal_hand(n) but as a
+        Hand.
+        """
+        return self.deal_batch(1, n)[0]
+
+    def substitute(self, hand, letter):
+        """
+        Returns substitute_hand(hand, letter) with the new letter drawn
+        from this generator.
+        """
+        return ps3.substitute_hand(hand, letter, self)
@@ -0,0 +1,264 @@
+# 6.0001 Problem Set 3
+#
+# Opt-in instrumentation of the hot functions of ps3.py. enable() replaces
+# load_words, is_valid_word, get_word_score, word_score, update_hand and
+# deal_hand in the ps3 module with wrappers that count calls and record their latency
+# (total, maximum and a histogram); disable() puts the original functions
+# back. While instrumentation is disabled nothing is wrapped, so it costs
+# nothing at all.
+#
+# Only calls made through the ps3 module are seen: ps3's own functions and
+# engines, and any module that calls ps3.is_valid_word(...) and so on.
+# Names copied with 'from ps3 import ...' before enable() keep pointing at
+# the original functions.
+#
+# Caches (anything with a cache_info() method returning hits and misses,
+# like functools.lru_cache) can be registered with register_cache, and
+# their hit rates are reported with the function statistics.
+#
+# Snapshots are dictionaries that can be appended to a file as JSON lines
+# with dump(). Run with:
+#     python instrument.py --stats stats.jsonl
+# to play the game with instrumentation enabled, and add --profile or
+# --tracemalloc to also run it under cProfile or tracemalloc.
+
+import argparse
+import bisect
+import json
+import sys
+import threading
+import time
+from functools import wraps
+
+import ps3
+
+# word_score is how the engines score words, mostly from the score table
+# of a WordDictionary without calling get_word_score
+INSTRUMENTED = ('load_words', 'is_valid_word', 'get_word_score',
+                'word_score', 'update_hand', 'deal_hand')
+
+# BUCKETS: list of ints, the upper bound (in nanoseconds) of every
+# histogram bucket but the last, which holds everything slower
+BUCKETS = [1000 * 4 ** i for i in range(10)]
+
+
+def _bucket_name(i):
+    """
+    Returns the label of histogram bucket i, like '<=4us' or '>262144us'.
+    """
+    if i == len(BUCKETS):
+        return '>%dus' % (BUCKETS[-1] // 1000)
+    return '<=%dus' % (BUCKETS[i] // 1000)
+
+
+class CallStats(object):
+    """
+    Call count and latency statistics for one function.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.histogram = [0] * (len(BUCKETS) + 1)
+
+    def add(self, elapsed_ns):
+        with self._lock:
+            self.calls += 1
+            self.total_ns += elapsed_ns
+            if elapsed_ns > self.max_ns:
+                self.max_ns = elapsed_ns
+            self.histogram[bisect.bisect_left(BUCKETS, elapsed_ns)] += 1
+
+    def snapshot(self):
+        """
+        Returns the statistics as a dictionary of plain values.
+        """
+        with self._lock:
+            return {'calls': self.calls,
+                    'total_seconds': self.total_ns / 1e9,
+                    'mean_us': self.total_ns / self.calls / 1000
+                               if self.calls else 0.0,
+                    'max_us': self.max_ns / 1000,
+                    'histogram': {_bucket_name(i): count
+                                  for i, count in enumerate(self.histogram)
+                                  if count}}
+
+
+# _originals: dictionary (string -> function), the functions replaced in
+# ps3 while instrumentation is enabled
+_originals = {}
+# _stats: dictionary (string -> CallStats)
+_stats = {}
+# _caches: dictionary (string -> function returning hits and misses)
+_caches = {}
+
+
+def _wrap(func, stats):
+    clock = time.perf_counter_ns
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats.add(clock() - start)
+    return wrapper
+
+
+def enable(names=INSTRUMENTED):
+    """
+    Starts instrumenting the functions of ps3 called names. Functions that
+    are already instrumented are left alone, and keep their statistics.
+
+    names: iterable of strings
+    """
+    for name in names:
+        if name in _originals:
+            continue
+        func = getattr(ps3, name)
+        stats = _stats.setdefault(name, CallStats())
+        _originals[name] = func
+        setattr(ps3, name, _wrap(func, stats))
+
+
+def disable():
+    """
+    Stops instrumenting, restoring the original functions of ps3. The
+    statistics collected so far are kept until reset() is called.
+    """
+    for name, func in _originals.items():
+        setattr(ps3, name, func)
+    _originals.clear()
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def reset():
+    """
+    Forgets every statistic collected so far.
+    """
+    for stats in _stats.values():
+        with stats._lock:
+            stats.clear()
+
+
+def register_cache(name, cache_info):
+    """
+    Reports the hit rate of a cache in snapshots, under name.
+
+    name: string
+    cache_info: function taking no arguments and returning an object with
+        hits and misses attributes, like lru_cache's cache_info
+    """
+    _caches[name] = cache_info
+
+
+def unregister_cache(name):
+    _caches.pop(name, None)
+
+
+def snapshot():
+    """
+    Returns the statistics collected so far: a dictionary with the time
+    it was taken, whether instrumentation is enabled, the statistics of
+    every instrumented function ('functions') and the hits, misses and hit
+    rate of every registered cache ('caches').
+
+    returns: dictionary
+    """
+    caches = {}
+    for name, cache_info in _caches.items():
+        info = cache_info()
+        lookups = info.hits + info.misses
+        caches[name] = {'hits': info.hits, 'misses': info.misses,
+                        'hit_rate': info.hits / lookups if lookups else 0.0}
+    return {'time': time.time(),
+            'enabled': is_enabled(),
+            'functions': {name: stats.snapshot()
+                          for name, stats in sorted(_stats.items())},
+            'caches': caches}
+
+
+def dump(filename):
+    """
+    Appends a snapshot to filename as one line of JSON, and returns it.
+    """
+    data = snapshot()
+    with open(filename, 'a') as outFile:
+        outFile.write(json.dumps(data, sort_keys=True) + '\n')
+    return data
+
+
+def format_snapshot(data):
+    """
+    Returns a snapshot as a human-readable table.
+    """
+    lines = ['%-16s %10s %12s %10s %10s' % ('function', 'calls', 'total s',
+                                              'mean us', 'max us')]
+    for name, stats in data['functions'].items():
+        lines.append('%-16s %10d %12.4f %10.2f %10.2f'
+                     % (name, stats['calls'], stats['total_seconds'],
+                        stats['mean_us'], stats['max_us']))
+    for name, stats in data['caches'].items():
+        lines.append('cache %-20s hits %d, misses %d, hit rate %.1f%%'
+                     % (name, stats['hits'], stats['misses'],
+                        stats['hit_rate'] * 100))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Play the word game with instrumentation enabled.')
+    parser.add_argument('--stats', help='append a snapshot to this file')
+    parser.add_argument('--profile', metavar='FILE', nargs='?', const='-',
+                        help='run under cProfile, and save the profile to '
+                             'FILE (or print the top functions)')
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help='report the largest allocation sites')
+    parser.add_argument('--compact', action='store_true',
+                        help='use the memory-mapped compact dictionary')
+    args = parser.parse_args()
+
+    enable()
+    if args.tracemalloc:
+        import tracemalloc
+        tracemalloc.start()
+    word_list = ps3.load_words(compact=args.compact)
+
+    if args.profile:
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        profiler.runcall(ps3.play_game, word_list)
+        if args.profile == '-':
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats(
+                'cumulative').print_stats(25)
+        else:
+            profiler.dump_stats(args.profile)
+    else:
+        ps3.play_game(word_list)
+
+    if args.tracemalloc:
+        current, peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics('lineno')[:10]
+        tracemalloc.stop()
+        print('Memory: %d bytes now, %d bytes at peak' % (current, peak),
+              file=sys.stderr)
+        for stat in top:
+            print('  ', stat, file=sys.stderr)
+
+    data = dump(args.stats) if args.stats else snapshot()
+    disable()
+    print(format_snapshot(data), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+# 6.0001 Problem Set 3
+#
+# Load generator for server.py. Opens many concurrent sessions, plays each
+# game automatically (best_word for every word, never substituting or
+# replaying), and reports the move latency (from sending an answer to
+# receiving the next question) and the number of sessions per second.
+#
+# Run against a running server with:
+#     python loadgen.py --port 8765 --sessions 500 --concurrency 50
+# or against a server started in the same process, over loopback:
+#     python loadgen.py --local --sessions 500 --concurrency 50
+
+import argparse
+import asyncio
+import time
+
+import ps3
+from server import GameServer
+
+# _QUESTIONS: dictionary (string -> string), prompt line -> question
+_QUESTIONS = {prompt + '\n': question
+              for question, prompt in ps3.PROMPTS.items()}
+
+
+def choose_answer(question, hand_line, num_hands, word_list):
+    """
+    Returns the answer the load generator gives to question. hand_line is
+    the last 'Current Hand: ...' line received.
+    """
+    if question == 'num_hands':
+        return str(num_hands)
+    if question == 'word':
+        hand = ps3.get_frequency_dict(hand_line.split(':', 1)[1].split())
+        word = ps3.best_word(hand, ps3.calculate_handlen(hand), word_list)
+        return '!!' if word is None else word
+    if question == 'dictionary':
+        return ''
+    return 'no'
+
+
+async def play_session(host, port, num_hands, word_list, latencies):
+    """
+    Plays one game against the server, appending the latency (in
+    seconds) of every move to latencies.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    hand_line = ''
+    sent = None
+    try:
+        while True:
+            line = (await reader.readline()).decode()
+            if not line:
+                break
+            if line.startswith('Current Hand:'):
+                hand_line = line
+            question = _QUESTIONS.get(line)
+            if question is None:
+                continue
+            if sent is not None:
+                latencies.append(time.perf_counter() - sent)
+            answer = choose_answer(question, hand_line, num_hands, word_list)
+            writer.write((answer + '\n').encode())
+            await writer.drain()
+            sent = time.perf_counter()
+    finally:
+        writer.close()
+
+
+def percentile(values, p):
+    """
+    Returns the p-th percentile of a sorted list of values (nearest rank).
+    """
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, int(round(p / 100 * len(values))) - 1))
+    return values[rank]
+
+
+async def run_load(host, port, sessions, concurrency, num_hands, word_list):
+    """
+    Plays sessions games, at most concurrency at a time, and returns
+    (sorted move latencies, elapsed seconds).
+    """
+    latencies = []
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one_session():
+        async with limit:
+            await play_session(host, port, num_hands, word_list, latencies)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one_session() for i in range(sessions)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test server.py.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--local', action='store_true',
+                        help='start a server in this process on a free port')
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--hands', type=int, default=2)
+    args = parser.parse_args()
+
+    word_list = ps3.get_word_list()
+    # build the signature index used by best_word before timing anything
+    word_list.words_with_signature('')
+
+    async def load():
+        host, port = args.host, args.port
+        if args.local:
+            server = GameServer(word_list)
+            host, port = await server.start('127.0.0.1', 0)
+        result = await run_load(host, port, args.sessions, args.concurrency,
+                                args.hands, word_list)
+        if args.local:
+            server.close()
+        return result
+
+    latencies, elapsed = asyncio.run(load())
+    print('Sessions:          %d (%d concurrent)' % (args.sessions, args.concurrency))
+    print('Moves:             %d' % len(latencies))
+    print('Move latency p50:  %.2f ms' % (percentile(latencies, 50) * 1000))
+    print('Move latency p99:  %.2f ms' % (percentile(latencies, 99) * 1000))
+    print('Sessions per second: %.1f' % (args.sessions / elapsed))
+
+
+if __name__ == '__main__':
+    main()
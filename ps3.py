@@ -7,17 +7,52 @@
 # Collaborators : Lone wolf
 # Time spent    : Started: 07/29/2017 - Finished: soon
 
+import heapq
+import itertools
 import math
 import random
-import string
+import sys
+import threading
+import weakref
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, namedtuple
 
 VOWELS = 'aeiou'
 CONSONANTS = 'bcdfghjklmnpqrstvwxyz'
 HAND_SIZE = 7
 
-SCRABBLE_LETTER_VALUES = {
+class LetterValues(dict):
+    """
+    A dictionary of letter values that counts its changes in version, so
+    tables built from it (see WordDictionary.word_score) can tell cheaply
+    whether they are out of date.
+    """
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self.version = 0
+
+    def _changed(method):
+        def changed(self, *args, **kwargs):
+            self.version += 1
+            return method(self, *args, **kwargs)
+        changed.__name__ = method.__name__
+        return changed
+
+    __setitem__ = _changed(dict.__setitem__)
+    __delitem__ = _changed(dict.__delitem__)
+    __ior__ = _changed(dict.__ior__)
+    clear = _changed(dict.clear)
+    pop = _changed(dict.pop)
+    popitem = _changed(dict.popitem)
+    setdefault = _changed(dict.setdefault)
+    update = _changed(dict.update)
+    del _changed
+
+SCRABBLE_LETTER_VALUES = LetterValues({
     'a': 1, 'b': 3, 'c': 3, 'd': 2, 'e': 1, 'f': 4, 'g': 2, 'h': 4, 'i': 1, 'j': 8, 'k': 5, 'l': 1, 'm': 3, 'n': 1, 'o': 1, 'p': 3, 'q': 10, 'r': 1, 's': 1, 't': 1, 'u': 1, 'v': 4, 'w': 4, 'x': 8, 'y': 4, 'z': 10
-}
+})
 
 # -----------------------------------
 # Helper code
@@ -25,24 +60,383 @@ SCRABBLE_LETTER_VALUES = {
 
 WORDLIST_FILENAME = "words.txt"
 
-def load_words():
+class WordDictionary(object):
     """
-    Returns a list of valid words. Words are strings of lowercase letters.
+    A collection of valid words backed by a hash table, so membership
+    tests take constant time instead of scanning a list. Duplicate words
+    are dropped when the dictionary is built; iteration follows the order
+    in which words were first added.
+
+    Supports iteration, len() and the 'in' operator, so it can be used
+    anywhere a list of words was used before.
+
+    words: iterable of lowercase strings
+    max_hand_size: int, the largest hand length kept in the score table
+    """
+
+    def __init__(self, words=(), max_hand_size=HAND_SIZE):
+        # words: dictionary (string -> int or None), kept in insertion
+        # order; once the score table is built, each word maps to its row
+        self._words = dict.fromkeys(words)
+        # wildcards: dictionary (string -> string), built on first use
+        self._wildcards = None
+        # signatures: dictionary (string -> list of strings), built on first use
+        self._signatures = None
+        self.max_hand_size = max_hand_size
+        # score_table: tuple (letter values, version, letter sums, scores
+        # by hand length), built on first use
+        self._score_table = None
+        # signature_bounds: tuple (letter values, version, values, sorted
+        # signatures, lengths, letter sums), built on first use
+        self._signature_bounds = None
+
+    def __contains__(self, word):
+        return word in self._words
+
+    def __iter__(self):
+        return iter(self._words)
+
+    def __len__(self):
+        return len(self._words)
+
+    def __repr__(self):
+        return '<WordDictionary: %d words>' % len(self._words)
+
+    def _build_wildcard_index(self):
+        """
+        Maps every wildcard pattern (a word with one of its vowels replaced
+        by '*') to the vowels that '*' can stand for, in VOWELS order.
+        For example 'h*ney' maps to 'o' and 'b*t' maps to 'aeiou'.
+        """
+        wildcards = {}
+        for word in self._words:
+            for pos, char in enumerate(word):
+                if char in VOWELS:
+                    pattern = word[:pos] + '*' + word[pos + 1:]
+                    wildcards[pattern] = wildcards.get(pattern, '') + char
+        for pattern, vowels in wildcards.items():
+            if len(vowels) > 1:
+                wildcards[pattern] = ''.join(sorted(vowels, key=VOWELS.index))
+        return wildcards
+
+    def wildcard_vowels(self, word):
+        """
+        Returns the vowels that the '*' in word can stand for so that the
+        result is a valid word, or '' if there are none. The wildcard index
+        is built the first time this is called and reused afterwards.
+
+        word: lowercase string containing a single '*'
+        returns: string
+        """
+        if self._wildcards is None:
+            self._wildcards = self._build_wildcard_index()
+        return self._wildcards.get(word, '')
+
+    def words_with_signature(self, signature):
+        """
+        Returns the sorted list of words whose letters, once sorted, spell
+        signature. For example 'eilv' gives ['evil', 'levi', 'live', 'veil',
+        'vile']. The signature index is built the first time this is called.
+
+        signature: string of lowercase letters in sorted order
+        returns: list of strings
+        """
+        if self._signatures is None:
+            signatures = {}
+            for word in self._words:
+                signatures.setdefault(''.join(sorted(word)), []).append(word)
+            for words in signatures.values():
+                words.sort()
+            self._signatures = signatures
+        return self._signatures.get(signature, [])
+
+    def _build_score_table(self, values):
+        """
+        Returns the score table for the letter values values: the letter
+        sum of every word, by row, and for every hand length n from 1 to
+        max_hand_size, the score of every word by row (index 0 is unused).
+        """
+        words = self._words
+        for row, word in enumerate(words):
+            words[word] = row
+        value = values.__getitem__
+        sums = array('q', [sum(map(value, word)) for word in words])
+        lengths = [len(word) for word in words]
+        longest = max(lengths, default=0)
+        columns = [None]
+        for n in range(1, self.max_hand_size + 1):
+            # multipliers: the second component of the score, by length
+            multipliers = [max(10 * length - 3 * n, 1)
+                           for length in range(longest + 1)]
+            columns.append(array('q', map(
+                int.__mul__, sums, map(multipliers.__getitem__, lengths))))
+        return (values, getattr(values, 'version', None), dict(values),
+                sums, columns)
+
+    @staticmethod
+    def _is_stale(table, values):
+        """
+        Returns True if table, built for the letter values recorded in its
+        first three items, must be rebuilt for the letter values values.
+        """
+        return (table is None or table[0] is not values
+                or (table[1] != values.version if table[1] is not None
+                    else table[2] != values))
+
+    def word_score(self, word, n):
+        """
+        Returns get_word_score(word, n). Words of the dictionary are looked
+        up in a table built the first time this is called, and rebuilt if
+        SCRABBLE_LETTER_VALUES is replaced or changed; other words (such as
+        words with a wildcard, or with capital letters) are scored by
+        get_word_score.
+
+        word: string
+        n: int >= 0
+        returns: int >= 0
+        """
+        values = SCRABBLE_LETTER_VALUES
+        table = self._score_table
+        if self._is_stale(table, values):
+            table = self._score_table = self._build_score_table(values)
+        row = self._words.get(word)
+        if row is None:
+            return get_word_score(word, n)
+        if 0 < n <= self.max_hand_size:
+            return table[4][n][row]
+        return table[3][row] * max(10 * len(word) - 3 * n, 1)
+
+    def _build_signature_bounds(self, values):
+        """
+        Returns the signatures of the dictionary in sorted order, with
+        the block maxima (see _block_maxima) of their lengths and of their
+        letter sums for the letter values values.
+        """
+        self.words_with_signature('')
+        signatures = sorted(self._signatures)
+        value = values.__getitem__
+        lengths = _block_maxima(array('q', map(len, signatures)))
+        sums = _block_maxima(array('q', [sum(map(value, signature))
+                                         for signature in signatures]))
+        return (values, getattr(values, 'version', None), dict(values),
+                signatures, lengths, sums)
+
+    def signature_bounds(self, prefix, first):
+        """
+        Returns (length, letter sum): the greatest length and the greatest
+        letter sum of the signatures that are prefix itself or prefix
+        followed by letters no smaller than first, or None if there are
+        none. For example, for prefix 'eh' and first 'n' these include 'eh'
+        ('he') and 'ehnoy' ('honey'), but not 'ehlo' ('hole'). The arrays
+        they are read from are built the first time this is called, and
+        rebuilt if SCRABBLE_LETTER_VALUES is replaced or changed.
+
+        prefix: string of lowercase letters in sorted order
+        first: string, a single letter
+        returns: tuple (int, int) or None
+        """
+        values = SCRABBLE_LETTER_VALUES
+        bounds = self._signature_bounds
+        if self._is_stale(bounds, values):
+            bounds = self._signature_bounds = self._build_signature_bounds(values)
+        signatures, lengths, sums = bounds[3:]
+        length = total = -1
+        start = bisect_left(signatures, prefix)
+        if start < len(signatures) and signatures[start] == prefix:
+            length, total = len(prefix), sums[0][start]
+        low = bisect_left(signatures, prefix + first, start)
+        high = bisect_left(signatures, prefix + '\U0010ffff', low)
+        if low < high:
+            length = max(length, _range_max(lengths, low, high))
+            total = max(total, _range_max(sums, low, high))
+        return None if length < 0 else (length, total)
+
+# _BLOCK: the number of entries of each block of _block_maxima
+_BLOCK = 64
+
+def _block_maxima(values):
+    """
+    Returns a list of levels: values itself, then the maxima of every
+    _BLOCK consecutive entries of the level before, until a level has no
+    more than 2 * _BLOCK entries. Takes about 1/(_BLOCK - 1) more memory
+    than values.
+
+    values: array of ints
+    returns: list of arrays of ints
+    """
+    levels = [values]
+    while len(levels[-1]) > 2 * _BLOCK:
+        level = levels[-1]
+        levels.append(array(level.typecode, [
+            max(level[i:i + _BLOCK]) for i in range(0, len(level), _BLOCK)]))
+    return levels
+
+def _range_max(levels, low, high):
+    """
+    Returns the greatest of the entries low to high - 1 (low < high) of
+    the first level of levels, made by _block_maxima, looking at no more
+    than about 4 * _BLOCK entries per level.
+    """
+    best = None
+    for k, level in enumerate(levels):
+        if k == len(levels) - 1 or high - low <= 2 * _BLOCK:
+            found = max(level[low:high])
+            return found if best is None else max(best, found)
+        up = -(-low // _BLOCK) * _BLOCK
+        down = high // _BLOCK * _BLOCK
+        for part in (level[low:up], level[down:high]):
+            if part:
+                best = max(part) if best is None else max(best, max(part))
+        low, high = up // _BLOCK, down // _BLOCK
+
+def load_words(compact=False, verbose=True, filename=WORDLIST_FILENAME):
+    """
+    Returns a WordDictionary of valid words. Words are strings of
+    lowercase letters.
+
+    If compact is True, returns a dawg.CompactDictionary instead, which
+    takes much less memory. It is read from a precompiled cache file next
+    to the word list (see wordcache.py), which is memory-mapped rather than
+    parsed, so it loads almost instantly once the cache exists.
     
     Depending on the size of the word list, this function may
     take a while to finish.
+
+    compact: boolean
+    verbose: boolean, print progress messages
+    filename: string, the word list to read (one word per line)
+    returns: WordDictionary or CompactDictionary
     """
     
-    print("Loading word list from file...")
-    # inFile: file
-    inFile = open(WORDLIST_FILENAME, 'r')
-    # wordlist: list of strings
-    wordlist = []
-    for line in inFile:
-        wordlist.append(line.strip().lower())
-    print("  ", len(wordlist), "words loaded.")
+    if verbose:
+        print("Loading word list from file...")
+    if compact:
+        from wordcache import load_cached_words
+        wordlist = load_cached_words(filename)
+    else:
+        # inFile: file
+        inFile = open(filename, 'r')
+        # wordlist: WordDictionary of strings
+        wordlist = WordDictionary(line.strip().lower() for line in inFile)
+        inFile.close()
+    if verbose:
+        print("  ", len(wordlist), "words loaded.")
     return wordlist
 
+# _word_list: the process-wide WordDictionary, loaded by get_word_list
+_word_list = None
+_word_list_lock = threading.Lock()
+
+def word_score(word, n, word_list):
+    """
+    Returns get_word_score(word, n), from the score table of word_list if
+    it has one (see WordDictionary.word_score).
+
+    word: string
+    n: int >= 0
+    word_list: WordDictionary (or list) of lowercase strings
+    returns: int >= 0
+    """
+    lookup = getattr(word_list, 'word_score', None)
+    if lookup is None:
+        return get_word_score(word, n)
+    return lookup(word, n)
+
+def get_word_list():
+    """
+    Returns the WordDictionary shared by the whole process. The word list
+    is loaded (without printing) the first time this is called, and the
+    same object is returned afterwards, so importing ps3 never reads
+    words.txt. Safe to call from several threads.
+
+    returns: WordDictionary
+    """
+    global _word_list
+    if _word_list is None:
+        with _word_list_lock:
+            if _word_list is None:
+                _word_list = load_words(verbose=False)
+    return _word_list
+
+def __getattr__(name):
+    """
+    Makes ps3.word_list an alias for get_word_list().
+    """
+    if name == 'word_list':
+        return get_word_list()
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+# _signature_indexes: WeakKeyDictionary (word list -> WordDictionary), the
+# signature indexes built by signature_index, kept as long as their word
+# list
+_signature_indexes = weakref.WeakKeyDictionary()
+
+def signature_index(word_list):
+    """
+    Returns word_list if it has a words_with_signature method, and
+    otherwise a WordDictionary of its words. The WordDictionary made for
+    a read-only word list such as a CompactDictionary is built once and
+    kept for as long as the word list is. A list or set may change, so
+    it is indexed afresh on every call: convert it once with
+    WordDictionary(word_list) before querying it many times.
+
+    word_list: WordDictionary, CompactDictionary, list or set of
+        lowercase strings
+    returns: word list with a words_with_signature method
+    """
+    if hasattr(word_list, 'words_with_signature'):
+        return word_list
+    try:
+        index = _signature_indexes.get(word_list)
+    except TypeError:
+        # a list or set, which cannot be tracked
+        return WordDictionary(word_list)
+    if index is None:
+        index = _signature_indexes[word_list] = WordDictionary(word_list)
+    return index
+
+def resolve_wildcard(word, word_list):
+    """
+    Returns the list of valid words obtained by replacing the first '*'
+    in word with a vowel, in VOWELS order. Returns an empty list if no
+    vowel gives a valid word.
+
+    For example:
+        resolve_wildcard('h*ney', word_list)
+    should return:
+        ['honey']
+
+    word: lowercase string
+    word_list: WordDictionary, CompactDictionary or list of lowercase strings
+    returns: list of strings
+    """
+    wild_pos = word.find('*')
+    if hasattr(word_list, 'wildcard_vowels'):
+        vowels = word_list.wildcard_vowels(word)
+    else:
+        vowels = [v for v in VOWELS
+                  if word[:wild_pos] + v + word[wild_pos + 1:] in word_list]
+    return [word[:wild_pos] + v + word[wild_pos + 1:] for v in vowels]
+
+def get_sub_multisets(letters):
+    """
+    Returns every distinct sub-multiset of letters, each as a sorted
+    string, including the empty string and letters itself. A hand of
+    HAND_SIZE letters has at most 2**HAND_SIZE of them.
+
+    For example:
+        get_sub_multisets('aab')
+    should return (in some order):
+        ['', 'b', 'a', 'ab', 'aa', 'aab']
+
+    letters: string
+    returns: list of strings
+    """
+    subsets = ['']
+    for letter, count in sorted(get_frequency_dict(letters).items()):
+        subsets = [sub + letter * k for sub in subsets for k in range(count + 1)]
+    return subsets
+
 def get_frequency_dict(sequence):
     """
     Returns a dictionary where the keys are elements of the sequence
@@ -58,6 +452,262 @@ def get_frequency_dict(sequence):
     for x in sequence:
         freq[x] = freq.get(x,0) + 1
     return freq
+
+# HAND_LETTERS: the 27 letters a hand can hold, in slot order
+HAND_LETTERS = 'abcdefghijklmnopqrstuvwxyz*'
+_HAND_SLOTS = {letter: i for i, letter in enumerate(HAND_LETTERS)}
+
+class Hand(object):
+    """
+    An immutable hand stored as a fixed array of 27 counts (one per letter
+    plus one for '*'), with its length kept alongside. It can be used
+    wherever a hand dictionary is read (keys, items, values, get, 'in',
+    indexing), and update_hand, is_valid_word, calculate_handlen and
+    substitute_hand accept it as well as a plain dictionary.
+
+    Instead of copying and mutating, minus_word returns a new Hand. Equal
+    hands have equal keys, so a Hand can be used as a dictionary key.
+
+    For example:
+        Hand({'h':1, 'e':1, 'l':2, 'o':1}).minus_word('hole')
+    should return:
+        Hand({'l': 1})
+
+    letters: dictionary (string -> int) or string of letters
+    """
+    __slots__ = ('_counts', '_length')
+
+    def __init__(self, letters=''):
+        counts = bytearray(len(HAND_LETTERS))
+        if isinstance(letters, str):
+            letters = get_frequency_dict(letters)
+        for letter, count in letters.items():
+            if letter not in _HAND_SLOTS:
+                raise ValueError('not a hand letter: %r' % (letter,))
+            counts[_HAND_SLOTS[letter]] += count
+        self._counts = bytes(counts)
+        self._length = sum(counts)
+
+    @staticmethod
+    def _from_counts(counts, length):
+        hand = object.__new__(Hand)
+        hand._counts = counts
+        hand._length = length
+        return hand
+
+    @property
+    def length(self):
+        """The number of letters in the hand, as calculate_handlen."""
+        return self._length
+
+    @property
+    def key(self):
+        """The canonical, hashable form of the hand."""
+        return self._counts
+
+    def __getitem__(self, letter):
+        count = self.get(letter, 0)
+        if count == 0:
+            raise KeyError(letter)
+        return count
+
+    def get(self, letter, default=None):
+        slot = _HAND_SLOTS.get(letter)
+        if slot is None or self._counts[slot] == 0:
+            return default
+        return self._counts[slot]
+
+    def __contains__(self, letter):
+        slot = _HAND_SLOTS.get(letter)
+        return slot is not None and self._counts[slot] > 0
+
+    def keys(self):
+        return [HAND_LETTERS[i] for i, count in enumerate(self._counts) if count]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def values(self):
+        return [count for count in self._counts if count]
+
+    def items(self):
+        return [(HAND_LETTERS[i], count)
+                for i, count in enumerate(self._counts) if count]
+
+    def __len__(self):
+        # number of distinct letters, like len() of a hand dictionary
+        return len(self._counts) - self._counts.count(0)
+
+    def copy(self):
+        return self
+
+    def to_dict(self):
+        """Returns the hand as a dictionary (string -> int)."""
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, Hand):
+            return self._counts == other._counts
+        if isinstance(other, dict):
+            return self.to_dict() == {letter: count for letter, count
+                                      in other.items() if count != 0}
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._counts)
+
+    def __repr__(self):
+        return 'Hand(%r)' % (self.to_dict(),)
+
+    def minus_word(self, word):
+        """
+        Returns a new Hand without the letters of word, like update_hand:
+        letters that are not in the hand are ignored and no count goes
+        below 0. Does not modify this hand.
+
+        word: string
+        returns: Hand
+        """
+        counts = bytearray(self._counts)
+        removed = 0
+        for char in word.lower():
+            slot = _HAND_SLOTS.get(char)
+            if slot is not None and counts[slot]:
+                counts[slot] -= 1
+                removed += 1
+        return Hand._from_counts(bytes(counts), self._length - removed)
+
+    def substitute(self, letter, new_letter):
+        """
+        Returns a new Hand with every copy of letter replaced by
+        new_letter. Returns this hand if letter is not in it.
+
+        letter: string
+        new_letter: string, not already in the hand
+        returns: Hand
+        """
+        if letter not in self:
+            return self
+        counts = bytearray(self._counts)
+        counts[_HAND_SLOTS[new_letter]] += counts[_HAND_SLOTS[letter]]
+        counts[_HAND_SLOTS[letter]] = 0
+        return Hand._from_counts(bytes(counts), self._length)
+
+
+class HandState(object):
+    """
+    The hand of a hand dictionary being played, kept up to date word by
+    word instead of recomputed: its length is a stored number, exhausted
+    letters are dropped as soon as they are used up, and its display
+    string (see format_hand) is built once per state. Like Hand it is
+    immutable, and minus_word returns a new HandState.
+
+    It follows update_hand and calculate_handlen on the dictionary
+    exactly: every letter that was in the dictionary, even with a count
+    of 0, keeps taking one off the length each time it is played, so
+    playing more copies of a letter than the hand holds can make the
+    length drop below the number of letters shown. Such a letter keeps
+    its count below 0, which is_valid_word lets be played again.
+
+    hand: dictionary (string -> int)
+    """
+    __slots__ = ('_counts', '_letters', '_length', '_display')
+
+    def __init__(self, hand):
+        # counts: dictionary (string -> int), the letters left and those
+        # taken below 0, in order
+        self._counts = {letter: count for letter, count in hand.items()
+                        if count}
+        # letters: frozenset, every key of the original dictionary
+        self._letters = frozenset(hand)
+        self._length = sum(hand.values())
+        self._display = None
+
+    @property
+    def length(self):
+        """The length of the hand, as calculate_handlen."""
+        return self._length
+
+    @property
+    def display(self):
+        """The letters of the hand as format_hand returns them."""
+        if self._display is None:
+            self._display = ''.join((letter + ' ') * count
+                                    for letter, count in self._counts.items())
+        return self._display
+
+    def __getitem__(self, letter):
+        return self._counts[letter]
+
+    def get(self, letter, default=None):
+        return self._counts.get(letter, default)
+
+    def __contains__(self, letter):
+        return letter in self._counts
+
+    def keys(self):
+        return self._counts.keys()
+
+    def __iter__(self):
+        return iter(self._counts)
+
+    def values(self):
+        return self._counts.values()
+
+    def items(self):
+        return self._counts.items()
+
+    def __len__(self):
+        return len(self._counts)
+
+    def copy(self):
+        return self
+
+    def to_dict(self):
+        """Returns the counts other than 0 as a dictionary (string -> int)."""
+        return dict(self._counts)
+
+    def __eq__(self, other):
+        if isinstance(other, HandState):
+            return self._counts == other._counts
+        if isinstance(other, (dict, Hand)):
+            return self._counts == {letter: count for letter, count
+                                    in other.items() if count}
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'HandState(%r)' % (self._counts,)
+
+    def minus_word(self, word):
+        """
+        Returns the state after word is played, like update_hand on the
+        dictionary, or this state if word uses none of its letters.
+
+        word: string
+        returns: HandState
+        """
+        counts = None
+        length = self._length
+        for char in word.lower():
+            if char in self._letters:
+                length -= 1
+                if counts is None:
+                    counts = dict(self._counts)
+                count = counts.get(char, 0) - 1
+                if count:
+                    counts[char] = count
+                else:
+                    del counts[char]
+        if counts is None:
+            return self
+        state = object.__new__(HandState)
+        state._counts = counts
+        state._letters = self._letters
+        state._length = length
+        state._display = None
+        return state
 	
 
 # (end of helper code)
@@ -120,16 +770,13 @@ def display_hand(hand):
     hand: dictionary (string -> int)
     """
     
-    for letter in hand.keys():
-        for j in range(hand[letter]):
-             print(letter, end=' ')      # print all on the same line
-    print()                              # print an empty line
+    print(format_hand(hand))             # all on the same line, in one write
 
 #
 # Make sure you understand how this function works and what it does!
 # You will need to modify this for Problem #4.
 #
-def deal_hand(n):
+def deal_hand(n, rng=None):
     """
     Returns a random hand containing n lowercase letters.
     ceil(n/3) letters in the hand should be VOWELS (note,
@@ -139,20 +786,26 @@ def deal_hand(n):
     letters and the values are the number of times the
     particular letter is repeated in that hand.
 
+    Letters are drawn from rng, a random.Random, so that a seeded rng
+    deals the same hands every time; by default the random module's
+    shared generator is used. See handgen.py for dealing many hands.
+
     n: int >= 0
+    rng: random.Random or None
     returns: dictionary (string -> int)
     """
+    choice = (rng or random).choice
 
     hand = {'*': 1}
     n -= 1
     num_vowels = int(math.ceil(n / 3))
 
     for i in range(num_vowels):
-        x = random.choice(VOWELS)
+        x = choice(VOWELS)
         hand[x] = hand.get(x, 0) + 1
 
     for i in range(num_vowels, n):
-        x = random.choice(CONSONANTS)
+        x = choice(CONSONANTS)
         hand[x] = hand.get(x, 0) + 1
 
     return hand
@@ -175,9 +828,11 @@ def update_hand(hand, word):
     Has no side effects: does not modify hand.
 
     word: string
-    hand: dictionary (string -> int)    
-    returns: dictionary (string -> int)
+    hand: dictionary (string -> int) or Hand
+    returns: dictionary (string -> int), or Hand if hand is a Hand
     """
+    if isinstance(hand, (Hand, HandState)):
+        return hand.minus_word(word)
     new_hand = hand.copy()
     word = word.lower()
 
@@ -197,30 +852,638 @@ def is_valid_word(word, hand, word_list):
     Does not mutate hand or word_list.
    
     word: string
-    hand: dictionary (string -> int)
-    word_list: list of lowercase strings
+    hand: dictionary (string -> int) or Hand
+    word_list: WordDictionary (or list) of lowercase strings
     returns: boolean
     """
     word = word.lower()
-    temp_hand = hand.copy()
     wild_pos = word.find('*')
 
     if wild_pos != -1:
-        for v in VOWELS:
-            try_word = word[:wild_pos] + v + word[wild_pos + 1:]
-            if try_word in word_list:
-                break
-            elif v == 'u' and try_word not in word_list:
-                return False
+        if not resolve_wildcard(word, word_list):
+            return False
 
     elif word not in word_list:
         return False
-    for char in word:
-        if char not in temp_hand.keys() or temp_hand[char] == 0:
+    for char, count in get_frequency_dict(word).items():
+        # as when letters were taken off a copy of the hand one by one, a
+        # letter whose count update_hand took below 0 never runs out
+        have = hand.get(char, 0)
+        if have == 0 or 0 < have < count:
             return False
-        temp_hand[char] -= 1
     return True
 
+def best_word(hand, n, word_list):
+    """
+    Returns the highest-scoring word that is valid for hand, or None if
+    no word scores any points. The wildcard may be used in place of one
+    vowel, in which case the returned word contains '*' (e.g. 'h*ney').
+    Ties are broken by alphabetical order.
+
+    Only the sub-multisets of the hand are looked up in the signature
+    index of word_list, instead of testing every word in the dictionary.
+
+    hand: dictionary (string -> int)
+    n: int >= 0, the hand length used for scoring
+    word_list: WordDictionary (or any word list with a
+        words_with_signature method, or one signature_index indexes; a
+        list is indexed afresh on every call) of lowercase strings
+    returns: string or None
+    """
+    word_list = signature_index(word_list)
+    letters = ''.join(letter * count for letter, count in hand.items()
+                      if letter != '*' and count > 0)
+    vowels = VOWELS if hand.get('*', 0) > 0 else ''
+    best, best_score = None, 0
+
+    for sub in get_sub_multisets(letters):
+        # the words of one signature are sorted, but their wildcard forms
+        # need not be
+        candidates = word_list.words_with_signature(sub)[:1]
+        for v in vowels:
+            words = word_list.words_with_signature(''.join(sorted(sub + v)))
+            if words:
+                candidates.append(min(word.replace(v, '*', 1)
+                                      for word in words))
+        for word in candidates:
+            score = word_score(word, n, word_list)
+            if score > best_score or (score == best_score and best is not None
+                                      and word < best):
+                best, best_score = word, score
+
+    return best
+
+# _REFINE_LETTERS: top_words only refines the bounds of sub-multisets that
+# can still take this many letters; below that there are too few of them
+# for the lookups to pay
+_REFINE_LETTERS = 6
+
+def top_words(hand, n, word_list):
+    """
+    Yields (word, score) for every word that is valid for hand, from the
+    highest score down, with ties in alphabetical order. As in best_word,
+    the wildcard may be used in place of one vowel (the first copy of that
+    vowel in the word, e.g. 'h*ney').
+
+    Words are found lazily. The sub-multisets of the hand are explored
+    best first from a heap, each ordered by an upper bound on the score
+    of the words it can still lead to: all the words of one sub-multiset
+    score the same, and taking more letters never lowers a score. If
+    word_list has a signature_bounds method (see WordDictionary), the
+    bound is also capped by the longest and highest-scoring signatures
+    of the dictionary that can still be reached, and sub-multisets that
+    cannot reach any are dropped. Only the sub-multisets that can
+    outscore the next word are looked up in the signature index, so
+    taking the first few words (for example with itertools.islice) looks
+    at a small part of them.
+
+    hand: dictionary (string -> int) or Hand
+    n: int >= 0, the hand length used for scoring
+    word_list: WordDictionary (or any word list with a
+        words_with_signature method, or one signature_index indexes; a
+        list is indexed afresh on every call) of lowercase strings
+    returns: iterator of tuples (string, int)
+    """
+    word_list = signature_index(word_list)
+    signature_bounds = getattr(word_list, 'signature_bounds', None)
+    # letters: list of (letter, count, value), in sorted order, and then
+    # the wildcard, which scores nothing
+    letters = [(letter, count, SCRABBLE_LETTER_VALUES[letter])
+               for letter, count in sorted(hand.items())
+               if letter != '*' and count > 0]
+    real = len(letters)
+    wildcard = hand.get('*', 0) > 0
+    if wildcard:
+        letters.append(('*', 1, 0))
+    # rest: the letter sum and length of letters[i:], all taken; top: the
+    # sums of the k highest values of letters[i:], for every k
+    rest = [(0, 0)]
+    top = [[0]]
+    values = []
+    for letter, count, value in reversed(letters):
+        rest.append((rest[-1][0] + count * value, rest[-1][1] + count))
+        values = sorted(values + [value] * count, reverse=True)
+        top.append(list(itertools.accumulate(values, initial=0)))
+    rest.reverse()
+    top.reverse()
+
+    def score(total, length):
+        return total * max(7 * length - 3 * (n - length), 1)
+
+    def refine(i, signature, total, length):
+        # the bound of signature once letters[:i] are decided, capped by
+        # the signatures of the dictionary it can still lead to, or None
+        # if it cannot lead to any
+        first = letters[i][0]
+        found = [signature_bounds(signature, first)]
+        if wildcard:
+            found += [signature_bounds(''.join(sorted(signature + v)), first)
+                      for v in VOWELS if v < first]
+        found = [item for item in found if item is not None]
+        if not found:
+            return None
+        longest = max(item[0] for item in found)
+        most = max(item[1] for item in found)
+        sums = top[i]
+        taken = min(len(sums) - 1, max(longest - length, 0))
+        return score(min(total + sums[taken], most),
+                     min(length + rest[i][1], longest))
+
+    # heap: sub-multisets still to explore, as (-bound, 0, order, next
+    # letter, signature, letter sum, length, refined), and words found, as
+    # (-score, 1, word); at equal scores every sub-multiset is explored
+    # before any word is yielded, so that words come out in order. A
+    # sub-multiset is pushed with the bound of the hand alone, and refined
+    # with signature_bounds once it comes out on top, if enough letters
+    # are left for that to pay
+    heap = [(-score(*rest[0]), 0, 0, 0, '', 0, 0, signature_bounds is None)]
+    order = itertools.count(1)
+    while heap:
+        entry = heapq.heappop(heap)
+        if entry[1] == 1:
+            yield entry[2], -entry[0]
+            continue
+        best, stage, number, i, signature, total, length, refined = entry
+        if i == len(letters):
+            if signature.endswith('*'):
+                words = set()
+                for v in VOWELS:
+                    for word in word_list.words_with_signature(
+                            ''.join(sorted(signature[:-1] + v))):
+                        words.add(word.replace(v, '*', 1))
+            else:
+                words = word_list.words_with_signature(signature)
+            for word in words:
+                heapq.heappush(heap, (best, 1, word))
+            continue
+        if not refined and i < real and rest[i][1] >= _REFINE_LETTERS:
+            bound = refine(i, signature, total, length)
+            if bound is None:
+                continue
+            if bound < -best:
+                heapq.heappush(heap, (-bound, 0, next(order), i, signature,
+                                      total, length, True))
+                continue
+        letter, count, value = letters[i]
+        rest_total, rest_length = rest[i + 1]
+        for k in range(count + 1):
+            heapq.heappush(heap, (
+                -score(total + k * value + rest_total, length + k + rest_length),
+                0, next(order), i + 1, signature + letter * k,
+                total + k * value, length + k, signature_bounds is None))
+
+# CacheInfo: the statistics of a PlayCache, like those of functools.lru_cache
+CacheInfo = namedtuple('CacheInfo', 'hits misses maxsize currsize')
+
+class PlayCache(object):
+    """
+    A bounded cache of the validity and score of words played from hands,
+    for one word list. Entries are keyed on the lowercased word, the
+    canonical form of the hand (so equal hands share entries whatever
+    their letter order or type) and the hand length; the least recently
+    used entry is evicted once there are maxsize of them. The cache is
+    cleared if SCRABBLE_LETTER_VALUES changes.
+
+    One cache can be shared by several threads, and by the engines of
+    several games.
+
+    word_list: WordDictionary (or list) of lowercase strings
+    maxsize: int > 0
+    """
+
+    def __init__(self, word_list, maxsize=4096):
+        self.word_list = word_list
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # entries: OrderedDict (tuple -> tuple (boolean, int)), oldest first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # values: the letter values the entries were scored with, recorded
+        # as WordDictionary._is_stale expects, or None
+        self._values = None
+
+    @staticmethod
+    def hand_key(hand):
+        """
+        Returns the canonical, hashable form of hand: Hand.key, also for
+        hand dictionaries. Letters with a count of 0 are left out, since
+        they cannot be played; counts below 0 are kept, since is_valid_word
+        lets such a letter be played any number of times.
+
+        hand: dictionary (string -> int) or Hand
+        returns: bytes, or a tuple for dictionaries with other keys or
+            counts below 0
+        """
+        if isinstance(hand, Hand):
+            return hand.key
+        counts = bytearray(len(HAND_LETTERS))
+        for letter, count in hand.items():
+            if count:
+                slot = _HAND_SLOTS.get(letter)
+                if slot is None or not 0 < count < 256:
+                    return tuple(sorted(item for item in hand.items()
+                                        if item[1]))
+                counts[slot] = count
+        return bytes(counts)
+
+    def check(self, word, hand, n=None):
+        """
+        Returns (valid, score): is_valid_word(word, hand, word_list), and
+        the score of word for hand length n if it is valid (0 otherwise).
+        n is calculate_handlen(hand) by default.
+
+        word: string
+        hand: dictionary (string -> int) or Hand
+        n: int >= 0 or None
+        returns: tuple (boolean, int)
+        """
+        if n is None:
+            n = calculate_handlen(hand)
+        word = word.lower()
+        key = (word, self.hand_key(hand), n)
+        values = SCRABBLE_LETTER_VALUES
+        with self._lock:
+            if WordDictionary._is_stale(self._values, values):
+                self._entries.clear()
+                self._values = (values, getattr(values, 'version', None),
+                                dict(values))
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        if is_valid_word(word, hand, self.word_list):
+            result = (True, word_score(word, n, self.word_list))
+        else:
+            result = (False, 0)
+        with self._lock:
+            self._entries[key] = result
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def cache_info(self):
+        """
+        Returns the hits, misses, maxsize and current size of the cache.
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize,
+                             len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+#
+# Game engine: the rules of play_hand and play_game as state machines that
+# take the player's answers and return events, without any console I/O.
+#
+
+# PROMPTS: dictionary (string -> string), the question for each 'ask' event
+PROMPTS = {
+    'num_hands': 'Enter total number of hands: ',
+    'substitute': 'Would you like to substitute a letter? ',
+    'letter': 'Which letter would you like to replace? ',
+    'word': 'Enter word, or "!!" to indicate that you are finished: ',
+    'replay': 'Would you like to replay the hand? ',
+    'dictionary': 'Enter the name of a dictionary, or nothing for the default: ',
+}
+
+def is_yes(answer):
+    """
+    Returns True if answer means yes ('yes' or 'y').
+    """
+    return answer == 'yes' or answer == 'y'
+
+class HandEngine(object):
+    """
+    Plays one hand by the rules of play_hand. Call start() once, then
+    play(word) with every word the player enters, until finished is True.
+    Both return a list of events, each a tuple whose first item is its
+    kind:
+
+        ('hand', hand)               the hand before a word is asked for
+        ('ask', 'word')              a word (or '!!') is needed next
+        ('valid', word, score, total)  word was valid and scored score
+        ('invalid', word)            word was not valid
+        ('hand_over', total, ran_out)  the hand is finished; ran_out is
+                                     False if the player entered '!!'
+
+    A hand dictionary is played as a HandState, which follows the rules
+    of update_hand and calculate_handlen without recomputing the whole
+    hand every turn.
+
+    hand: dictionary (string -> int) or Hand
+    word_list: WordDictionary (or list) of lowercase strings
+    cache: PlayCache for word_list, or None to check every word afresh
+    """
+
+    def __init__(self, hand, word_list, cache=None):
+        if isinstance(hand, dict):
+            hand = HandState(hand)
+        self.hand = hand
+        self.word_list = word_list
+        self.cache = cache
+        self.total_score = 0
+        self.finished = False
+
+    def _next(self, events):
+        if calculate_handlen(self.hand) > 0:
+            events.append(('hand', self.hand))
+            events.append(('ask', 'word'))
+        else:
+            self.finished = True
+            events.append(('hand_over', self.total_score, True))
+        return events
+
+    def start(self):
+        """
+        Returns the events that open the hand.
+        """
+        return self._next([])
+
+    def play(self, word):
+        """
+        Plays word, or ends the hand if word is '!!', and returns the
+        resulting events. Any word uses up its letters from the hand.
+
+        word: string
+        returns: list of events
+        """
+        if self.finished:
+            raise ValueError('the hand is already finished')
+        if word == '!!':
+            self.finished = True
+            return [('hand_over', self.total_score, False)]
+
+        if self.cache is not None:
+            valid, score = self.cache.check(word, self.hand)
+        elif is_valid_word(word, self.hand, self.word_list):
+            valid = True
+            score = word_score(word, calculate_handlen(self.hand),
+                               self.word_list)
+        else:
+            valid = False
+        if valid:
+            self.total_score += score
+            events = [('valid', word, score, self.total_score)]
+        else:
+            events = [('invalid', word)]
+        self.hand = update_hand(self.hand, word)
+        return self._next(events)
+
+    def send(self, answer):
+        return self.play(answer)
+
+    @property
+    def result(self):
+        return self.total_score
+
+class GameEngine(object):
+    """
+    Plays a series of hands by the rules of play_game. Call start() once,
+    then send(answer) with the player's answer to every ('ask', question)
+    event, until finished is True. Questions are the keys of PROMPTS.
+    Besides the HandEngine events, the game returns:
+
+        ('deal', hand)        a new hand was dealt
+        ('game_over', total)  the series is finished
+
+    Like play_game, the substitute and replay questions are asked for
+    every hand. If limit_options is True, each option is only offered
+    until it has been used once, as the play_game docstring describes.
+
+    word_list: WordDictionary (or list) of lowercase strings
+    hand_size: int, letters per hand
+    deal: function (int -> hand) used to deal hands, deal_hand by default
+    limit_options: boolean
+    rng: random.Random used by deal_hand and substitute_hand, or None for
+        the random module's shared generator
+    cache: PlayCache for word_list, shared by the hands, or None
+    """
+
+    def __init__(self, word_list, hand_size=HAND_SIZE, deal=None,
+                 limit_options=False, rng=None, cache=None):
+        self.word_list = word_list
+        self.cache = cache
+        self.hand_size = hand_size
+        self.rng = rng
+        if deal is None:
+            deal = lambda n: deal_hand(n, self.rng)
+        self.deal = deal
+        self.limit_options = limit_options
+        self.num_hands = 0
+        self.hands_played = 0
+        self.total_score = 0
+        self.hand = None
+        # round_scores: the scores of the current hand (two if replayed)
+        self.round_scores = []
+        self.can_substitute = True
+        self.can_replay = True
+        self.finished = False
+        self.state = None
+        self._hand_engine = None
+
+    def _ask(self, events, question):
+        self.state = question
+        events.append(('ask', question))
+        return events
+
+    def _deal(self, events):
+        if self.hands_played >= self.num_hands:
+            self.finished = True
+            self.state = None
+            events.append(('game_over', self.total_score))
+            return events
+        self.hand = self.deal(self.hand_size)
+        self.round_scores = []
+        events.append(('deal', self.hand))
+        if self.can_substitute:
+            return self._ask(events, 'substitute')
+        return self._play(events)
+
+    def _play(self, events):
+        self._hand_engine = HandEngine(self.hand, self.word_list, self.cache)
+        events.extend(self._hand_engine.start())
+        return self._after_word(events)
+
+    def _after_word(self, events):
+        if not self._hand_engine.finished:
+            self.state = 'word'
+            return events
+        self.round_scores.append(self._hand_engine.total_score)
+        if len(self.round_scores) == 1 and self.can_replay:
+            return self._ask(events, 'replay')
+        return self._finish_hand(events)
+
+    def _finish_hand(self, events):
+        self.total_score += max(self.round_scores)
+        self.hands_played += 1
+        return self._deal(events)
+
+    def start(self):
+        """
+        Returns the events that open the game.
+        """
+        return self._ask([], 'num_hands')
+
+    def send(self, answer):
+        """
+        Gives the answer to the last question asked and returns the
+        resulting events.
+
+        answer: string (or int for the number of hands)
+        returns: list of events
+        """
+        state = self.state
+        events = []
+        if state == 'num_hands':
+            self.num_hands = int(answer)
+            return self._deal(events)
+        if state == 'substitute':
+            if is_yes(answer):
+                return self._ask(events, 'letter')
+            return self._play(events)
+        if state == 'letter':
+            self.hand = substitute_hand(self.hand, answer, self.rng)
+            if self.limit_options:
+                self.can_substitute = False
+            return self._play(events)
+        if state == 'word':
+            events = self._hand_engine.play(answer)
+            return self._after_word(events)
+        if state == 'replay':
+            if is_yes(answer):
+                if self.limit_options:
+                    self.can_replay = False
+                return self._play(events)
+            return self._finish_hand(events)
+        raise ValueError('the game is already finished')
+
+    @property
+    def current_hand(self):
+        """The hand as it stands now: while a hand is being played, the
+        letters that are left in it."""
+        if self.state == 'word':
+            return self._hand_engine.hand
+        return self.hand
+
+    @property
+    def result(self):
+        return self.total_score
+
+def format_hand(hand):
+    """
+    Returns the letters of hand as display_hand prints them, without the
+    final newline.
+
+    For example:
+       format_hand({'a':1, 'x':2, 'l':3, 'e':1})
+    returns:
+       'a x x l l l e '
+
+    hand: dictionary (string -> int), Hand or HandState
+    returns: string
+    """
+    if isinstance(hand, HandState):
+        return hand.display
+    return ''.join((letter + ' ') * count for letter, count in hand.items()
+                   if count > 0)
+
+def format_event(event):
+    """
+    Returns the text that play_hand and play_game print for an engine
+    event, including the final newline. 'ask' events have no text here:
+    their question is in PROMPTS.
+
+    event: tuple
+    returns: string
+    """
+    kind = event[0]
+    if kind == 'deal':
+        return 'Current hand: ' + format_hand(event[1]) + '\n'
+    elif kind == 'hand':
+        return 'Current Hand: ' + format_hand(event[1]) + '\n'
+    elif kind == 'valid':
+        return '%s earned %s points. Total: %s points\n' % event[1:]
+    elif kind == 'invalid':
+        return 'This is not a valid word. Please enter a valid word. \n'
+    elif kind == 'hand_over':
+        if event[2]:
+            return 'Ran out of letters. Total score:  %s points\n' % event[1]
+        return 'Total score for this hand:  %s\n' % event[1]
+    elif kind == 'game_over':
+        return 'Total score over all hands:  %s\n' % event[1]
+    return ''
+
+class ConsoleSink(object):
+    """
+    Buffers the output of the game and writes it to the console in one
+    write per turn: when the player is asked a question, the text since
+    the last question is written together with the prompt, and then the
+    answer is read with input().
+
+    stream: file to write to, or None for sys.stdout at the time of
+        writing
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self._parts = []
+
+    def write(self, text):
+        self._parts.append(text)
+
+    def flush(self):
+        """
+        Writes out the buffered text, if any, and returns it.
+        """
+        text = ''.join(self._parts)
+        if text:
+            self._parts = []
+            stream = self.stream if self.stream is not None else sys.stdout
+            stream.write(text)
+            stream.flush()
+        return text
+
+    def ask(self, prompt):
+        """
+        Shows prompt after the buffered text and returns the answer.
+        """
+        self.write(prompt)
+        self.flush()
+        return str(input())
+
+def run_cli(engine, sink=None):
+    """
+    Drives engine from the console: prints its events and answers each
+    question with input(). Returns engine.result when it is finished.
+    Output goes through sink, a ConsoleSink by default.
+
+    engine: HandEngine or GameEngine
+    sink: ConsoleSink (or an object with the same write, flush and ask)
+    returns: int
+    """
+    if sink is None:
+        sink = ConsoleSink()
+    try:
+        events = engine.start()
+        while True:
+            for event in events:
+                if event[0] == 'ask':
+                    answer = sink.ask(PROMPTS[event[1]])
+                    break
+                sink.write(format_event(event))
+            else:
+                return engine.result
+            events = engine.send(answer)
+    finally:
+        sink.flush()
+
 #
 # Problem #5: Playing a hand
 #
@@ -228,15 +1491,17 @@ def calculate_handlen(hand):
     """
     Returns the length (number of letters) in the current hand.
 
-    hand: dictionary (string-> int)
+    hand: dictionary (string-> int) or Hand
     returns: integer
     """
+    if isinstance(hand, (Hand, HandState)):
+        return hand.length
     hand_len = 0
     for num in hand.values():
         hand_len += num
     return hand_len
 
-def play_hand(hand, word_list):
+def play_hand(hand, word_list, sink=None):
 
     """
     Allows the user to play the given hand, as follows:
@@ -261,41 +1526,16 @@ def play_hand(hand, word_list):
       The user can also finish playing the hand by inputing two 
       exclamation points (the string '!!') instead of a word.
 
+      This is a console front end for HandEngine, which holds the rules.
+
       hand: dictionary (string -> int)
       word_list: list of lowercase strings
+      sink: ConsoleSink for the output, or None for a new one
       returns: the total score for the hand
       
     """
 
-    total_score = 0  # Keep track of the total score
-
-    while calculate_handlen(hand) > 0:  # As long as there are still letters left in the hand:
-        print('Current Hand: ', end="")
-        display_hand(hand)  # Display the hand
-        word = str(input('Enter word, or "!!" to indicate that you are finished: '))  # Ask user for input
-
-        if word == '!!':  # If the input is two exclamation points:
-            print('Total score for this hand: ', total_score)
-            return total_score  # End the game (break out of the loop)
-
-        elif word != '!!':  # Otherwise (the input is not two exclamation points):
-            current_score = get_word_score(word, calculate_handlen(hand))
-            if is_valid_word(word, hand, word_list):  # If the word is valid:
-                print(word, 'earned', current_score, 'points.',
-                      end=" ")  # Tell the user how many points the word earned,
-                total_score += current_score
-                print('Total:', total_score, 'points')  # and the updated total score
-                hand = update_hand(hand, word)  # update the user's hand by removing the letters of their inputted word
-            else:  # Otherwise (the word is not valid):
-                print('This is not a valid word. Please enter a valid word. ')  # Reject invalid word (print a message)
-                hand = update_hand(hand, word)  # update the user's hand by removing the letters of their inputted word
-
-
-    # Game is over (user entered '!!' or ran out of letters),
-    # so tell user the total score
-
-    print('Ran out of letters. Total score: ', total_score, 'points')
-    return total_score  # Return the total score as result of function
+    return run_cli(HandEngine(hand, word_list), sink)
 
 #
 # Problem #6: Playing a game
@@ -306,7 +1546,7 @@ def play_hand(hand, word_list):
 # procedure you will use to substitute a letter in a hand
 #
 
-def substitute_hand(hand, letter):
+def substitute_hand(hand, letter, rng=None):
     """ 
     Allow the user to replace all copies of one letter in the hand (chosen by user)
     with a new letter chosen from the VOWELS and CONSONANTS at random. The new letter
@@ -324,16 +1564,21 @@ def substitute_hand(hand, letter):
     The new letter should not be 'h', 'e', 'l', or 'o' since those letters were
     already in the hand.
     
-    hand: dictionary (string -> int)
+    The new letter is drawn once, uniformly, from the letters that are
+    not in the hand, using rng (a random.Random, or the random module's
+    shared generator by default).
+
+    hand: dictionary (string -> int) or Hand
     letter: string
-    returns: dictionary (string -> int)
+    rng: random.Random or None
+    returns: dictionary (string -> int), or Hand if hand is a Hand
     """
 
-    new_letter = random.choice(VOWELS + CONSONANTS)
     sub_hand = hand.copy()  # does not mutate hand
-
-    while new_letter in sub_hand.keys():
-        new_letter = random.choice(VOWELS + CONSONANTS)
+    new_letter = (rng or random).choice(
+        [x for x in VOWELS + CONSONANTS if x not in sub_hand])
+    if isinstance(hand, Hand):
+        return hand.substitute(letter, new_letter)
     value = sub_hand[letter]
     del sub_hand[letter]
     sub_hand[new_letter] = value
@@ -341,7 +1586,7 @@ def substitute_hand(hand, letter):
     return sub_hand
        
     
-def play_game(word_list):
+def play_game(word_list, sink=None, rng=None):
     """
     Allow the user to play a series of hands
 
@@ -369,29 +1614,13 @@ def play_game(word_list):
       
     * Returns the total score for the series of hands
 
+    This is a console front end for GameEngine, which holds the rules.
+
     word_list: list of lowercase strings
+    sink: ConsoleSink for the output, or None for a new one
+    rng: random.Random to deal hands from, or None
     """
-    num_hands = int(input('Enter total number of hands: '))
-    total_score = 0
-
-    for num in range(num_hands):
-        current_score1 = 0
-        current_score2 = 0
-        hand = deal_hand(HAND_SIZE)
-        print('Current hand: ', end='')
-        display_hand(hand)
-        subs = str(input('Would you like to substitute a letter? '))
-        if subs == 'yes' or subs == 'y':
-            letter = str(input('Which letter would you like to replace? '))
-            hand = substitute_hand(hand, letter)
-        current_score1 = play_hand(hand, word_list)
-
-        replay = str(input('Would you like to replay the hand? '))
-        if replay == 'yes' or replay == 'y':
-            current_score2 = play_hand(hand, word_list)
-        total_score = total_score + max(current_score1, current_score2)
-    print('Total score over all hands: ', total_score)
-    return total_score
+    return run_cli(GameEngine(word_list, rng=rng), sink)
 
 #
 # Build data structures used for entire session and play game
@@ -399,5 +1628,5 @@ def play_game(word_list):
 # when the program is run directly, instead of through an import statement
 #
 if __name__ == '__main__':
-    word_list = load_words()
+    word_list = load_words(compact=True)
     play_game(word_list)
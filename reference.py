@@ -0,0 +1,97 @@
+# 6.0001 Problem Set 3
+#
+# Frozen copies of the functions of ps3.py as they were before any of
+# them was made faster: scoring, updating and checking words against a
+# hand dictionary and a plain list (or set) of words. They are what the
+# fast paths of ps3.py must agree with, and difftest.py checks them
+# against these. Do not change them to follow ps3.py: a change in
+# behaviour there should show up as a divergence.
+#
+# Letter values are read from ps3.SCRABBLE_LETTER_VALUES at each call, so
+# that changing them changes both alike.
+
+import ps3
+
+
+def get_word_score(word, n):
+    """
+    Returns the score for a word, as the original get_word_score.
+
+    word: string
+    n: int >= 0
+    returns: int >= 0
+    """
+    word = word.lower()
+    fcomp = 0
+
+    for char in word:
+        if char == '*':
+            continue
+        fcomp += ps3.SCRABBLE_LETTER_VALUES[char]
+
+    scomp = max(7 * len(word) - 3 * (n - len(word)), 1)
+    word_score = fcomp * scomp
+
+    return word_score
+
+def update_hand(hand, word):
+    """
+    Returns hand without the letters of word, as the original update_hand:
+    every letter of word that is in hand takes one off its count, even
+    below 0. Does not modify hand.
+
+    word: string
+    hand: dictionary (string -> int)
+    returns: dictionary (string -> int)
+    """
+    new_hand = hand.copy()
+    word = word.lower()
+
+    for char in word:
+        if char in new_hand.keys():
+            new_hand[char] -= 1
+
+    return new_hand
+
+def is_valid_word(word, hand, word_list):
+    """
+    Returns True if word is in word_list and is made of letters in hand,
+    as the original is_valid_word: the letters are taken off a copy of
+    hand one by one, and only a count of exactly 0 runs out.
+
+    word: string
+    hand: dictionary (string -> int)
+    word_list: list (or set) of lowercase strings
+    returns: boolean
+    """
+    word = word.lower()
+    temp_hand = hand.copy()
+    wild_pos = word.find('*')
+
+    if wild_pos != -1:
+        for v in ps3.VOWELS:
+            try_word = word[:wild_pos] + v + word[wild_pos + 1:]
+            if try_word in word_list:
+                break
+            elif v == 'u' and try_word not in word_list:
+                return False
+
+    elif word not in word_list:
+        return False
+    for char in word:
+        if char not in temp_hand.keys() or temp_hand[char] == 0:
+            return False
+        temp_hand[char] -= 1
+    return True
+
+def calculate_handlen(hand):
+    """
+    Returns the length of hand, the sum of its counts.
+
+    hand: dictionary (string -> int)
+    returns: integer
+    """
+    hand_len = 0
+    for num in hand.values():
+        hand_len += num
+    return hand_len
@@ -0,0 +1,125 @@
+# 6.0001 Problem Set 3
+#
+# Bulk scoring of a whole dictionary. A words x 26 letter-count matrix is
+# built once; the score of every word for any hand length n is then a
+# single batched computation instead of one get_word_score call per word.
+#
+# NumPy is used when it is installed. Without it the same columns are kept
+# in plain arrays and scored with a list comprehension, which is slower
+# than NumPy but still much faster than calling get_word_score per word.
+
+from array import array
+
+import ps3
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+class ScoreMatrix(object):
+    """
+    Letter counts of every word of a word list, for scoring the whole list
+    at once. Row i of the matrix is the i-th word of word_list, in
+    iteration order (the same order as self.words).
+
+    word_list: WordDictionary, CompactDictionary or list of lowercase strings
+    """
+
+    def __init__(self, word_list):
+        self.words = list(word_list)
+        self.counts = None
+        if np is not None:
+            # counts: words x 26 matrix of letter counts
+            lengths = np.fromiter((len(word) for word in self.words),
+                                  dtype=np.int64, count=len(self.words))
+            if len(self.words):
+                data = np.frombuffer(''.join(self.words).encode('ascii'),
+                                     dtype=np.uint8)
+                rows = np.repeat(np.arange(len(self.words)), lengths)
+            else:
+                data = np.zeros(0, dtype=np.uint8)
+                rows = np.zeros(0, dtype=np.int64)
+            self.counts = np.zeros((len(self.words), len(LETTERS)),
+                                   dtype=np.int32)
+            np.add.at(self.counts, (rows, data.astype(np.int64) - ord('a')), 1)
+            self.lengths = lengths
+        else:
+            self.lengths = array('l', (len(word) for word in self.words))
+        self.letter_sums = self._letter_sums()
+
+    def _letter_sums(self):
+        """
+        Returns the first component of the score (the sum of the letter
+        values) of every word, using the current SCRABBLE_LETTER_VALUES.
+        """
+        values = ps3.SCRABBLE_LETTER_VALUES
+        if np is not None:
+            return self.counts @ np.array([values[letter] for letter in LETTERS],
+                                          dtype=np.int64)
+        return array('l', (sum(values[char] for char in word)
+                           for word in self.words))
+
+    def refresh(self):
+        """
+        Recomputes the letter sums after SCRABBLE_LETTER_VALUES changed.
+        """
+        self.letter_sums = self._letter_sums()
+
+    def scores(self, n):
+        """
+        Returns the score of every word for hand length n, aligned with
+        self.words: scores[i] == get_word_score(self.words[i], n).
+
+        n: int >= 0
+        returns: numpy array, or array of ints without NumPy
+        """
+        if np is not None:
+            return self.letter_sums * np.maximum(
+                10 * self.lengths - 3 * n, 1)
+        return array('l', [total * max(10 * length - 3 * n, 1)
+                           for total, length in zip(self.letter_sums,
+                                                    self.lengths)])
+
+    def playable(self, hand):
+        """
+        Returns a mask of the words that can be spelled with the letters
+        of hand (without the wildcard), aligned with self.words.
+
+        hand: dictionary (string -> int)
+        returns: numpy array of booleans, or list of booleans without NumPy
+        """
+        if np is not None:
+            available = np.array([hand.get(letter, 0) for letter in LETTERS],
+                                 dtype=np.int32)
+            return (self.counts <= available).all(axis=1)
+        return [all(hand.get(char, 0) >= count
+                    for char, count in ps3.get_frequency_dict(word).items())
+                for word in self.words]
+
+    def rank(self, hand, n, k=None):
+        """
+        Returns the words playable from hand (without the wildcard) as a
+        list of (score, word) pairs sorted by decreasing score, keeping
+        at most k of them.
+
+        hand: dictionary (string -> int)
+        n: int >= 0, the hand length used for scoring
+        k: int, or None for every playable word
+        returns: list of (int, string)
+        """
+        scores = self.scores(n)
+        mask = self.playable(hand)
+        if np is not None:
+            index = np.flatnonzero(mask)
+            order = index[np.argsort(-scores[index], kind='stable')]
+            if k is not None:
+                order = order[:k]
+            return [(int(scores[i]), self.words[i]) for i in order]
+        ranked = sorted(((scores[i], self.words[i])
+                         for i in range(len(self.words)) if mask[i]),
+                        key=lambda pair: -pair[0])
+        return ranked if k is None else ranked[:k]
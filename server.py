@@ -0,0 +1,203 @@
+# 6.0001 Problem Set 3
+#
+# Multi-session game server. Every TCP connection plays its own game of
+# play_game on a GameEngine, and all sessions share one word list (and
+# its indexes), loaded once when the server starts.
+#
+# The protocol is line based and mirrors the console game: the server
+# sends the text play_game would print, then the question as a line of
+# its own (one of ps3.PROMPTS, with a newline added), and reads the
+# answer as one line. The connection is closed when the game is over.
+#
+# When the server has a DictionaryRegistry (see dictionaries.py), every
+# session starts with the 'dictionary' question, and plays with the word
+# list registered under the name given, or with the default word list if
+# the answer is empty. Each word list is loaded once and shared by all the
+# sessions that pick it.
+#
+# Run with:
+#     python server.py --port 8765
+#     python server.py --dictionary house=house.txt --dictionary fr=fr.txt
+# and play with, for example:
+#     nc localhost 8765
+
+import argparse
+import asyncio
+
+import ps3
+from dictionaries import DictionaryRegistry
+
+
+class GameServer(object):
+    """
+    An asyncio TCP server running one GameEngine per connection.
+
+    Words are checked through a PlayCache per word list, shared by all
+    the sessions playing with it.
+
+    word_list: WordDictionary (or CompactDictionary), the default word list
+    hand_size: int, letters per hand
+    cache_size: int, the most words each shared PlayCache keeps
+    registry: DictionaryRegistry the sessions choose from, or None to
+        play every session with word_list
+    """
+
+    def __init__(self, word_list, hand_size=ps3.HAND_SIZE, cache_size=65536,
+                 registry=None):
+        self.word_list = word_list
+        self.hand_size = hand_size
+        self.cache_size = cache_size
+        self.cache = ps3.PlayCache(word_list, cache_size)
+        self.registry = registry
+        # caches: dictionary (string -> PlayCache), by dictionary name
+        self._caches = {}
+        self.active_sessions = 0
+        self.sessions_played = 0
+        self._server = None
+
+    async def start(self, host='127.0.0.1', port=0):
+        """
+        Starts listening and returns the (host, port) actually bound, so
+        port=0 picks a free port.
+        """
+        # build the wildcard index and score table now rather than during
+        # the first game
+        self.word_list.wildcard_vowels('*')
+        ps3.word_score('', 0, self.word_list)
+        self._server = await asyncio.start_server(self.handle_session,
+                                                  host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        self._server.close()
+
+    async def choose_dictionary(self, reader, writer):
+        """
+        Asks the client which dictionary to play with, and returns its
+        (word list, PlayCache), or None if the client went away. Word
+        lists are loaded in a worker thread, so that other sessions go on
+        in the meantime.
+        """
+        prompt = (ps3.PROMPTS['dictionary'] + '\n').encode()
+        writer.write(prompt)
+        loop = asyncio.get_running_loop()
+        while True:
+            await writer.drain()
+            line = await reader.readline()
+            if not line:
+                return None
+            name = line.decode(errors='replace').strip()
+            if not name:
+                return self.word_list, self.cache
+            if name in self.registry:
+                try:
+                    word_list = await loop.run_in_executor(
+                        None, self.registry.get, name)
+                    break
+                except OSError:
+                    # the word list file cannot be read
+                    pass
+            writer.write(b'Invalid answer, please try again.\n' + prompt)
+        cache = self._caches.get(name)
+        if cache is None or cache.word_list is not word_list:
+            cache = self._caches[name] = ps3.PlayCache(word_list,
+                                                       self.cache_size)
+        return word_list, cache
+
+    async def handle_session(self, reader, writer):
+        """
+        Plays one game with the client on the other end of reader and
+        writer.
+        """
+        self.active_sessions += 1
+        try:
+            word_list, cache = self.word_list, self.cache
+            if self.registry is not None:
+                choice = await self.choose_dictionary(reader, writer)
+                if choice is None:
+                    return
+                word_list, cache = choice
+            engine = ps3.GameEngine(word_list, self.hand_size, cache=cache)
+            events = engine.start()
+            while True:
+                question = None
+                text = []
+                for event in events:
+                    if event[0] == 'ask':
+                        question = event[1]
+                        text.append(ps3.PROMPTS[question] + '\n')
+                    else:
+                        text.append(ps3.format_event(event))
+                writer.write(''.join(text).encode())
+                await writer.drain()
+                if question is None:
+                    break
+
+                line = await reader.readline()
+                if not line:
+                    break
+                answer = line.decode(errors='replace').rstrip('\r\n')
+                try:
+                    if engine.state == 'num_hands' and int(answer) < 0:
+                        raise ValueError('negative number of hands')
+                    events = engine.send(answer)
+                except (ValueError, KeyError):
+                    # bad number of hands or a letter not in the hand:
+                    # the engine is unchanged, so ask again
+                    events = [('ask', engine.state)]
+                    writer.write(b'Invalid answer, please try again.\n')
+            self.sessions_played += 1
+        except ConnectionError:
+            pass
+        finally:
+            self.active_sessions -= 1
+            writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the word game over TCP.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--compact', action='store_true',
+                        help='use the memory-mapped compact dictionary')
+    parser.add_argument('--cache-size', type=int, default=65536,
+                        help='the most words each shared PlayCache keeps')
+    parser.add_argument('--dictionary', action='append', default=[],
+                        metavar='NAME=FILE',
+                        help='offer the word list in FILE as NAME')
+    parser.add_argument('--max-dictionary-bytes', type=int, default=None,
+                        help='memory cap for the loaded dictionaries')
+    args = parser.parse_args()
+
+    if args.compact:
+        word_list = ps3.load_words(compact=True)
+    else:
+        word_list = ps3.get_word_list()
+    registry = None
+    if args.dictionary:
+        registry = DictionaryRegistry(args.max_dictionary_bytes)
+        for option in args.dictionary:
+            name, sep, filename = option.partition('=')
+            if not sep:
+                parser.error('--dictionary must be NAME=FILE')
+            registry.register(name, filename, args.compact)
+
+    async def serve():
+        server = GameServer(word_list, cache_size=args.cache_size,
+                            registry=registry)
+        host, port = await server.start(args.host, args.port)
+        print('Serving the word game on %s:%d' % (host, port))
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
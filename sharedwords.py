@@ -0,0 +1,227 @@
+# 6.0001 Problem Set 3
+#
+# A word list that worker processes share instead of each loading their
+# own. The words (as the DAWG of wordcache.py) and the signature index
+# used by best_word and HandSolver are compiled once into two files that
+# every process memory-maps read-only: the operating system keeps a
+# single copy of their pages, whatever the number of processes, and
+# attaching takes a fraction of a millisecond since nothing is parsed or
+# copied.
+#
+# Signature index layout (native byte order, every section 4-byte
+# aligned), in a file next to the word list with the extension '.sig':
+#
+#     header        see HEADER below
+#     table         size unsigned 32-bit ints: an open-addressing hash
+#                   table (CRC-32 of the signature, linear probing) of
+#                   signature numbers plus one, 0 for an empty slot
+#     sig_offsets   (signatures + 1) unsigned 32-bit ints into sig_blob
+#     word_starts   (signatures + 1) unsigned 32-bit ints: the words of
+#                   signature i are words word_starts[i] to
+#                   word_starts[i+1] - 1, in sorted order
+#     word_offsets  (words + 1) unsigned 32-bit ints into word_blob
+#     sig_blob      the signatures, concatenated
+#     word_blob     the words, concatenated
+#
+# The index is rebuilt whenever the DAWG cache is, and records the SHA-256
+# of the word list it was built from.
+
+import mmap
+import os
+import struct
+import zlib
+from array import array
+
+import ps3
+import wordcache
+
+MAGIC = b'PS3SIGX1'
+VERSION = 1
+# magic, version, byte order, source sha256, signatures, words, table size
+HEADER = struct.Struct('=8sHH32sIII')
+
+
+def get_index_filename(filename):
+    """
+    Returns the name of the signature index file for the word list in
+    filename, e.g. 'words.sig' for 'words.txt'.
+    """
+    return os.path.splitext(filename)[0] + '.sig'
+
+
+def compile_index(words, sha256, index_filename):
+    """
+    Writes the signature index of words to index_filename, through a
+    temporary file, and returns index_filename.
+
+    words: iterable of lowercase strings
+    sha256: bytes, the hash of the word list the words come from
+    index_filename: string
+    returns: string
+    """
+    groups = {}
+    for word in set(words):
+        groups.setdefault(''.join(sorted(word)), []).append(word)
+    signatures = sorted(groups)
+    size = 1
+    while size < 2 * len(signatures) + 1:
+        size *= 2
+
+    table = array('I', bytes(4 * size))
+    sig_offsets = array('I', [0])
+    word_starts = array('I', [0])
+    word_offsets = array('I', [0])
+    sig_blob = bytearray()
+    word_blob = bytearray()
+    for number, signature in enumerate(signatures):
+        key = signature.encode('ascii')
+        slot = zlib.crc32(key) & (size - 1)
+        while table[slot]:
+            slot = (slot + 1) & (size - 1)
+        table[slot] = number + 1
+        sig_blob += key
+        sig_offsets.append(len(sig_blob))
+        for word in sorted(groups[signature]):
+            word_blob += word.encode('ascii')
+            word_offsets.append(len(word_blob))
+        word_starts.append(len(word_offsets) - 1)
+
+    header = HEADER.pack(MAGIC, VERSION, wordcache.BYTE_ORDER, sha256,
+                         len(signatures), len(word_offsets) - 1, size)
+    temp_filename = '%s.%d.tmp' % (index_filename, os.getpid())
+    with open(temp_filename, 'wb') as outFile:
+        for section in (header, table.tobytes(), sig_offsets.tobytes(),
+                        word_starts.tobytes(), word_offsets.tobytes(),
+                        bytes(sig_blob), bytes(word_blob)):
+            outFile.write(section)
+            outFile.write(b'\0' * wordcache._pad(len(section)))
+    os.replace(temp_filename, index_filename)
+    return index_filename
+
+
+class SignatureIndex(object):
+    """
+    The signature index of a word list, read in place from a buffer laid
+    out as described at the top of this module (usually a memory-mapped
+    file).
+
+    buffer: bytes, mmap or other buffer
+    """
+
+    def __init__(self, buffer):
+        header = HEADER.unpack_from(buffer)
+        if header[:3] != (MAGIC, VERSION, wordcache.BYTE_ORDER):
+            raise ValueError('not a signature index this version can read')
+        self.sha256 = header[3]
+        signatures, words, size = header[4:]
+        self._buffer = buffer
+        self._mask = size - 1
+        view = memoryview(buffer)
+        pos = HEADER.size + wordcache._pad(HEADER.size)
+        arrays = []
+        for count in (size, signatures + 1, signatures + 1, words + 1):
+            arrays.append(view[pos:pos + 4 * count].cast('I'))
+            pos += 4 * count
+        self._table, self._sig_offsets, self._word_starts, self._word_offsets = arrays
+        self._sig_base = pos
+        self._word_base = pos + self._sig_offsets[-1]
+        self._word_base += wordcache._pad(self._sig_offsets[-1])
+
+    def words_with_signature(self, signature):
+        """
+        Returns the sorted list of words whose letters, once sorted, spell
+        signature, like WordDictionary.words_with_signature.
+
+        signature: string of lowercase letters in sorted order
+        returns: list of strings
+        """
+        key = signature.encode('ascii')
+        table = self._table
+        buffer = self._buffer
+        slot = zlib.crc32(key) & self._mask
+        while True:
+            number = table[slot]
+            if number == 0:
+                return []
+            number -= 1
+            start = self._sig_base + self._sig_offsets[number]
+            end = self._sig_base + self._sig_offsets[number + 1]
+            if buffer[start:end] == key:
+                break
+            slot = (slot + 1) & self._mask
+        offsets = self._word_offsets
+        base = self._word_base
+        return [buffer[base + offsets[i]:base + offsets[i + 1]].decode('ascii')
+                for i in range(self._word_starts[number],
+                               self._word_starts[number + 1])]
+
+
+class SharedWordList(object):
+    """
+    A word list backed by memory-mapped files: a CompactDictionary for
+    membership, wildcards and iteration, and a SignatureIndex for
+    words_with_signature. It can be used as the word_list of
+    is_valid_word, best_word, the engines and HandSolver.
+
+    words: CompactDictionary
+    index: SignatureIndex
+    """
+
+    def __init__(self, words, index):
+        self.words = words
+        self.index = index
+        self.words_with_signature = index.words_with_signature
+        self.wildcard_vowels = words.wildcard_vowels
+
+    def __contains__(self, word):
+        return word in self.words
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def __len__(self):
+        return len(self.words)
+
+    def __repr__(self):
+        return '<SharedWordList: %d words>' % len(self.words)
+
+
+def prepare(filename=ps3.WORDLIST_FILENAME):
+    """
+    Makes sure the DAWG cache and the signature index of the word list in
+    filename are up to date, compiling them if needed, and returns their
+    file names. Call this once, before starting the workers that attach().
+
+    filename: string
+    returns: tuple (string, string)
+    """
+    cache_filename = wordcache.get_cache_filename(filename)
+    index_filename = get_index_filename(filename)
+    if not wordcache.is_fresh(filename, cache_filename):
+        wordcache.compile_words(filename, cache_filename)
+    sha256 = wordcache.read_header(cache_filename)[5]
+    try:
+        with open(index_filename, 'rb') as inFile:
+            header = HEADER.unpack(inFile.read(HEADER.size))
+    except (OSError, struct.error):
+        header = None
+    if header is None or header[:4] != (MAGIC, VERSION,
+                                        wordcache.BYTE_ORDER, sha256):
+        compile_index(wordcache.map_words(cache_filename), sha256,
+                      index_filename)
+    return cache_filename, index_filename
+
+
+def attach(cache_filename, index_filename):
+    """
+    Memory-maps the files made by prepare() and returns the word list
+    they hold, without reading or copying them.
+
+    cache_filename: string
+    index_filename: string
+    returns: SharedWordList
+    """
+    with open(index_filename, 'rb') as inFile:
+        mapped = mmap.mmap(inFile.fileno(), 0, access=mmap.ACCESS_READ)
+    return SharedWordList(wordcache.map_words(cache_filename),
+                          SignatureIndex(mapped))
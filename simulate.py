@@ -0,0 +1,340 @@
+# 6.0001 Problem Set 3
+#
+# Headless game simulator. Hands are dealt with deal_hand and played by an
+# automatic player instead of input(), and games are spread over a pool of
+# worker processes, each loading the word list once and playing its share
+# of games from its own seeded HandGenerator (see handgen.py).
+#
+# Run with, for example:
+#     python simulate.py --games 20000 --hands 3 --player greedy --workers 4
+
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import ps3
+import sharedwords
+from advisor import Advisor
+from handgen import HandGenerator
+from solver import HandSolver
+
+
+class Player(object):
+    """
+    An automatic player. Subclasses override choose_word, and may override
+    choose_substitute and choose_replay to use the once-per-game options
+    of play_game.
+
+    word_list: WordDictionary of lowercase strings
+    """
+
+    def __init__(self, word_list):
+        self.word_list = word_list
+
+    def choose_word(self, hand, n):
+        """
+        Returns the word to play from hand, or '!!' to end the hand.
+
+        hand: dictionary (string -> int) or Hand
+        n: int, the number of letters in hand
+        returns: string
+        """
+        return '!!'
+
+    def choose_substitute(self, hand):
+        """
+        Returns the letter of hand to substitute, or None to keep it.
+        """
+        return None
+
+    def choose_replay(self, hand, score):
+        """
+        Returns True to replay hand, which scored score the first time.
+        """
+        return False
+
+
+class GreedyPlayer(Player):
+    """
+    Plays the highest-scoring word (see best_word) until none is left.
+    """
+
+    def choose_word(self, hand, n):
+        word = ps3.best_word(hand, n, self.word_list)
+        return '!!' if word is None else word
+
+
+class OptimalPlayer(Player):
+    """
+    Plays the score-maximising sequence of words found by HandSolver.
+    """
+
+    def __init__(self, word_list):
+        Player.__init__(self, word_list)
+        self.solver = HandSolver(word_list)
+        self._plan = []
+
+    def choose_word(self, hand, n):
+        if not self._plan:
+            score, self._plan = self.solver.solve(hand)
+            if not self._plan:
+                return '!!'
+        return self._plan.pop(0)
+
+
+class AdvisedPlayer(OptimalPlayer):
+    """
+    An OptimalPlayer that also substitutes the letter the Advisor expects
+    to gain the most from, and replays a hand when it can score more.
+    """
+
+    def __init__(self, word_list):
+        OptimalPlayer.__init__(self, word_list)
+        # the exact expectation, so that games do not depend on sampling
+        self.advisor = Advisor(word_list, samples=None)
+        self.advisor.solver = self.solver
+
+    def choose_substitute(self, hand):
+        return self.advisor.best_substitution(hand)
+
+    def choose_replay(self, hand, score):
+        return self.advisor.replay_value(hand, score) > 0
+
+
+PLAYERS = {'greedy': GreedyPlayer, 'optimal': OptimalPlayer,
+           'advised': AdvisedPlayer}
+
+
+def simulate_hand(hand, player, word_list):
+    """
+    Plays hand on a HandEngine, with player choosing the words, and
+    returns the total score for the hand.
+
+    hand: dictionary (string -> int) or Hand
+    player: Player
+    word_list: WordDictionary of lowercase strings
+    returns: int
+    """
+    engine = ps3.HandEngine(hand, word_list)
+    engine.start()
+    while not engine.finished:
+        engine.play(player.choose_word(engine.hand,
+                                       ps3.calculate_handlen(engine.hand)))
+    return engine.total_score
+
+
+def deal_hand(n):
+    """
+    Returns ps3.deal_hand(n) as a Hand.
+    """
+    return ps3.Hand(ps3.deal_hand(n))
+
+
+def simulate_game(num_hands, player, word_list, hand_size=ps3.HAND_SIZE,
+                  generator=None):
+    """
+    Plays a series of num_hands hands on a GameEngine, with player
+    answering its questions, and returns the total score. The substitute
+    and replay options can each be used once per game, as the play_game
+    docstring describes.
+
+    Hands are dealt and substituted from generator, or with the random
+    module's shared generator if it is None.
+
+    num_hands: int >= 0
+    player: Player
+    word_list: WordDictionary of lowercase strings
+    hand_size: int > 0
+    generator: HandGenerator or None
+    returns: int
+    """
+    if generator is None:
+        engine = ps3.GameEngine(word_list, hand_size, deal=deal_hand,
+                                limit_options=True)
+    else:
+        engine = ps3.GameEngine(word_list, hand_size, deal=generator.deal,
+                                limit_options=True, rng=generator)
+    engine.start()
+    letter = None
+    while not engine.finished:
+        question = engine.state
+        hand = engine.current_hand
+        if question == 'num_hands':
+            answer = num_hands
+        elif question == 'substitute':
+            letter = player.choose_substitute(hand)
+            answer = 'no' if letter is None else 'yes'
+        elif question == 'letter':
+            answer = letter
+        elif question == 'word':
+            answer = player.choose_word(hand, ps3.calculate_handlen(hand))
+        else:
+            answer = 'yes' if player.choose_replay(
+                hand, engine.round_scores[0]) else 'no'
+        engine.send(answer)
+    return engine.total_score
+
+
+class ScoreDistribution(object):
+    """
+    A histogram of game scores that can be merged with others.
+    """
+
+    def __init__(self):
+        # counts: dictionary (int -> int), score -> number of games
+        self.counts = {}
+        self.games = 0
+
+    def add(self, score):
+        self.counts[score] = self.counts.get(score, 0) + 1
+        self.games += 1
+
+    def merge(self, other):
+        for score, count in other.counts.items():
+            self.counts[score] = self.counts.get(score, 0) + count
+        self.games += other.games
+
+    def mean(self):
+        """
+        Returns the mean score, or 0.0 if no games were played.
+        """
+        if not self.games:
+            return 0.0
+        return sum(score * count for score, count in self.counts.items()) / self.games
+
+    def stdev(self):
+        """
+        Returns the standard deviation of the scores, or 0.0 if no games
+        were played.
+        """
+        if not self.games:
+            return 0.0
+        mean = self.mean()
+        return math.sqrt(sum(count * (score - mean) ** 2
+                             for score, count in self.counts.items()) / self.games)
+
+    def percentile(self, p):
+        """
+        Returns the smallest score such that at least p percent of games
+        scored no more than it, or None if no games were played.
+        """
+        needed = max(1, math.ceil(self.games * p / 100))
+        seen = 0
+        for score in sorted(self.counts):
+            seen += self.counts[score]
+            if seen >= needed:
+                return score
+
+
+# _worker_state: (word_list, dictionary (string -> Player)) in each worker
+_worker_state = None
+
+
+def _init_worker(shared_files=None):
+    """
+    Loads the word list of a worker, or attaches to the shared one if
+    shared_files is the pair of file names returned by sharedwords.prepare.
+    """
+    global _worker_state
+    if shared_files is not None:
+        word_list = sharedwords.attach(*shared_files)
+    else:
+        word_list = ps3.get_word_list()
+    _worker_state = (word_list, {})
+
+
+def _run_chunk(player_name, num_games, num_hands, hand_size, seed):
+    """
+    Plays num_games games in the current process with hands from a
+    HandGenerator seeded with seed, and returns their ScoreDistribution.
+    """
+    if _worker_state is None:
+        _init_worker()
+    word_list, players = _worker_state
+    if player_name not in players:
+        players[player_name] = PLAYERS[player_name](word_list)
+    player = players[player_name]
+    generator = HandGenerator(seed)
+    scores = ScoreDistribution()
+    for i in range(num_games):
+        scores.add(simulate_game(num_hands, player, word_list, hand_size,
+                                 generator))
+    return scores
+
+
+def run_simulation(num_games, player_name='greedy', num_hands=1,
+                   hand_size=ps3.HAND_SIZE, workers=None, seed=0,
+                   chunk_size=500, shared=False):
+    """
+    Plays num_games games across a pool of worker processes and returns
+    (ScoreDistribution, elapsed seconds). Games are split into chunks of
+    chunk_size; chunk i always deals from a HandGenerator seeded with
+    (seed, i), so the results do not depend on the number of workers or
+    on scheduling. With workers=1 the games run in this process.
+
+    If shared is True, the workers attach to the memory-mapped word list
+    of sharedwords.py instead of each loading words.txt.
+
+    num_games: int >= 0
+    player_name: string, a key of PLAYERS
+    num_hands: int, hands per game
+    hand_size: int, letters per hand
+    workers: int, or None for os.cpu_count()
+    seed: int
+    chunk_size: int > 0
+    shared: boolean
+    returns: tuple (ScoreDistribution, float)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    shared_files = sharedwords.prepare() if shared else None
+    chunks = [(player_name, min(chunk_size, num_games - start), num_hands,
+               hand_size, (seed, i))
+              for i, start in enumerate(range(0, num_games, chunk_size))]
+    scores = ScoreDistribution()
+
+    start = time.perf_counter()
+    if workers == 1:
+        _init_worker(shared_files)
+        for chunk in chunks:
+            scores.merge(_run_chunk(*chunk))
+    elif chunks:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(shared_files,)) as pool:
+            for result in pool.map(_run_chunk, *zip(*chunks)):
+                scores.merge(result)
+    return scores, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate word games.')
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--hands', type=int, default=1)
+    parser.add_argument('--hand-size', type=int, default=ps3.HAND_SIZE)
+    parser.add_argument('--player', choices=sorted(PLAYERS), default='greedy')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--shared', action='store_true',
+                        help='share one memory-mapped word list between '
+                             'the workers')
+    args = parser.parse_args()
+
+    workers = args.workers or os.cpu_count() or 1
+    scores, elapsed = run_simulation(args.games, args.player, args.hands,
+                                     args.hand_size, workers, args.seed,
+                                     args.chunk_size, args.shared)
+    print('Games played:     ', scores.games)
+    if not scores.games:
+        return
+    print('Mean score:        %.2f (stdev %.2f)' % (scores.mean(), scores.stdev()))
+    print('Min / p50 / p99 / max:', min(scores.counts), scores.percentile(50),
+          scores.percentile(99), max(scores.counts))
+    print('Games per second:  %.0f (%.0f per core, %d workers)'
+          % (scores.games / elapsed, scores.games / elapsed / workers, workers))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+# 6.0001 Problem Set 3
+#
+# Optimal solver for a whole hand. Because get_word_score depends on the
+# hand length n when a word is played, the order of the words matters:
+# the solver finds the sequence of plays with the highest total score.
+
+from ps3 import (SCRABBLE_LETTER_VALUES, VOWELS, get_frequency_dict,
+                 signature_index)
+
+
+def get_hand_key(hand):
+    """
+    Returns the canonical form of a hand: its letters (including '*')
+    sorted into a string. Two hands with the same letters have the same
+    key, whatever the order of their keys or any zero counts.
+
+    For example:
+        get_hand_key({'h':1, 'e':1, 'l':2, 'o':1, 'x':0})
+    should return:
+        'ehllo'
+
+    hand: dictionary (string -> int)
+    returns: string
+    """
+    return ''.join(sorted(letter * count for letter, count in hand.items()
+                          if count > 0))
+
+
+def remove_letters(key, letters):
+    """
+    Returns the hand key left after removing letters from key. Both are
+    sorted strings, and letters must be a sub-multiset of key.
+
+    key: string
+    letters: string
+    returns: string
+    """
+    remaining = []
+    i = 0
+    for letter in key:
+        if i < len(letters) and letters[i] == letter:
+            i += 1
+        else:
+            remaining.append(letter)
+    return ''.join(remaining)
+
+
+def split_key(letters):
+    """
+    Returns every way to split a sorted string of letters in two: a list
+    of (sub, rest) with sub each distinct sub-multiset of letters, in the
+    order of get_sub_multisets, and rest the letters left, so that rest is
+    remove_letters(letters, sub). Both are sorted strings.
+
+    For example:
+        split_key('aab')
+    should return (in some order):
+        [('', 'aab'), ('b', 'aa'), ('a', 'ab'), ('ab', 'a'), ('aa', 'b'),
+         ('aab', '')]
+
+    letters: string
+    returns: list of tuples (string, string)
+    """
+    pairs = [('', '')]
+    for letter, count in sorted(get_frequency_dict(letters).items()):
+        pairs = [(sub + letter * k, rest + letter * (count - k))
+                 for sub, rest in pairs for k in range(count + 1)]
+    return pairs
+
+
+class HandSolver(object):
+    """
+    Finds the score-maximising sequence of words for a hand, as played by
+    play_hand. Results are memoized by canonical hand key, so a sub-hand
+    reached by several sequences of plays is solved only once, and the
+    memo is kept across calls to solve.
+
+    If discards is True, the solver may also play an invalid word to get
+    rid of letters (which scores 0 but lowers n for the following words);
+    such plays appear in the result as the discarded letters.
+
+    word_list: WordDictionary (or any word list with a
+        words_with_signature method, or one signature_index indexes) of
+        lowercase strings
+    discards: boolean
+    """
+
+    def __init__(self, word_list, discards=False):
+        self.word_list = signature_index(word_list)
+        self.discards = discards
+        # words: dictionary (string -> (tuple or None, tuple or None)),
+        # the word and the wildcard word playable with some letters (see
+        # _playable)
+        self._words = {}
+        # best: dictionary (string -> (int, string or None, string)),
+        # the best total score from a hand key, its first play and the
+        # hand key left after that play
+        self._best = {}
+
+    def _playable(self, letters):
+        """
+        Returns (word, wildcard_word) for a sorted string of letters:
+        a word spelled by exactly those letters, and a word spelled by
+        those letters plus '*' standing for a vowel. Either may be None,
+        and each is given with its letter sum and length, as a tuple
+        (string, int, int).
+        """
+        playable = self._words.get(letters)
+        if playable is None:
+            values = SCRABBLE_LETTER_VALUES
+            words = self.word_list.words_with_signature(letters)
+            word = None
+            if words:
+                word = (words[0], sum(values[c] for c in letters),
+                        len(letters))
+            wild_word = None
+            for v in VOWELS:
+                words = self.word_list.words_with_signature(
+                    ''.join(sorted(letters + v)))
+                if words:
+                    wild_word = (words[0].replace(v, '*', 1),
+                                 sum(values[c] for c in letters),
+                                 len(letters) + 1)
+                    break
+            playable = self._words[letters] = (word, wild_word)
+        return playable
+
+    def _solve_key(self, key):
+        if key in self._best:
+            return self._best[key][0]
+        n = len(key)
+        has_wild = key.startswith('*')
+        letters = key[1:] if has_wild else key
+        wild = '*' if has_wild else ''
+        # best: (score, play, remaining key); stopping scores nothing
+        best = (0, None, key)
+
+        for sub, rest in split_key(letters):
+            word, wild_word = self._playable(sub)
+            # moves: (word and its letter sum and length, or None for a
+            # discard, letters played, remaining key)
+            moves = []
+            if word is not None:
+                moves.append((word, sub, wild + rest))
+            if has_wild and wild_word is not None:
+                moves.append((wild_word, '*' + sub, rest))
+            if self.discards and sub and word is None:
+                moves.append((None, sub, wild + rest))
+                if has_wild:
+                    moves.append((None, '*' + sub, rest))
+            for word, used, remaining in moves:
+                score = self._solve_key(remaining)
+                if word is not None:
+                    # get_word_score(word, n), from the letter sum
+                    word, total, length = word
+                    score += total * max(7 * length - 3 * (n - length), 1)
+                if score > best[0]:
+                    best = (score, word if word is not None else used,
+                            remaining)
+
+        self._best[key] = best
+        return best[0]
+
+    def solve(self, hand):
+        """
+        Returns (total_score, words) for the best way to play hand, where
+        words is the list of words to enter in play_hand, in order.
+
+        hand: dictionary (string -> int)
+        returns: tuple (int, list of strings)
+        """
+        key = get_hand_key(hand)
+        total = self._solve_key(key)
+        words = []
+        while self._best[key][1] is not None:
+            score, word, key = self._best[key]
+            words.append(word)
+        return total, words
+
+
+def solve_hand(hand, word_list, discards=False):
+    """
+    Returns (total_score, words) for the best way to play hand; see
+    HandSolver. To solve many hands, create one HandSolver and reuse it
+    so its memo is shared.
+
+    hand: dictionary (string -> int)
+    word_list: WordDictionary (or list) of lowercase strings
+    discards: boolean
+    returns: tuple (int, list of strings)
+    """
+    return HandSolver(word_list, discards).solve(hand)
@@ -0,0 +1,119 @@
+import io
+
+from ps3 import *
+import batch
+
+#
+# Test code
+#
+
+def test_parse_play():
+    """
+    Unit test for batch.parse_play
+    """
+    failure=False
+    lines = {"honey\thoneyxz\t7\n":("honey", "honeyxz", 7),
+             "h*ney\thneydw*e\r\n":("h*ney", "hneydw*e", 8),
+             "\t\t0":("", "", 0)}
+    for line in lines:
+        play = batch.parse_play(line)
+        if play != lines[line]:
+            print("FAILURE: test_parse_play()")
+            print("\tExpected", lines[line], "but got", play, "for line", repr(line))
+            failure=True
+
+    for line in ["honey\n", "honey\thoney\tseven\n", "a\tb\t1\t2\n", ""]:
+        try:
+            play = batch.parse_play(line)
+            print("FAILURE: test_parse_play()")
+            print("\tExpected ValueError but got", play, "for line", repr(line))
+            failure=True
+        except ValueError:
+            pass
+
+    if not failure:
+        print("SUCCESS: test_parse_play()")
+
+# end of test_parse_play
+
+
+def test_checker():
+    """
+    Unit test for batch.make_checker and batch.validate_plays
+    """
+    failure=False
+    check = batch.make_checker(word_list, cache_size=16)
+    plays = {("honey", "honeyxz", 7):(True, get_word_score("honey", 7)),
+             ("HONEY", "zxyenoh", 7):(True, get_word_score("honey", 7)),
+             ("hxney", "honeyxz", 7):(False, 0),
+             ("honey", "honxz", 5):(False, 0),
+             ("h*ney", "hneydw*e", 8):(True, get_word_score("h*ney", 8)),
+             ("c*wz", "cowszyy*", 8):(False, 0)}
+    for play in plays:
+        if check(*play) != plays[play]:
+            print("FAILURE: test_checker()")
+            print("\tExpected", plays[play], "but got", check(*play), "for", play)
+            failure=True
+
+    # the hand of the second play is the first one in another order
+    info = check.cache_info()
+    if (info.hits, info.misses) != (1, len(plays) - 1):
+        print("FAILURE: test_checker()")
+        print("\tExpected 1 cache hit and", len(plays) - 1, "misses but got", info)
+        failure=True
+
+    results = list(batch.validate_plays(iter(plays), word_list))
+    expected = [play + plays[play] for play in plays]
+    if results != expected:
+        print("FAILURE: test_checker()")
+        print("\tExpected", expected, "\n\tbut got", results)
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_checker()")
+
+# end of test_checker
+
+
+def test_run():
+    """
+    Unit test for batch.run
+    """
+    failure=False
+    infile = io.StringIO("honey\thoneyxz\t7\n"
+                         "h*ney\thneydw*e\n"
+                         "hxney\thoneyxz\n"
+                         "honey\n"
+                         "honey\thoney\tseven\r\n"
+                         "honey\tyenoh\n")
+    outfile = io.StringIO()
+    count = batch.run(infile, outfile, word_list)
+    expected = ("honey\thoneyxz\t7\t1\t%d\n" % get_word_score("honey", 7)
+                + "h*ney\thneydw*e\t8\t1\t%d\n" % get_word_score("h*ney", 8)
+                + "hxney\thoneyxz\t7\t0\t0\n"
+                + "honey\terror\n"
+                + "honey\thoney\tseven\terror\n"
+                + "honey\tyenoh\t5\t1\t%d\n" % get_word_score("honey", 5))
+    if count != 6 or outfile.getvalue() != expected:
+        print("FAILURE: test_run()")
+        print("\tExpected 6 lines:\n" + expected + "\tbut got", count,
+              "lines:\n" + outfile.getvalue())
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_run()")
+
+# end of test_run
+
+
+word_list = load_words()
+print("----------------------------------------------------------------------")
+print("Testing parse_play...")
+test_parse_play()
+print("----------------------------------------------------------------------")
+print("Testing the batch checker...")
+test_checker()
+print("----------------------------------------------------------------------")
+print("Testing batch.run...")
+test_run()
+print("All done!")
@@ -0,0 +1,87 @@
+from ps3 import *
+from dawg import CompactDictionary
+
+#
+# Test code
+#
+
+def test_compact_dictionary():
+    """
+    Unit test for CompactDictionary
+    """
+    failure=False
+    words = ["tap", "taps", "top", "tops", "honey", "money", "tap"]
+    compact = CompactDictionary.from_words(words)
+
+    if list(compact) != sorted(set(words)) or len(compact) != 6:
+        print("FAILURE: test_compact_dictionary()")
+        print("\tExpected", sorted(set(words)), "but got", list(compact))
+        failure=True
+
+    for word in ["ta", "tapss", "oney", ""]:
+        if word in compact:
+            print("FAILURE: test_compact_dictionary()")
+            print("\tExpected '" + word + "' not to be in the dictionary")
+            failure=True
+
+    if not compact.has_prefix("hon") or compact.has_prefix("hom"):
+        print("FAILURE: test_compact_dictionary()")
+        print("\tPrefix query returned the wrong answer for 'hon' or 'hom'")
+        failure=True
+
+    if list(compact.words_with_prefix("to")) != ["top", "tops"]:
+        print("FAILURE: test_compact_dictionary()")
+        print("\tExpected ['top', 'tops'] but got",
+              list(compact.words_with_prefix("to")))
+        failure=True
+
+    if compact.wildcard_vowels("t*ps") != "ao" or compact.wildcard_vowels("h*ny") != "":
+        print("FAILURE: test_compact_dictionary()")
+        print("\tWildcard matching returned the wrong vowels")
+        failure=True
+
+    # best_word indexes the signatures of the dictionary once
+    index = signature_index(compact)
+    if (signature_index(compact) is not index or best_word(
+            {'t':1, 'p':1, 's':1, '*':1}, 4, compact) != "t*ps"):
+        print("FAILURE: test_compact_dictionary()")
+        print("\tExpected one signature index and 't*ps' from best_word")
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_compact_dictionary()")
+
+# end of test_compact_dictionary
+
+def test_compact_matches_word_list():
+    """
+    Checks that a CompactDictionary built from words.txt gives the same
+    answers as the WordDictionary returned by load_words
+    """
+    failure=False
+    compact = CompactDictionary.from_words(word_list)
+
+    if list(compact) != sorted(word_list):
+        print("FAILURE: test_compact_matches_word_list()")
+        print("\tIterating the compact dictionary did not give every word")
+        failure=True
+
+    hand = {'n': 1, 'h': 1, '*': 1, 'y': 1, 'd':1, 'w':1, 'e': 2}
+    for word in ["honey", "h*ney", "e*m", "c*wz", "hxney"]:
+        if is_valid_word(word, hand, compact) != is_valid_word(word, hand, word_list):
+            print("FAILURE: test_compact_matches_word_list()")
+            print("\tis_valid_word disagrees for word '" + word + "'")
+            failure=True
+
+    if not failure:
+        print("SUCCESS: test_compact_matches_word_list()")
+
+# end of test_compact_matches_word_list
+
+
+word_list = load_words()
+print("----------------------------------------------------------------------")
+print("Testing CompactDictionary...")
+test_compact_dictionary()
+test_compact_matches_word_list()
+print("All done!")
@@ -0,0 +1,107 @@
+import gc
+import os
+import tempfile
+
+from ps3 import *
+from dictionaries import DictionaryRegistry
+
+#
+# Test code
+#
+
+def write_words(directory, name, words):
+    filename = os.path.join(directory, name + '.txt')
+    with open(filename, 'w') as outFile:
+        outFile.write('\n'.join(words) + '\n')
+    return filename
+
+
+def test_registry():
+    """
+    Unit test for DictionaryRegistry loading and sharing
+    """
+    failure=False
+    directory = tempfile.mkdtemp()
+    write_words(directory, 'house', ['honey', 'hone', 'one'])
+    write_words(directory, 'short', ['a', 'an'])
+    registry = DictionaryRegistry()
+
+    if registry.register_directory(directory) != ['house', 'short']:
+        print("FAILURE: test_registry()")
+        print("\tExpected 'house' and 'short' to be registered, got",
+              registry.names())
+        failure=True
+    if registry.loaded() != [] or registry.loads != 0:
+        print("FAILURE: test_registry()")
+        print("\tA dictionary was loaded before it was asked for")
+        failure=True
+
+    house = registry.get('house')
+    if ('honey' not in house or 'a' in house or registry.get('house') is not house
+            or registry.loads != 1):
+        print("FAILURE: test_registry()")
+        print("\tExpected one shared 'house' dictionary, got", house,
+              "after", registry.loads, "loads")
+        failure=True
+
+    try:
+        registry.get('missing')
+        print("FAILURE: test_registry()")
+        print("\tExpected KeyError for an unregistered name")
+        failure=True
+    except KeyError:
+        pass
+
+    if not failure:
+        print("SUCCESS: test_registry()")
+
+# end of test_registry
+
+def test_registry_eviction():
+    """
+    Unit test for DictionaryRegistry eviction under a memory cap
+    """
+    failure=False
+    directory = tempfile.mkdtemp()
+    registry = DictionaryRegistry(max_bytes=1)
+    for name in ('first', 'second'):
+        registry.register(name, write_words(directory, name, [name]))
+
+    first = registry.get('first')
+    registry.get('second')
+    if registry.loaded() != ['second']:
+        print("FAILURE: test_registry_eviction()")
+        print("\tExpected only 'second' to stay loaded, got", registry.loaded())
+        failure=True
+
+    # 'first' is still in use, so it is taken back rather than reloaded
+    if registry.get('first') is not first or registry.loads != 2:
+        print("FAILURE: test_registry_eviction()")
+        print("\tA dictionary still in use was loaded again")
+        failure=True
+
+    # taking 'first' back dropped 'second', which nothing uses, and
+    # dropping 'first' now leaves it unused too: both must be reloaded
+    del first
+    registry.get('second')
+    gc.collect()
+    registry.get('first')
+    if registry.loads != 4:
+        print("FAILURE: test_registry_eviction()")
+        print("\tExpected unused dropped dictionaries to be reloaded, got",
+              registry.loads, "loads instead of 4")
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_registry_eviction()")
+
+# end of test_registry_eviction
+
+
+print("----------------------------------------------------------------------")
+print("Testing DictionaryRegistry...")
+test_registry()
+print("----------------------------------------------------------------------")
+print("Testing DictionaryRegistry eviction...")
+test_registry_eviction()
+print("All done!")
@@ -0,0 +1,123 @@
+import os
+import tempfile
+
+from ps3 import *
+import difftest
+import ps3
+import reference
+
+#
+# Test code
+#
+
+def test_no_divergence():
+    """
+    Unit test for difftest.run, random and exhaustive
+    """
+    failure=False
+    report, elapsed = difftest.run(3000, workers=1, seed=5,
+                                   word_lists=('dict',))
+    if report.cases != 3000 or report.divergences != 0:
+        print("FAILURE: test_no_divergence()")
+        print("\tExpected 3000 cases and no divergences, got:")
+        print(difftest.format_report(report))
+        failure=True
+
+    words = ['honey', 'hone', 'bat', 'a']
+    filename = os.path.join(tempfile.mkdtemp(), 'some.txt')
+    with open(filename, 'w') as outFile:
+        outFile.write('\n'.join(words) + '\n')
+    report, elapsed = difftest.run(exhaustive=True, workers=1,
+                                   filename=filename)
+    expected = sum(HAND_SIZE + 4 + len(word) for word in words)
+    if report.cases != expected or report.divergences != 0:
+        print("FAILURE: test_no_divergence()")
+        print("\tExpected", expected, "exhaustive cases and no divergences, got:")
+        print(difftest.format_report(report))
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_no_divergence()")
+
+# end of test_no_divergence
+
+def test_divergence_found():
+    """
+    Unit test for difftest.run finding a broken fast path
+    """
+    failure=False
+    # a hand type that has lost its letters
+    difftest.HAND_TYPES['broken'] = lambda hand: Hand()
+    try:
+        report, elapsed = difftest.run(500, workers=1, checks=('valid',),
+                                       word_lists=('dict',), max_reports=3)
+    finally:
+        del difftest.HAND_TYPES['broken']
+
+    if report.divergences == 0 or len(report.examples) != 3:
+        print("FAILURE: test_divergence_found()")
+        print("\tExpected divergences, with 3 examples, got:")
+        print(difftest.format_report(report))
+        failure=True
+    for example in report.examples:
+        if (example.variant != 'broken' or example.expected is not True
+                or is_valid_word(example.word, Hand(), word_list)):
+            print("FAILURE: test_divergence_found()")
+            print("\tUnexpected divergence", example)
+            failure=True
+
+    # an is_valid_word that lets no count below 0 be played again is
+    # found against the original one in reference.py
+    def counted_is_valid_word(word, hand, word_list):
+        if not reference.is_valid_word(word, hand, word_list):
+            return False
+        return all(hand.get(char, 0) >= count for char, count
+                   in get_frequency_dict(word.lower()).items())
+    original = ps3.is_valid_word
+    ps3.is_valid_word = counted_is_valid_word
+    try:
+        report, elapsed = difftest.run(3000, workers=1, seed=5,
+                                       checks=('valid',), word_lists=('dict',))
+    finally:
+        ps3.is_valid_word = original
+    if report.divergences == 0 or any(
+            example.expected is not True for example in report.examples):
+        print("FAILURE: test_divergence_found()")
+        print("\tExpected the counted is_valid_word to diverge, got:")
+        print(difftest.format_report(report))
+        failure=True
+
+    # an update_hand that raises on a Hand is reported like any result
+    original = ps3.update_hand
+    def failing_update_hand(hand, word):
+        if isinstance(hand, Hand):
+            raise ValueError(word)
+        return original(hand, word)
+    ps3.update_hand = failing_update_hand
+    try:
+        report, elapsed = difftest.run(500, workers=1, checks=('update',),
+                                       word_lists=('dict',))
+    finally:
+        ps3.update_hand = original
+    if report.divergences != 500 or any(
+            (example.variant, example.got) != ('Hand', 'raises ValueError')
+            for example in report.examples):
+        print("FAILURE: test_divergence_found()")
+        print("\tExpected every Hand update to diverge, got:")
+        print(difftest.format_report(report))
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_divergence_found()")
+
+# end of test_divergence_found
+
+
+word_list = load_words()
+print("----------------------------------------------------------------------")
+print("Testing difftest.run...")
+test_no_divergence()
+print("----------------------------------------------------------------------")
+print("Testing difftest.run with a broken fast path...")
+test_divergence_found()
+print("All done!")
@@ -0,0 +1,90 @@
+import math
+import random
+
+from ps3 import *
+import handgen
+from handgen import HandGenerator
+
+#
+# Test code
+#
+
+def test_deal_batch():
+    """
+    Unit test for HandGenerator.deal_batch
+    """
+    failure=False
+    backends = [False] + ([True] if handgen.np is not None else [])
+
+    for use_numpy in backends:
+        for n in (1, 4, 7, 12):
+            num_vowels = int(math.ceil((n - 1) / 3))
+            for hand in HandGenerator(n, use_numpy).deal_batch(200, n):
+                vowels = sum(hand.get(letter, 0) for letter in VOWELS)
+                if (calculate_handlen(hand) != n or hand.get('*') != 1
+                        or vowels != num_vowels):
+                    print("FAILURE: test_deal_batch()")
+                    print("\tBad hand", hand, "for n =", n,
+                          "and use_numpy =", use_numpy)
+                    failure=True
+                    break
+
+        first = HandGenerator(42, use_numpy).deal_batch(50)
+        second = HandGenerator(42, use_numpy).deal_batch(50)
+        if first != second:
+            print("FAILURE: test_deal_batch()")
+            print("\tThe same seed dealt different hands, use_numpy =",
+                  use_numpy)
+            failure=True
+
+        streams = HandGenerator(42, use_numpy).spawn(2)
+        if streams[0].deal_batch(50) == streams[1].deal_batch(50):
+            print("FAILURE: test_deal_batch()")
+            print("\tSpawned generators dealt the same hands, use_numpy =",
+                  use_numpy)
+            failure=True
+
+    if not failure:
+        print("SUCCESS: test_deal_batch()")
+
+# end of test_deal_batch
+
+def test_seeded_substitute():
+    """
+    Unit test for substitute_hand and deal_hand with an rng
+    """
+    failure=False
+
+    if deal_hand(7, random.Random(3)) != deal_hand(7, random.Random(3)):
+        print("FAILURE: test_seeded_substitute()")
+        print("\tdeal_hand dealt different hands from the same seed")
+        failure=True
+
+    # only 'x' is left to substitute with, so it must be drawn first time
+    letters = 'abcdefghijklmnopqrstuvwyz'
+    hand = get_frequency_dict(letters)
+    for rng in (random.Random(0), HandGenerator(0)):
+        result = substitute_hand(hand, 'a', rng)
+        expected = get_frequency_dict(letters.replace('a', 'x'))
+        if result != expected:
+            print("FAILURE: test_seeded_substitute()")
+            print("\tExpected", expected, "but got", result)
+            failure=True
+        if Hand(hand).substitute('a', 'x') != HandGenerator(0).substitute(Hand(hand), 'a'):
+            print("FAILURE: test_seeded_substitute()")
+            print("\tHandGenerator.substitute did not substitute 'x'")
+            failure=True
+
+    if not failure:
+        print("SUCCESS: test_seeded_substitute()")
+
+# end of test_seeded_substitute
+
+
+print("----------------------------------------------------------------------")
+print("Testing deal_batch...")
+test_deal_batch()
+print("----------------------------------------------------------------------")
+print("Testing substitute_hand with an rng...")
+test_seeded_substitute()
+print("All done!")
@@ -0,0 +1,114 @@
+from functools import lru_cache
+
+import ps3
+import instrument
+from ps3 import load_words
+
+#
+# Test code
+#
+
+def test_instrument():
+    """
+    Unit test for instrument.enable, snapshot and disable
+    """
+    failure=False
+    original = ps3.is_valid_word
+    hand = {'h':1, 'o':1, 'n':1, 'e':1, 'y':1, '*':1}
+
+    instrument.reset()
+    instrument.enable()
+    try:
+        if ps3.is_valid_word is original:
+            print("FAILURE: test_instrument()")
+            print("\tis_valid_word was not instrumented")
+            failure=True
+        for word in ('honey', 'h*ney', 'honeyx'):
+            ps3.is_valid_word(word, hand, word_list)
+        ps3.get_word_score('honey', 7)
+        data = instrument.snapshot()
+    finally:
+        instrument.disable()
+
+    if ps3.is_valid_word is not original:
+        print("FAILURE: test_instrument()")
+        print("\tdisable() did not restore is_valid_word")
+        failure=True
+
+    stats = data['functions']['is_valid_word']
+    if stats['calls'] != 3 or sum(stats['histogram'].values()) != 3:
+        print("FAILURE: test_instrument()")
+        print("\tExpected 3 calls of is_valid_word but got", stats)
+        failure=True
+    if data['functions']['get_word_score']['calls'] != 1:
+        print("FAILURE: test_instrument()")
+        print("\tExpected 1 call of get_word_score but got",
+              data['functions']['get_word_score'])
+        failure=True
+
+    ps3.is_valid_word('honey', hand, word_list)
+    if instrument.snapshot()['functions']['is_valid_word']['calls'] != 3:
+        print("FAILURE: test_instrument()")
+        print("\tA call was counted while instrumentation was disabled")
+        failure=True
+
+    # a word played in a hand is scored from the score table, through
+    # word_score
+    instrument.reset()
+    instrument.enable()
+    try:
+        engine = ps3.HandEngine({'h':1, 'e':1, 'l':2, 'o':1}, word_list)
+        engine.start()
+        events = engine.play('hole')
+        data = instrument.snapshot()
+    finally:
+        instrument.disable()
+    if (events[0] != ('valid', 'hole', 175, 175)
+            or data['functions']['word_score']['calls'] != 1):
+        print("FAILURE: test_instrument()")
+        print("\tExpected 'hole' to be scored once by word_score but got",
+              events[0], data['functions']['word_score'])
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_instrument()")
+
+# end of test_instrument
+
+def test_register_cache():
+    """
+    Unit test for instrument.register_cache
+    """
+    failure=False
+
+    @lru_cache(maxsize=None)
+    def square(x):
+        return x * x
+
+    for x in (1, 2, 1, 1):
+        square(x)
+    instrument.register_cache('square', square.cache_info)
+    try:
+        stats = instrument.snapshot()['caches']['square']
+    finally:
+        instrument.unregister_cache('square')
+
+    if stats != {'hits': 2, 'misses': 2, 'hit_rate': 0.5}:
+        print("FAILURE: test_register_cache()")
+        print("\tExpected 2 hits and 2 misses but got", stats)
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_register_cache()")
+
+# end of test_register_cache
+
+
+word_list = load_words()
+print("----------------------------------------------------------------------")
+print("Testing instrument...")
+test_instrument()
+print("----------------------------------------------------------------------")
+print("Testing register_cache...")
+test_register_cache()
+print("All done!")
@@ -1,3 +1,6 @@
+import itertools
+
+import ps3
 from ps3 import *
 
 #
@@ -248,6 +251,402 @@ def test_wildcard(word_list):
         print("SUCCESS: test_wildcard()")
 
 
+def test_word_dictionary():
+    """
+    Unit test for WordDictionary
+    """
+    failure=False
+    words = WordDictionary(["honey", "evil", "honey", "quail"])
+
+    if len(words) != 3:
+        print("FAILURE: test_word_dictionary()")
+        print("\tExpected 3 words after removing duplicates, but got", len(words))
+        failure=True
+
+    if list(words) != ["honey", "evil", "quail"]:
+        print("FAILURE: test_word_dictionary()")
+        print("\tExpected words in load order, but got", list(words))
+        failure=True
+
+    if "evil" not in words or "even" in words:
+        print("FAILURE: test_word_dictionary()")
+        print("\tMembership test returned the wrong answer for 'evil' or 'even'")
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_word_dictionary()")
+
+# end of test_word_dictionary
+
+
+def test_resolve_wildcard():
+    """
+    Unit test for resolve_wildcard
+    """
+    failure=False
+    words = {"h*ney":["honey"], "b*t":["bat", "bet", "bit", "bot", "but"],
+             "e*m":[], "c*wz":[]}
+    for word in words.keys():
+        for wl in (word_list, list(word_list)):
+            resolved = resolve_wildcard(word, wl)
+            if resolved != words[word]:
+                print("FAILURE: test_resolve_wildcard()")
+                print("\tExpected", words[word], "but got", resolved,
+                      "for word '" + word + "' and a", type(wl).__name__)
+                failure=True
+
+    if not failure:
+        print("SUCCESS: test_resolve_wildcard()")
+
+# end of test_resolve_wildcard
+
+
+def test_best_word():
+    """
+    Unit test for best_word
+    """
+    failure=False
+    # dictionary of (hand letters, n) and expected best words
+    hands = {("quail", 5):"quail", ("honeyd*w", 8):"hon*ydew",
+             ("hneydw*e", 8):"h*neydew", ("tem*", 4):"*tem", ("xzq", 3):None,
+             ("", 0):None}
+    for (letters, n) in hands.keys():
+        hand = get_frequency_dict(letters)
+        word = best_word(hand, n, word_list)
+        if word != hands[(letters, n)]:
+            print("FAILURE: test_best_word()")
+            print("\tExpected", hands[(letters, n)], "but got", word,
+                  "for hand:", hand)
+            failure=True
+        elif word is not None and not is_valid_word(word, hand, word_list):
+            print("FAILURE: test_best_word()")
+            print("\tReturned '" + word + "', which is not valid for hand:", hand)
+            failure=True
+
+    if not failure:
+        print("SUCCESS: test_best_word()")
+
+# end of test_best_word
+
+
+def test_hand():
+    """
+    Unit test for Hand
+    """
+    failure=False
+    handOrig = {'h':1, 'e':1, 'l':2, 'o':1}
+    hand = Hand(handOrig)
+
+    if hand != handOrig or hand != Hand("hello") or hash(hand) != hash(Hand("olleh")):
+        print("FAILURE: test_hand()")
+        print("\tExpected", hand, "to equal", handOrig, "and Hand('hello')")
+        failure=True
+
+    hand2 = update_hand(hand, "HOLLOW")
+    if hand2 != {'e':1} or calculate_handlen(hand2) != 1 or hand != handOrig:
+        print("FAILURE: test_hand()")
+        print("\tExpected Hand({'e': 1}) with length 1 but got", hand2,
+              "with length", calculate_handlen(hand2))
+        failure=True
+
+    for word in ["hello", "Hole", "hollo", "hel*o"]:
+        if is_valid_word(word, hand, word_list) != is_valid_word(word, handOrig, word_list):
+            print("FAILURE: test_hand()")
+            print("\tis_valid_word disagrees for word '" + word +
+                  "' between a Hand and a dictionary")
+            failure=True
+
+    # a dictionary keeps the letter counts update_hand took below 0, and
+    # such a letter can still be played, any number of times
+    overdrawn = update_hand({'t':1, 'e':1, 'c':1, 'h':2}, "teeth")
+    for word, expected in [("tech", True), ("teethe", True), ("etch", True),
+                           ("tea", False)]:
+        if is_valid_word(word, overdrawn, word_list) != expected:
+            print("FAILURE: test_hand()")
+            print("\tExpected", expected, "for word '" + word + "' and hand:",
+                  overdrawn)
+            failure=True
+    if is_valid_word("tech", {'t':0, 'e':1, 'c':1, 'h':1}, word_list):
+        print("FAILURE: test_hand()")
+        print("\tExpected False for a letter with a count of 0")
+        failure=True
+
+    sub_hand = substitute_hand(hand, 'l')
+    if calculate_handlen(sub_hand) != 5 or 'l' in sub_hand or hand != handOrig:
+        print("FAILURE: test_hand()")
+        print("\tsubstitute_hand returned", sub_hand, "for hand", hand)
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_hand()")
+
+# end of test_hand
+
+
+def test_game_engine():
+    """
+    Unit test for HandEngine and GameEngine
+    """
+    failure=False
+    engine = HandEngine({'h':1, 'e':1, 'l':2, 'o':1}, word_list)
+    events = engine.start() + engine.play("hole") + engine.play("xyz")
+    events += engine.play("l")
+    expected = [('hand', {'h':1, 'e':1, 'l':2, 'o':1}), ('ask', 'word'),
+                ('valid', 'hole', 175, 175), ('hand', {'h':0, 'e':0, 'l':1, 'o':0}),
+                ('ask', 'word'), ('invalid', 'xyz'),
+                ('hand', {'h':0, 'e':0, 'l':1, 'o':0}), ('ask', 'word'),
+                ('invalid', 'l'), ('hand_over', 175, True)]
+    if events != expected or not engine.finished:
+        print("FAILURE: test_game_engine()")
+        print("\tExpected events", expected, "\n\tbut got", events)
+        failure=True
+
+    hands = [{'h':1, 'e':1, 'l':2, 'o':1}, {'q':1, 'u':1, 'a':1, 'i':1, 'l':1}]
+    engine = GameEngine(word_list, deal=lambda n: hands.pop(0))
+    events = engine.start()
+    for answer in ["2", "no", "hello", "yes", "!!", "no", "quail", "no"]:
+        events = engine.send(answer)
+    if events[-1] != ('game_over', 280 + 490) or not engine.finished:
+        print("FAILURE: test_game_engine()")
+        print("\tExpected the game to end with 770 points, but got", events)
+        failure=True
+
+    # like range(num_hands) in play_game, no hands are dealt for 0 or less
+    for answer in ["0", "-1", "-5"]:
+        engine = GameEngine(word_list, deal=lambda n: {'a':1})
+        engine.start()
+        events = engine.send(answer)
+        if events != [('game_over', 0)] or not engine.finished:
+            print("FAILURE: test_game_engine()")
+            print("\tExpected the game to end at once for", answer,
+                  "hands, but got", events)
+            failure=True
+
+    if not failure:
+        print("SUCCESS: test_game_engine()")
+
+# end of test_game_engine
+
+
+def test_word_score_table():
+    """
+    Unit test for WordDictionary.word_score
+    """
+    failure=False
+    words = WordDictionary(['honey', 'quail', 'a', 'fixate'], max_hand_size=8)
+
+    for word in ('honey', 'quail', 'a', 'fixate', 'HONEY', 'h*ney', 'nope'):
+        for n in range(0, 12):
+            if words.word_score(word, n) != get_word_score(word, n):
+                print("FAILURE: test_word_score_table()")
+                print("\tExpected", get_word_score(word, n), "points but got",
+                      words.word_score(word, n), "for '" + word + "', n =", n)
+                failure=True
+
+    # the table must follow changes to the letter values
+    original = SCRABBLE_LETTER_VALUES['q']
+    SCRABBLE_LETTER_VALUES['q'] = 1
+    try:
+        score = words.word_score('quail', 7)
+    finally:
+        SCRABBLE_LETTER_VALUES['q'] = original
+    if score != (1 + 1 + 1 + 1 + 1) * 29:
+        print("FAILURE: test_word_score_table()")
+        print("\tExpected 145 points for 'quail' with q worth 1, but got", score)
+        failure=True
+    if words.word_score('quail', 7) != get_word_score('quail', 7):
+        print("FAILURE: test_word_score_table()")
+        print("\tThe table was not rebuilt when q got its value back")
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_word_score_table()")
+
+# end of test_word_score_table
+
+
+def test_play_cache():
+    """
+    Unit test for PlayCache
+    """
+    failure=False
+    cache = PlayCache(word_list, maxsize=3)
+    hand = {'h':1, 'o':1, 'n':1, 'e':1, 'y':1, '*':1, 'x':0}
+
+    for word in ('honey', 'HONEY', 'h*ney', 'honeyx'):
+        expected = (is_valid_word(word, hand, word_list),
+                    get_word_score(word, 6)
+                    if is_valid_word(word, hand, word_list) else 0)
+        if cache.check(word, hand) != expected:
+            print("FAILURE: test_play_cache()")
+            print("\tExpected", expected, "for '" + word + "' but got",
+                  cache.check(word, hand))
+            failure=True
+
+    # a Hand with the same letters shares the entry of the dictionary hand
+    cache.clear()
+    cache.check('honey', hand)
+    cache.check('honey', Hand('yenoh*'))
+    cache.check('honey', {'y':1, 'e':1, 'n':1, 'o':1, 'h':1, '*':1})
+    info = cache.cache_info()
+    if (info.hits, info.misses, info.currsize) != (2, 1, 1):
+        print("FAILURE: test_play_cache()")
+        print("\tExpected 2 hits and 1 miss but got", info)
+        failure=True
+
+    for word in ('hone', 'one', 'hen', 'honey'):
+        cache.check(word, hand)
+    if cache.cache_info().currsize != 3 or cache.cache_info().misses != 5:
+        print("FAILURE: test_play_cache()")
+        print("\tExpected 3 entries and 'honey' to be evicted but got",
+              cache.cache_info())
+        failure=True
+
+    # a count below 0 never runs out, unlike a count of 0
+    for hand, expected in [({'t':0, 'e':1, 'c':1, 'h':1}, False),
+                           ({'t':-1, 'e':1, 'c':1, 'h':1}, True)]:
+        if cache.check('tech', hand, 4)[0] != expected:
+            print("FAILURE: test_play_cache()")
+            print("\tExpected", expected, "for 'tech' and hand:", hand)
+            failure=True
+
+    # entries follow changes to the letter values, also made in place to a
+    # plain dictionary put in their stead
+    original = ps3.SCRABBLE_LETTER_VALUES
+    ps3.SCRABBLE_LETTER_VALUES = dict(original)
+    try:
+        before = cache.check('quail', Hand('quail'), 7)
+        ps3.SCRABBLE_LETTER_VALUES['q'] = 1
+        after = cache.check('quail', Hand('quail'), 7)
+    finally:
+        ps3.SCRABBLE_LETTER_VALUES = original
+    if before != (True, 406) or after != (True, 145):
+        print("FAILURE: test_play_cache()")
+        print("\tExpected 406 and then 145 points for 'quail' but got",
+              before, "and", after)
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_play_cache()")
+
+# end of test_play_cache
+
+
+def test_hand_state():
+    """
+    Unit test for HandState, checked against update_hand and
+    calculate_handlen on a dictionary
+    """
+    failure=False
+    handOrig = {'a':1, 'b':2, 'z':0}
+    hand = handOrig.copy()
+    state = HandState(handOrig)
+
+    # 'aab' plays one more 'a' than the hand has, and 'zq' plays a letter
+    # with a count of 0 and one that was never in the hand
+    for word in ('xyz', 'aab', 'zq', 'B'):
+        hand = update_hand(hand, word)
+        state = update_hand(state, word)
+        if (state != hand or calculate_handlen(state) != calculate_handlen(hand)
+                or format_hand(state) != format_hand(hand)
+                or is_valid_word('ab', state, ['ab'])
+                   != is_valid_word('ab', hand, ['ab'])):
+            print("FAILURE: test_hand_state()")
+            print("\tAfter '" + word + "', expected", hand, "of length",
+                  calculate_handlen(hand), "but got", state, "of length",
+                  calculate_handlen(state))
+            failure=True
+            break
+
+    # letters taken below 0 keep their count, like the dictionary
+    if ('b' in state or state.get('a') != -1 or state.get('z') != -2
+            or handOrig != {'a':1, 'b':2, 'z':0}):
+        print("FAILURE: test_hand_state()")
+        print("\tExpected exhausted letters to be removed, got", state)
+        failure=True
+
+    state = HandState({'h':1, 'e':1, 'l':2, 'o':1})
+    if state.minus_word('xyz') is not state or state.display != 'h e l l o ':
+        print("FAILURE: test_hand_state()")
+        print("\tExpected the state and its display to be kept, got", state)
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_hand_state()")
+
+# end of test_hand_state
+
+
+def test_top_words():
+    """
+    Unit test for top_words
+    """
+    failure=False
+    hand = get_frequency_dict('honeyd*w')
+    # every valid play from hand, with the wildcard in place of the first
+    # copy of a vowel
+    plays = set()
+    for word in word_list:
+        if len(word) <= 8:
+            for play in [word] + [word.replace(v, '*', 1) for v in VOWELS
+                                  if v in word]:
+                if is_valid_word(play, hand, word_list):
+                    plays.add(play)
+    expected = sorted(((play, get_word_score(play, 8)) for play in plays),
+                      key=lambda item: (-item[1], item[0]))
+
+    found = list(top_words(hand, 8, word_list))
+    if found != expected:
+        print("FAILURE: test_top_words()")
+        print("\tExpected", len(expected), "plays starting with", expected[:3],
+              "but got", len(found), "starting with", found[:3])
+        failure=True
+    if list(itertools.islice(top_words(hand, 8, word_list), 1)) != [('hon*ydew', 952)]:
+        print("FAILURE: test_top_words()")
+        print("\tExpected 'hon*ydew' to come first")
+        failure=True
+
+    words = WordDictionary(['he', 'honey', 'shooter', 'hole'])
+    if words.signature_bounds('eh', 'n') != (7, 11) or words.signature_bounds('x', 'a') is not None:
+        print("FAILURE: test_top_words()")
+        print("\tExpected signature bounds (7, 11) and None, got",
+              words.signature_bounds('eh', 'n'), words.signature_bounds('x', 'a'))
+        failure=True
+
+    # a word list without signature_bounds is searched with the hand alone
+    class SignatureList(object):
+        def words_with_signature(self, signature):
+            return word_list.words_with_signature(signature)
+    if list(top_words(hand, 8, SignatureList())) != expected:
+        print("FAILURE: test_top_words()")
+        print("\tThe plays differ for a word list without signature_bounds")
+        failure=True
+
+    # the bounds must follow changes to the letter values
+    original = SCRABBLE_LETTER_VALUES['y']
+    SCRABBLE_LETTER_VALUES['y'] = 30
+    try:
+        found = list(itertools.islice(top_words(hand, 8, word_list), 3))
+        scores = sorted(((play, get_word_score(play, 8)) for play in plays),
+                        key=lambda item: (-item[1], item[0]))[:3]
+    finally:
+        SCRABBLE_LETTER_VALUES['y'] = original
+    if found != scores:
+        print("FAILURE: test_top_words()")
+        print("\tExpected", scores, "with y worth 30, but got", found)
+        failure=True
+
+    if list(top_words({'x':1, 'z':1, 'q':1}, 3, word_list)) != []:
+        print("FAILURE: test_top_words()")
+        print("\tExpected no plays from 'xzq'")
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_top_words()")
+
+# end of test_top_words
+
+
 word_list = load_words()
 print("----------------------------------------------------------------------")
 print("Testing get_word_score...")
@@ -261,4 +660,31 @@ test_is_valid_word(word_list)
 print("----------------------------------------------------------------------")
 print("Testing wildcards...")
 test_wildcard(word_list)
+print("----------------------------------------------------------------------")
+print("Testing WordDictionary...")
+test_word_dictionary()
+print("----------------------------------------------------------------------")
+print("Testing resolve_wildcard...")
+test_resolve_wildcard()
+print("----------------------------------------------------------------------")
+print("Testing best_word...")
+test_best_word()
+print("----------------------------------------------------------------------")
+print("Testing Hand...")
+test_hand()
+print("----------------------------------------------------------------------")
+print("Testing game engine...")
+test_game_engine()
+print("----------------------------------------------------------------------")
+print("Testing the word score table...")
+test_word_score_table()
+print("----------------------------------------------------------------------")
+print("Testing PlayCache...")
+test_play_cache()
+print("----------------------------------------------------------------------")
+print("Testing HandState...")
+test_hand_state()
+print("----------------------------------------------------------------------")
+print("Testing top_words...")
+test_top_words()
 print("All done!")
@@ -0,0 +1,43 @@
+from ps3 import *
+from scoring import ScoreMatrix
+
+#
+# Test code
+#
+
+def test_score_matrix():
+    """
+    Unit test for ScoreMatrix, checked against get_word_score
+    """
+    failure=False
+    matrix = ScoreMatrix(word_list)
+
+    for n in (0, 3, 7, 12):
+        scores = matrix.scores(n)
+        for i in range(0, len(matrix.words), 97):
+            word = matrix.words[i]
+            if scores[i] != get_word_score(word, n):
+                print("FAILURE: test_score_matrix()")
+                print("\tExpected", get_word_score(word, n), "points but got",
+                      scores[i], "for word '" + word + "', n=" + str(n))
+                failure=True
+                break
+
+    hand = {'a':1, 'c':1, 'f':1, 'i':1, 't':1, 'x':1, 'e':2}
+    ranked = matrix.rank(hand, 8, 3)
+    if ranked != [(576, 'fixate'), (540, 'excite'), (396, 'facete')]:
+        print("FAILURE: test_score_matrix()")
+        print("\tExpected fixate, excite, facete but got", ranked)
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_score_matrix()")
+
+# end of test_score_matrix
+
+
+word_list = load_words()
+print("----------------------------------------------------------------------")
+print("Testing ScoreMatrix...")
+test_score_matrix()
+print("All done!")
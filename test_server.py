@@ -0,0 +1,74 @@
+import asyncio
+import random
+
+from ps3 import *
+from server import GameServer
+
+#
+# Test code
+#
+
+async def play_session(server, answers):
+    """
+    Starts server on a free loopback port, plays one session with the
+    answers given, and returns everything the server sent.
+    """
+    host, port = await server.start('127.0.0.1', 0)
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+        for answer in answers:
+            writer.write((answer + '\n').encode())
+        await writer.drain()
+        received = await reader.read()
+        writer.close()
+        return received.decode()
+    finally:
+        server.close()
+
+
+def test_server_session():
+    """
+    Unit test for GameServer, over loopback
+    """
+    failure=False
+    random.seed(11)
+    hand = deal_hand(HAND_SIZE)
+    random.seed(11)
+    server = GameServer(word_list)
+    answers = ['-1', 'many', '1', 'no', '!!', 'no']
+    transcript = asyncio.run(play_session(server, answers))
+
+    expected = (PROMPTS['num_hands'] + '\n'
+                + 'Invalid answer, please try again.\n'
+                + PROMPTS['num_hands'] + '\n'
+                + 'Invalid answer, please try again.\n'
+                + PROMPTS['num_hands'] + '\n'
+                + 'Current hand: ' + format_hand(hand) + '\n'
+                + PROMPTS['substitute'] + '\n'
+                + 'Current Hand: ' + format_hand(hand) + '\n'
+                + PROMPTS['word'] + '\n'
+                + 'Total score for this hand:  0\n'
+                + PROMPTS['replay'] + '\n'
+                + 'Total score over all hands:  0\n')
+    if transcript != expected:
+        print("FAILURE: test_server_session()")
+        print("\tExpected the transcript", repr(expected))
+        print("\tbut got", repr(transcript))
+        failure=True
+    if server.sessions_played != 1 or server.active_sessions != 0:
+        print("FAILURE: test_server_session()")
+        print("\tExpected one finished session, got", server.sessions_played,
+              "played and", server.active_sessions, "active")
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_server_session()")
+
+# end of test_server_session
+
+
+word_list = load_words()
+print("----------------------------------------------------------------------")
+print("Testing GameServer...")
+test_server_session()
+print("All done!")
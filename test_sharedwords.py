@@ -0,0 +1,64 @@
+import os
+import random
+import tempfile
+
+from ps3 import *
+import sharedwords
+
+#
+# Test code
+#
+
+def test_shared_word_list():
+    """
+    Unit test for sharedwords.prepare and attach, checked against a
+    WordDictionary of the same words
+    """
+    failure=False
+    words = [word for i, word in enumerate(word_list) if i % 5 == 0]
+    filename = os.path.join(tempfile.mkdtemp(), 'some.txt')
+    with open(filename, 'w') as outFile:
+        outFile.write('\n'.join(words) + '\n')
+    expected = WordDictionary(words)
+    shared = sharedwords.attach(*sharedwords.prepare(filename))
+
+    if len(shared) != len(expected):
+        print("FAILURE: test_shared_word_list()")
+        print("\tExpected", len(expected), "words but got", len(shared))
+        failure=True
+
+    for word in words[:2000]:
+        signature = ''.join(sorted(word))
+        if (word not in shared or shared.words_with_signature(signature)
+                != expected.words_with_signature(signature)):
+            print("FAILURE: test_shared_word_list()")
+            print("\tExpected", expected.words_with_signature(signature),
+                  "for signature", signature, "but got",
+                  shared.words_with_signature(signature))
+            failure=True
+            break
+    if shared.words_with_signature('qqq') != []:
+        print("FAILURE: test_shared_word_list()")
+        print("\tExpected no words for signature 'qqq'")
+        failure=True
+
+    rng = random.Random(0)
+    for i in range(50):
+        hand = deal_hand(HAND_SIZE, rng)
+        if best_word(hand, HAND_SIZE, shared) != best_word(hand, HAND_SIZE, expected):
+            print("FAILURE: test_shared_word_list()")
+            print("\tbest_word differs for", hand)
+            failure=True
+            break
+
+    if not failure:
+        print("SUCCESS: test_shared_word_list()")
+
+# end of test_shared_word_list
+
+
+word_list = load_words()
+print("----------------------------------------------------------------------")
+print("Testing SharedWordList...")
+test_shared_word_list()
+print("All done!")
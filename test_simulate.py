@@ -0,0 +1,113 @@
+import contextlib
+import io
+import math
+import sys
+
+from ps3 import *
+import simulate
+
+#
+# Test code
+#
+
+def test_score_distribution():
+    """
+    Unit test for ScoreDistribution
+    """
+    failure=False
+    scores = simulate.ScoreDistribution()
+    if (scores.mean() != 0.0 or scores.stdev() != 0.0
+            or scores.percentile(50) is not None):
+        print("FAILURE: test_score_distribution()")
+        print("\tExpected a mean of 0.0 and no percentiles without games")
+        failure=True
+
+    for score in (20, 10, 30):
+        scores.add(score)
+    other = simulate.ScoreDistribution()
+    other.add(20)
+    scores.merge(other)
+    if scores.games != 4 or scores.counts != {10:1, 20:2, 30:1}:
+        print("FAILURE: test_score_distribution()")
+        print("\tExpected 4 games, got", scores.games, "games:", scores.counts)
+        failure=True
+    if scores.mean() != 20 or abs(scores.stdev() - math.sqrt(50)) > 1e-9:
+        print("FAILURE: test_score_distribution()")
+        print("\tExpected a mean of 20 and a stdev of", math.sqrt(50),
+              "but got", scores.mean(), "and", scores.stdev())
+        failure=True
+
+    # dictionary of percentiles and expected scores
+    percentiles = {0:10, 25:10, 26:20, 50:20, 75:20, 76:30, 100:30}
+    for p in percentiles:
+        if scores.percentile(p) != percentiles[p]:
+            print("FAILURE: test_score_distribution()")
+            print("\tExpected", percentiles[p], "for percentile", p,
+                  "but got", scores.percentile(p))
+            failure=True
+
+    if not failure:
+        print("SUCCESS: test_score_distribution()")
+
+# end of test_score_distribution
+
+
+def test_run_simulation():
+    """
+    Unit test for run_simulation: the same seed gives the same scores
+    with any number of workers
+    """
+    failure=False
+    results = {}
+    for workers in (1, 2):
+        scores, elapsed = simulate.run_simulation(24, 'greedy', 2, workers=workers,
+                                                  seed=3, chunk_size=5)
+        results[workers] = scores.counts
+        if scores.games != 24:
+            print("FAILURE: test_run_simulation()")
+            print("\tExpected 24 games with", workers, "workers, got", scores.games)
+            failure=True
+    if results[1] != results[2]:
+        print("FAILURE: test_run_simulation()")
+        print("\tExpected the same scores with 1 and 2 workers, got",
+              results[1], "and", results[2])
+        failure=True
+
+    scores, elapsed = simulate.run_simulation(24, 'greedy', 2, workers=1,
+                                              seed=4, chunk_size=5)
+    if scores.counts == results[1]:
+        print("FAILURE: test_run_simulation()")
+        print("\tExpected another seed to give other scores")
+        failure=True
+
+    # no games, which main reports without statistics
+    output = io.StringIO()
+    argv = sys.argv
+    sys.argv = ['simulate.py', '--games', '0', '--workers', '2']
+    try:
+        with contextlib.redirect_stdout(output):
+            simulate.main()
+    finally:
+        sys.argv = argv
+    if output.getvalue().split() != ['Games', 'played:', '0']:
+        print("FAILURE: test_run_simulation()")
+        print("\tUnexpected output for no games:", repr(output.getvalue()))
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_run_simulation()")
+
+# end of test_run_simulation
+
+
+if __name__ == '__main__':
+    # the workers import this module, so the tests only run when it is the
+    # main one
+    word_list = load_words()
+    print("----------------------------------------------------------------------")
+    print("Testing ScoreDistribution...")
+    test_score_distribution()
+    print("----------------------------------------------------------------------")
+    print("Testing run_simulation...")
+    test_run_simulation()
+    print("All done!")
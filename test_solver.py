@@ -0,0 +1,145 @@
+import random
+
+from ps3 import *
+from solver import *
+from advisor import Advisor
+
+#
+# Test code
+#
+
+def replay_words(hand, words):
+    """
+    Plays words in order like play_hand does and returns the total score.
+    """
+    total_score = 0
+    for word in words:
+        n = calculate_handlen(hand)
+        if is_valid_word(word, hand, word_list):
+            total_score += get_word_score(word, n)
+        hand = update_hand(hand, word)
+    return total_score
+
+
+def test_get_hand_key():
+    """
+    Unit test for get_hand_key, remove_letters and split_key
+    """
+    failure=False
+    key = get_hand_key({'h':1, 'e':1, 'l':2, 'o':1, 'x':0, '*':1})
+    if key != "*ehllo":
+        print("FAILURE: test_get_hand_key()")
+        print("\tExpected '*ehllo' but got '" + key + "'")
+        failure=True
+
+    remaining = remove_letters(key, "*el")
+    if remaining != "hlo":
+        print("FAILURE: test_get_hand_key()")
+        print("\tExpected 'hlo' but got '" + remaining + "'")
+        failure=True
+
+    pairs = split_key("aab")
+    if sorted(pairs) != [('', 'aab'), ('a', 'ab'), ('aa', 'b'), ('aab', ''),
+                         ('ab', 'a'), ('b', 'aa')]:
+        print("FAILURE: test_get_hand_key()")
+        print("\tUnexpected splits of 'aab':", pairs)
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_get_hand_key()")
+
+# end of test_get_hand_key
+
+def test_solve_hand():
+    """
+    Unit test for solve_hand
+    """
+    failure=False
+    # dictionary of hand letters and best total scores
+    hands = {"acfi*tx":585, "quail":490, "xzq":0, "":0}
+    for letters in hands.keys():
+        hand = get_frequency_dict(letters)
+        total_score, words = solve_hand(hand, word_list)
+        if total_score != hands[letters]:
+            print("FAILURE: test_solve_hand()")
+            print("\tExpected", hands[letters], "points but got", total_score,
+                  "for hand:", hand)
+            failure=True
+        if replay_words(hand, words) != total_score:
+            print("FAILURE: test_solve_hand()")
+            print("\tPlaying", words, "does not score", total_score,
+                  "points for hand:", hand)
+            failure=True
+
+    # discarding letters with an invalid word lowers n for the next words
+    hand = get_frequency_dict("aeccnnv*")
+    total_score, words = solve_hand(hand, word_list)
+    discard_score, discard_words = solve_hand(hand, word_list, discards=True)
+    if discard_score < total_score or replay_words(hand, discard_words) != discard_score:
+        print("FAILURE: test_solve_hand()")
+        print("\tAllowing discards should never lower the best score")
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_solve_hand()")
+
+# end of test_solve_hand
+
+def test_advisor():
+    """
+    Unit test for Advisor
+    """
+    failure=False
+    advisor = Advisor(word_list, samples=None)
+    hand = {'a':1, 'c':1, 'f':1, 'i':1, '*':1, 't':1, 'x':1}
+    values = advisor.substitution_values(hand)
+
+    if values[None] != 585 or set(values) != {None, 'a', 'c', 'f', 'i', '*', 't', 'x'}:
+        print("FAILURE: test_advisor()")
+        print("\tExpected a value for keeping the hand (585) and for each letter, got", values)
+        failure=True
+
+    # substituting 'q' can only give hands without a 'q'
+    hand = {'q':1, 'u':1, 'a':1, 'i':1, 'l':1}
+    expected = sum(solve_hand(get_frequency_dict("uail" + new_letter), word_list)[0]
+                   for new_letter in VOWELS + CONSONANTS
+                   if new_letter not in hand) / 21
+    if abs(advisor.substitution_values(hand)['q'] - expected) > 1e-9:
+        print("FAILURE: test_advisor()")
+        print("\tExpected", expected, "for substituting 'q' but got",
+              advisor.substitution_values(hand)['q'])
+        failure=True
+
+    # by default, the expectation is taken over a few sampled replacements
+    sampled = Advisor(word_list, rng=random.Random(0)).substitution_values(hand)
+    choices = [solve_hand(get_frequency_dict("uail" + new_letter), word_list)[0]
+               for new_letter in VOWELS + CONSONANTS if new_letter not in hand]
+    if (sampled != Advisor(word_list, rng=random.Random(0)).substitution_values(hand)
+            or sampled[None] != 490
+            or not min(choices) <= sampled['q'] <= max(choices)):
+        print("FAILURE: test_advisor()")
+        print("\tUnexpected sampled values", sampled)
+        failure=True
+
+    if advisor.replay_value(hand, 0) != 490 or advisor.replay_value(hand, 490) != 0:
+        print("FAILURE: test_advisor()")
+        print("\treplay_value should be the optimal score minus the score played")
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_advisor()")
+
+# end of test_advisor
+
+
+word_list = load_words()
+print("----------------------------------------------------------------------")
+print("Testing get_hand_key...")
+test_get_hand_key()
+print("----------------------------------------------------------------------")
+print("Testing solve_hand...")
+test_solve_hand()
+print("----------------------------------------------------------------------")
+print("Testing Advisor...")
+test_advisor()
+print("All done!")
@@ -0,0 +1,103 @@
+import io
+import random
+
+import ps3
+from ps3 import *
+from transcript import RecordingSink, replay
+
+#
+# Test code
+#
+
+class CountingStream(io.StringIO):
+    """A StringIO that counts its writes."""
+
+    writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return io.StringIO.write(self, text)
+
+
+def play_scripted(answers, sink, seed):
+    """
+    Plays a game with answers typed in, and returns its score.
+    """
+    answers = iter(answers)
+    ps3.input = lambda prompt='': next(answers)
+    try:
+        return run_cli(GameEngine(word_list, rng=random.Random(seed)), sink)
+    finally:
+        del ps3.input
+
+
+def test_console_sink():
+    """
+    Unit test for ConsoleSink: one write per question
+    """
+    failure=False
+    stream = CountingStream()
+    answers = ['2', 'no', 'zzz', '!!', 'no', 'no', '!!', 'no']
+    play_scripted(answers, ConsoleSink(stream), 7)
+
+    # one write per answer, plus the final output
+    if stream.writes != len(answers) + 1:
+        print("FAILURE: test_console_sink()")
+        print("\tExpected", len(answers) + 1, "writes but got", stream.writes)
+        failure=True
+    if not stream.getvalue().startswith('Enter total number of hands: Current hand: '):
+        print("FAILURE: test_console_sink()")
+        print("\tUnexpected output", repr(stream.getvalue()[:60]))
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_console_sink()")
+
+# end of test_console_sink
+
+def test_record_replay():
+    """
+    Unit test for recording a game and replaying its transcript
+    """
+    failure=False
+    sink = RecordingSink(io.StringIO())
+    answers = ['2', 'no', 'zzz', '!!', 'yes', '!!', 'no', '!!', 'no']
+    score = play_scripted(answers, sink, 11)
+    sink.finish()
+    header = {'transcript': 1, 'seed': 11, 'hand_size': HAND_SIZE}
+
+    if [answer for output, answer in sink.turns] != answers + [None]:
+        print("FAILURE: test_record_replay()")
+        print("\tExpected the answers", answers, "to be recorded, got",
+              sink.turns)
+        failure=True
+
+    result = replay(header, sink.turns, word_list)
+    if result != (score, None):
+        print("FAILURE: test_record_replay()")
+        print("\tExpected the replay to match with score", score, "but got",
+              result)
+        failure=True
+
+    # a different seed deals different hands, which shows in turn 1
+    header['seed'] = 12
+    score, mismatch = replay(header, sink.turns, word_list)
+    if mismatch is None or mismatch[0] != 1:
+        print("FAILURE: test_record_replay()")
+        print("\tExpected a mismatch at turn 1 but got", mismatch)
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_record_replay()")
+
+# end of test_record_replay
+
+
+word_list = load_words()
+print("----------------------------------------------------------------------")
+print("Testing ConsoleSink...")
+test_console_sink()
+print("----------------------------------------------------------------------")
+print("Testing transcripts...")
+test_record_replay()
+print("All done!")
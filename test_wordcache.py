@@ -0,0 +1,57 @@
+import os
+import tempfile
+
+from wordcache import *
+
+#
+# Test code
+#
+
+def test_cached_words():
+    """
+    Unit test for load_cached_words
+    """
+    failure=False
+    directory = tempfile.mkdtemp()
+    filename = os.path.join(directory, "words.txt")
+    with open(filename, "w") as outFile:
+        outFile.write("HONEY\nMONEY\nTAP\n")
+
+    word_list = load_cached_words(filename)
+    if list(word_list) != ["honey", "money", "tap"] or "tap" not in word_list:
+        print("FAILURE: test_cached_words()")
+        print("\tExpected ['honey', 'money', 'tap'] but got", list(word_list))
+        failure=True
+
+    if not os.path.exists(get_cache_filename(filename)):
+        print("FAILURE: test_cached_words()")
+        print("\tThe cache file was not written")
+        failure=True
+
+    # same contents, new modification time: the cache is still used
+    os.utime(filename, ns=(0, 0))
+    if not is_fresh(filename, get_cache_filename(filename)):
+        print("FAILURE: test_cached_words()")
+        print("\tTouching the word list should not invalidate the cache")
+        failure=True
+
+    # new contents: the cache is compiled again
+    with open(filename, "w") as outFile:
+        outFile.write("HONEY\nMONEY\nTAPS\n")
+    os.utime(filename, ns=(0, 0))
+    word_list = load_cached_words(filename)
+    if "taps" not in word_list or "tap" in word_list:
+        print("FAILURE: test_cached_words()")
+        print("\tThe cache was not rebuilt after the word list changed")
+        failure=True
+
+    if not failure:
+        print("SUCCESS: test_cached_words()")
+
+# end of test_cached_words
+
+
+print("----------------------------------------------------------------------")
+print("Testing load_cached_words...")
+test_cached_words()
+print("All done!")
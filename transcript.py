@@ -0,0 +1,234 @@
+# 6.0001 Problem Set 3
+#
+# Recording and replaying of console games. A transcript holds the seed
+# the hands were dealt from and, for every turn, the text the game wrote
+# (up to and including the question) and the answer that was typed. A
+# replay deals the same hands, feeds the recorded answers back in without
+# touching the console, and checks that the game writes exactly the same
+# text, so a recorded session can serve as a regression test or be
+# replayed many times over as load.
+#
+# Transcripts are JSON lines: a header {"transcript": 1, "seed": ...,
+# "hand_size": ...}, then one [output, answer] pair per turn, the answer
+# of the last turn being null.
+#
+# Run with:
+#     python transcript.py record game.jsonl
+#     python transcript.py replay game.jsonl --repeat 100
+
+import argparse
+import json
+import random
+import sys
+import time
+
+import ps3
+
+VERSION = 1
+
+
+class RecordingSink(ps3.ConsoleSink):
+    """
+    A ConsoleSink that also keeps every turn of the game in turns, as a
+    list of [output, answer] pairs.
+    """
+
+    def __init__(self, stream=None):
+        ps3.ConsoleSink.__init__(self, stream)
+        self.turns = []
+        self._output = []
+
+    def flush(self):
+        text = ps3.ConsoleSink.flush(self)
+        self._output.append(text)
+        return text
+
+    def ask(self, prompt):
+        answer = ps3.ConsoleSink.ask(self, prompt)
+        self.turns.append([''.join(self._output), answer])
+        self._output = []
+        return answer
+
+    def finish(self):
+        """
+        Records the output after the last answer, as the final turn.
+        """
+        self.flush()
+        self.turns.append([''.join(self._output), None])
+        self._output = []
+
+
+class ReplayMismatch(Exception):
+    """
+    Raised by ReplaySink to stop a game that has gone off script.
+    """
+
+
+class ReplaySink(object):
+    """
+    Answers the game's questions from recorded turns and compares what it
+    writes with the recorded output, without any console I/O. mismatch is
+    None while the output matches, and (turn, expected, actual) after the
+    first turn that differs, where ask raises ReplayMismatch.
+
+    turns: list of [output, answer] pairs
+    """
+
+    def __init__(self, turns):
+        self.turns = turns
+        self.turn = 0
+        self.mismatch = None
+        self._parts = []
+
+    def write(self, text):
+        self._parts.append(text)
+
+    def flush(self):
+        return ''.join(self._parts)
+
+    def _check(self):
+        actual = ''.join(self._parts)
+        self._parts = []
+        if self.turn >= len(self.turns):
+            expected = None
+        else:
+            expected = self.turns[self.turn][0]
+        if actual != expected and self.mismatch is None:
+            self.mismatch = (self.turn, expected, actual)
+        self.turn += 1
+        return self.mismatch is None
+
+    def ask(self, prompt):
+        self.write(prompt)
+        if not self._check():
+            raise ReplayMismatch(self.turn - 1)
+        answer = self.turns[self.turn - 1][1]
+        if answer is None:
+            # the recorded game ran out of input here
+            raise EOFError('the transcript has no more answers')
+        return answer
+
+    def finish(self):
+        """
+        Checks the output after the last answer, and that no recorded
+        turns are left over. Returns True if the whole game matched.
+        """
+        if self.turn < len(self.turns) or self._parts:
+            self._check()
+        if self.mismatch is None and self.turn != len(self.turns):
+            self.mismatch = (self.turn, self.turns[self.turn][0], None)
+        return self.mismatch is None
+
+
+def record_game(word_list, filename, seed=None, hand_size=ps3.HAND_SIZE):
+    """
+    Plays a game on the console, dealing hands from a random stream seeded
+    with seed, and saves its transcript to filename. Returns the score.
+
+    word_list: WordDictionary of lowercase strings
+    filename: string
+    seed: int, or None for a random one
+    hand_size: int, letters per hand
+    returns: int
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    sink = RecordingSink()
+    engine = ps3.GameEngine(word_list, hand_size, rng=random.Random(seed))
+    try:
+        score = ps3.run_cli(engine, sink)
+    finally:
+        sink.finish()
+        save_transcript(filename, {'transcript': VERSION, 'seed': seed,
+                                   'hand_size': hand_size}, sink.turns)
+    return score
+
+
+def save_transcript(filename, header, turns):
+    with open(filename, 'w') as outFile:
+        outFile.write(json.dumps(header) + '\n')
+        for turn in turns:
+            outFile.write(json.dumps(turn) + '\n')
+
+
+def load_transcript(filename):
+    """
+    Returns (header, turns) read from the transcript in filename.
+
+    filename: string
+    returns: tuple (dictionary, list of [string, string or None])
+    """
+    with open(filename) as inFile:
+        header = json.loads(inFile.readline())
+        if header.get('transcript') != VERSION:
+            raise ValueError('%s is not a version %d transcript'
+                             % (filename, VERSION))
+        turns = [json.loads(line) for line in inFile if line.strip()]
+    return header, turns
+
+
+def replay(header, turns, word_list):
+    """
+    Replays a recorded game and returns (score, mismatch), mismatch being
+    None if the game wrote exactly the recorded output, and otherwise
+    (turn, expected, actual) for the first turn that differs.
+
+    header: dictionary, as returned by load_transcript
+    turns: list of [output, answer] pairs
+    word_list: WordDictionary of lowercase strings
+    returns: tuple (int, tuple or None)
+    """
+    sink = ReplaySink(turns)
+    engine = ps3.GameEngine(word_list, header['hand_size'],
+                            rng=random.Random(header['seed']))
+    try:
+        ps3.run_cli(engine, sink)
+    except ReplayMismatch:
+        return engine.result, sink.mismatch
+    except (ValueError, KeyError, EOFError):
+        # the end of the input, a bad number of hands or a letter to
+        # replace that is not in the hand end the console game with an
+        # error, so they ended the recorded game too
+        pass
+    sink.finish()
+    return engine.result, sink.mismatch
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Record a game of the word game, or replay one.')
+    parser.add_argument('command', choices=('record', 'replay'))
+    parser.add_argument('filename')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='seed for the hands of a recorded game')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='replay the game this many times')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        try:
+            record_game(ps3.load_words(), args.filename, args.seed)
+        except EOFError:
+            print()
+        return 0
+
+    header, turns = load_transcript(args.filename)
+    word_list = ps3.get_word_list()
+    start = time.perf_counter()
+    for i in range(args.repeat):
+        score, mismatch = replay(header, turns, word_list)
+        if mismatch is not None:
+            turn, expected, actual = mismatch
+            print('MISMATCH at turn %d' % turn)
+            print('expected:', repr(expected))
+            print('actual:  ', repr(actual))
+            return 1
+    elapsed = time.perf_counter() - start
+    print('OK: %d turns replayed %d times in %.3f s (%.0f turns per second)'
+          % (len(turns), args.repeat, elapsed,
+             len(turns) * args.repeat / elapsed))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+# 6.0001 Problem Set 3
+#
+# Precompiled word list cache. The word list is compiled once into a
+# binary file holding a packed CompactDictionary, which is then
+# memory-mapped and queried in place, so loading it takes about the same
+# time whatever the size of the word list.
+#
+# File layout (native byte order, every section 4-byte aligned):
+#
+#     header     see HEADER below
+#     offsets    (nodes + 1) unsigned 32-bit ints
+#     targets    edges unsigned 32-bit ints
+#     labels     edges bytes
+#     terminal   nodes bytes
+#
+# The cache is rebuilt when the word list changes. A matching modification
+# time and size are trusted as is; otherwise the SHA-256 of the word list
+# is compared with the one stored in the header before recompiling.
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from dawg import CompactDictionary
+
+MAGIC = b'PS3DAWG1'
+VERSION = 1
+# magic, version, byte order, source mtime_ns, source size, source sha256,
+# words, nodes, edges
+HEADER = struct.Struct('=8sHHqq32sIII')
+BYTE_ORDER = 1 if sys.byteorder == 'little' else 2
+
+
+def get_cache_filename(filename):
+    """
+    Returns the name of the cache file for the word list in filename,
+    e.g. 'words.dawg' for 'words.txt'.
+
+    filename: string
+    returns: string
+    """
+    return os.path.splitext(filename)[0] + '.dawg'
+
+
+def _file_hash(filename):
+    sha = hashlib.sha256()
+    with open(filename, 'rb') as inFile:
+        for block in iter(lambda: inFile.read(1 << 16), b''):
+            sha.update(block)
+    return sha.digest()
+
+
+def _pad(size):
+    return -size % 4
+
+
+def compile_words(filename, cache_filename=None):
+    """
+    Compiles the word list in filename into a cache file and returns the
+    name of the cache file. The file is written to a temporary name first
+    and then renamed, so readers never see a partial cache.
+
+    filename: string
+    cache_filename: string, or None for get_cache_filename(filename)
+    returns: string
+    """
+    if cache_filename is None:
+        cache_filename = get_cache_filename(filename)
+    stat = os.stat(filename)
+    with open(filename, 'r') as inFile:
+        compact = CompactDictionary.from_words(
+            line.strip().lower() for line in inFile)
+    offsets, labels, targets, terminal = compact.arrays()
+    offsets = array('I', offsets)
+    targets = array('I', targets)
+    header = HEADER.pack(MAGIC, VERSION, BYTE_ORDER, stat.st_mtime_ns,
+                         stat.st_size, _file_hash(filename), len(compact),
+                         len(terminal), len(targets))
+
+    temp_filename = '%s.%d.tmp' % (cache_filename, os.getpid())
+    with open(temp_filename, 'wb') as outFile:
+        for section in (header, offsets.tobytes(), targets.tobytes(),
+                        bytes(labels), bytes(terminal)):
+            outFile.write(section)
+            outFile.write(b'\0' * _pad(len(section)))
+    os.replace(temp_filename, cache_filename)
+    return cache_filename
+
+
+def read_header(cache_filename):
+    """
+    Returns the header of a cache file as a tuple (magic, version,
+    byte order, mtime_ns, size, sha256, words, nodes, edges), or None if
+    the file is missing or is not a cache file this version can read.
+    """
+    try:
+        with open(cache_filename, 'rb') as inFile:
+            header = HEADER.unpack(inFile.read(HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if header[:3] != (MAGIC, VERSION, BYTE_ORDER):
+        return None
+    return header
+
+
+def is_fresh(filename, cache_filename):
+    """
+    Returns True if the cache file was compiled from the current contents
+    of filename. If only the modification time changed, the header is
+    updated so the next check is cheap again.
+
+    filename: string
+    cache_filename: string
+    returns: boolean
+    """
+    header = read_header(cache_filename)
+    if header is None:
+        return False
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        # no word list to compare with: trust the compiled copy
+        return True
+    if (stat.st_mtime_ns, stat.st_size) == header[3:5]:
+        return True
+    if stat.st_size != header[4] or _file_hash(filename) != header[5]:
+        return False
+    try:
+        with open(cache_filename, 'r+b') as outFile:
+            outFile.write(HEADER.pack(*header[:3] + (stat.st_mtime_ns,)
+                                      + header[4:]))
+    except OSError:
+        pass
+    return True
+
+
+def map_words(cache_filename):
+    """
+    Memory-maps a cache file and returns a CompactDictionary that reads
+    the mapped file in place, without copying it.
+
+    cache_filename: string
+    returns: CompactDictionary
+    """
+    with open(cache_filename, 'rb') as inFile:
+        mapped = mmap.mmap(inFile.fileno(), 0, access=mmap.ACCESS_READ)
+    header = HEADER.unpack_from(mapped)
+    words, nodes, edges = header[6:]
+    view = memoryview(mapped)
+
+    pos = HEADER.size + _pad(HEADER.size)
+    sections = []
+    for size, code in (((nodes + 1) * 4, 'I'), (edges * 4, 'I'),
+                       (edges, None), (nodes, None)):
+        sections.append((pos, view[pos:pos + size] if code is None
+                         else view[pos:pos + size].cast(code)))
+        pos += size + _pad(size)
+    (_, offsets), (_, targets), (label_base, _), (_, terminal) = sections
+    return CompactDictionary(offsets, mapped, targets, terminal, words,
+                             label_base)
+
+
+def load_cached_words(filename, cache_filename=None):
+    """
+    Returns a CompactDictionary for the word list in filename, read from
+    its memory-mapped cache file. The cache is compiled first if it is
+    missing or out of date. If the cache cannot be written (for example
+    in a read-only directory), the dictionary is built in memory instead.
+
+    filename: string
+    cache_filename: string, or None for get_cache_filename(filename)
+    returns: CompactDictionary
+    """
+    if cache_filename is None:
+        cache_filename = get_cache_filename(filename)
+    if not is_fresh(filename, cache_filename):
+        try:
+            compile_words(filename, cache_filename)
+        except OSError:
+            with open(filename, 'r') as inFile:
+                return CompactDictionary.from_words(
+                    line.strip().lower() for line in inFile)
+    return map_words(cache_filename)
+
+
+if __name__ == '__main__':
+    import time
+    from ps3 import WORDLIST_FILENAME
+
+    start = time.perf_counter()
+    cache_filename = compile_words(WORDLIST_FILENAME)
+    print('Compiled', WORDLIST_FILENAME, 'into', cache_filename, 'in',
+          '%.3f' % (time.perf_counter() - start), 'seconds')
+    start = time.perf_counter()
+    word_list = load_cached_words(WORDLIST_FILENAME)
+    print('Loaded', len(word_list), 'words from the cache in',
+          '%.6f' % (time.perf_counter() - start), 'seconds')